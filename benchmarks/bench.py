@@ -0,0 +1,187 @@
+# coding=utf-8
+
+"""
+Throughput benchmarks of torrent_parser over synthetic torrents.
+
+Run it from repo root::
+
+    python benchmarks/bench.py > bench_output.txt
+
+Every benchmark is run on every shape in :any:`generate.SHAPES`, and reports
+MB/s of the bencoded content and objects/s, where an object is a dict, list,
+int or string in the document.
+
+Use ``--save`` to store results as baseline, later runs compare with it and
+mark benchmarks slower than baseline by more than ``--tolerance``, and exit
+with code 1 if ``--check`` is given. Baselines depend on the machine, so only
+compare results from the same one.
+"""
+
+from __future__ import print_function, unicode_literals
+
+import argparse
+import io
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import generate  # noqa: E402
+import torrent_parser as tp  # noqa: E402
+
+try:
+    timer = time.perf_counter
+except AttributeError:
+    # For Python 2
+    timer = time.time
+
+DEFAULT_BASELINE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "baseline.json"
+)
+
+
+def count_objects(content):
+    count = 0
+    for event in tp.iterparse(content, errors="usebytes"):
+        if event[0] != "end":
+            count += 1
+    return count
+
+
+def bench_decode(content):
+    return lambda: tp.decode(content, errors="usebytes")
+
+
+def bench_encode(content):
+    data = tp.decode(content, errors="usebytes")
+    return lambda: tp.encode(data, hash_fields=[])
+
+
+def bench_parse(content):
+    return lambda: tp.TorrentFileParser(io.BytesIO(content)).parse()
+
+
+def bench_round_trip(content):
+    def run():
+        data = tp.TorrentFileParser(io.BytesIO(content)).parse()
+        return tp.TorrentFileCreator(data).create_filelike()
+
+    return run
+
+
+def bench_cli_json(content):
+    main = tp.__main
+
+    def run():
+        # the whole CLI, content from stdin and JSON output to stdout
+        stdin = io.TextIOWrapper(io.BytesIO(content))
+        stdout = io.StringIO()
+        saved = sys.argv, sys.stdin, sys.stdout
+        sys.argv = ["torrent_parser"]
+        sys.stdin, sys.stdout = stdin, stdout
+        try:
+            main()
+        finally:
+            sys.argv, sys.stdin, sys.stdout = saved
+        return stdout.getvalue()
+
+    return run
+
+
+BENCHMARKS = [
+    ("decode", bench_decode),
+    ("encode", bench_encode),
+    ("parse", bench_parse),
+    ("round_trip", bench_round_trip),
+    ("cli_json", bench_cli_json),
+]
+
+
+def measure(func, repeat, min_time):
+    """
+    :return: best seconds of one call in ``repeat`` rounds, a round calls
+      ``func`` many times until ``min_time`` seconds passed
+    """
+    best = None
+    for _ in range(repeat):
+        count = 0
+        start = timer()
+        while True:
+            func()
+            count += 1
+            elapsed = timer() - start
+            if elapsed >= min_time:
+                break
+        per_call = elapsed / count
+        if best is None or per_call < best:
+            best = per_call
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument("--scale", type=float, default=1.0, help="size of torrents")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--min-time", type=float, default=0.2)
+    parser.add_argument("--shape", action="append", choices=list(generate.SHAPES))
+    parser.add_argument(
+        "--bench", action="append", choices=[name for name, _ in BENCHMARKS]
+    )
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save", action="store_true", help="save results as baseline")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument(
+        "--check", action="store_true", help="exit with 1 if there are regressions"
+    )
+    args = parser.parse_args()
+
+    baseline = {}
+    if not args.save and os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    results = {}
+    regressions = 0
+    print(
+        "{:<18}{:<12}{:>10}{:>12}{:>14}{:>10}".format(
+            "shape", "bench", "size(MB)", "MB/s", "objects/s", "vs base"
+        )
+    )
+    for shape in args.shape or generate.SHAPES:
+        content = generate.generate(shape, args.scale)
+        mb = len(content) / 1024.0 / 1024.0
+        objects = count_objects(content)
+        for name, make in BENCHMARKS:
+            if args.bench and name not in args.bench:
+                continue
+            seconds = measure(make(content), args.repeat, args.min_time)
+            key = "{}/{}".format(shape, name)
+            results[key] = mb / seconds
+            compare = ""
+            if key in baseline:
+                ratio = results[key] / baseline[key]
+                compare = "{:.2f}x".format(ratio)
+                if ratio < 1 - args.tolerance:
+                    compare += " !"
+                    regressions += 1
+            print(
+                "{:<18}{:<12}{:>10.2f}{:>12.2f}{:>14.0f}{:>10}".format(
+                    shape, name, mb, mb / seconds, objects / seconds, compare
+                )
+            )
+            sys.stdout.flush()
+
+    if args.save:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+        print("baseline saved to", args.baseline)
+    elif regressions:
+        print("{} benchmarks are slower than baseline".format(regressions))
+        if args.check:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,244 @@
+# coding=utf-8
+
+"""
+Synthetic torrent generator for benchmarks.
+
+Every shape function returns bencoded bytes of a torrent-like document. Hash
+values are random raw bytes, and dict keys are sorted as the encoder writes
+them in given order.
+"""
+
+from __future__ import unicode_literals
+
+import collections
+import hashlib
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from torrent_parser import BEncoder  # noqa: E402
+
+
+def _sorted_dict(items):
+    return collections.OrderedDict(sorted(items, key=lambda kv: _key_bytes(kv[0])))
+
+
+def _key_bytes(key):
+    return key if isinstance(key, bytes) else key.encode("utf-8")
+
+
+def _encode(data):
+    # no hash fields, raw hash bytes are written as they are
+    return BEncoder(data, hash_fields=[]).encode()
+
+
+def _torrent(info, rng):
+    return _encode(
+        _sorted_dict(
+            [
+                ("announce", "http://tracker.example.com:8080/announce"),
+                (
+                    "announce-list",
+                    [
+                        ["http://tracker{}.example.com/announce".format(i)]
+                        for i in range(5)
+                    ],
+                ),
+                ("comment", "synthetic torrent for benchmark"),
+                ("created by", "torrent_parser benchmarks"),
+                ("creation date", 1600000000 + rng.randint(0, 10**6)),
+                ("info", info),
+            ]
+        )
+    )
+
+
+def _random_bytes(rng, n):
+    return bytes(bytearray(rng.getrandbits(8) for _ in range(n)))
+
+
+def _hashes(rng, count, size=20):
+    # random enough for hash values and much faster than all random bytes
+    block = _random_bytes(rng, size * 64)
+    return (block * (count // 64 + 1))[: size * count]
+
+
+def many_small_files(rng, scale=1.0):
+    count = int(20000 * scale)
+    files = [
+        _sorted_dict(
+            [
+                ("length", rng.randint(1, 64 * 1024)),
+                ("path", ["dir{}".format(i // 100), "file{}.txt".format(i)]),
+            ]
+        )
+        for i in range(count)
+    ]
+    info = _sorted_dict(
+        [
+            ("files", files),
+            ("name", "many small files"),
+            ("piece length", 16384),
+            ("pieces", _hashes(rng, count * 2)),
+        ]
+    )
+    return _torrent(info, rng)
+
+
+def huge_pieces(rng, scale=1.0):
+    count = int(250000 * scale)
+    info = _sorted_dict(
+        [
+            ("length", count * 4 * 1024 * 1024),
+            ("name", "huge.iso"),
+            ("piece length", 4 * 1024 * 1024),
+            ("pieces", _hashes(rng, count)),
+        ]
+    )
+    return _torrent(info, rng)
+
+
+def deep_nesting(rng, scale=1.0):
+    # BEncoder is recursive, keep it far from the recursion limit
+    depth = 200
+    count = max(1, int(500 * scale))
+    nested = []
+    for _ in range(count):
+        value = rng.randint(0, 1000)
+        for level in range(depth):
+            value = [value] if level % 2 else {"k": value}
+        nested.append(value)
+    info = _sorted_dict(
+        [
+            ("length", 1),
+            ("name", "deep"),
+            ("nested", nested),
+            ("piece length", 16384),
+            ("pieces", _hashes(rng, 1)),
+        ]
+    )
+    return _torrent(info, rng)
+
+
+def v2_file_tree(rng, scale=1.0):
+    count = int(5000 * scale)
+    piece_length = 64 * 1024
+    tree = {}
+    layers = []
+    for i in range(count):
+        length = rng.randint(1, 16) * piece_length
+        root = hashlib.sha256(str(rng.random()).encode("ascii")).digest()
+        node = tree.setdefault("dir{}".format(i // 50), {})
+        node["file{}.bin".format(i)] = {
+            "": _sorted_dict([("length", length), ("pieces root", root)])
+        }
+        layers.append((root, _hashes(rng, length // piece_length, 32)))
+
+    def sort_tree(node):
+        if "" in node:
+            return node
+        return _sorted_dict((k, sort_tree(v)) for k, v in node.items())
+
+    info = _sorted_dict(
+        [
+            ("file tree", sort_tree(tree)),
+            ("meta version", 2),
+            ("name", "v2 tree"),
+            ("piece length", piece_length),
+        ]
+    )
+    data = _sorted_dict(
+        [
+            ("announce", "http://tracker.example.com:8080/announce"),
+            ("info", info),
+            ("piece layers", _sorted_dict(layers)),
+        ]
+    )
+    return _encode(data)
+
+
+def long_strings(rng, scale=1.0):
+    count = max(1, int(8 * scale))
+    text = "长字符串 long string " * (1024 * 1024 // 24)
+    info = _sorted_dict(
+        [
+            ("length", 1),
+            ("name", "long strings"),
+            ("notes", [text] * count),
+            ("piece length", 16384),
+            ("pieces", _hashes(rng, 1)),
+        ]
+    )
+    return _torrent(info, rng)
+
+
+def non_utf8_names(rng, scale=1.0):
+    count = int(10000 * scale)
+    files = [
+        _sorted_dict(
+            [
+                ("length", rng.randint(1, 1024 * 1024)),
+                (
+                    "path",
+                    [
+                        "目录{}".format(i // 100).encode("gbk"),
+                        "文件{}.txt".format(i).encode("gbk"),
+                    ],
+                ),
+            ]
+        )
+        for i in range(count)
+    ]
+    info = _sorted_dict(
+        [
+            ("files", files),
+            ("name", "非UTF-8文件名".encode("gbk")),
+            ("piece length", 16384),
+            ("pieces", _hashes(rng, count)),
+        ]
+    )
+    return _torrent(info, rng)
+
+
+SHAPES = collections.OrderedDict(
+    [
+        ("many_small_files", many_small_files),
+        ("huge_pieces", huge_pieces),
+        ("deep_nesting", deep_nesting),
+        ("v2_file_tree", v2_file_tree),
+        ("long_strings", long_strings),
+        ("non_utf8_names", non_utf8_names),
+    ]
+)
+
+
+def generate(shape, scale=1.0, seed=0):
+    """
+    :param str shape: name in :any:`SHAPES`
+    :param float scale: multiplier of element count
+    :param int seed: random seed, same seed gives same bytes
+    :rtype: bytes
+    """
+    return SHAPES[shape](random.Random(seed), scale)
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="write synthetic torrents")
+    parser.add_argument("output_dir")
+    parser.add_argument("--scale", type=float, default=1.0)
+    args = parser.parse_args()
+    if not os.path.isdir(args.output_dir):
+        os.makedirs(args.output_dir)
+    for shape in SHAPES:
+        filename = os.path.join(args.output_dir, shape + ".torrent")
+        with open(filename, "wb") as f:
+            f.write(generate(shape, args.scale))
+        print(filename)
+
+
+if __name__ == "__main__":
+    main()
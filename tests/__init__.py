@@ -1,8 +1,24 @@
+from .test_async import *
+from .test_cache import *
+from .test_cli import *
 from .test_create import *
 from .test_decode import *
 from .test_decoding_error import *
+from .test_editable import *
 from .test_encode import *
+from .test_encoding_auto import *
+from .test_extract import *
+from .test_file_table import *
 from .test_hash_field import *
 from .test_hash_raw import *
+from .test_hash_view import *
+from .test_index import *
 from .test_info_hash import *
+from .test_iterparse import *
+from .test_lazy import *
+from .test_make import *
 from .test_parse import *
+from .test_parse_many import *
+from .test_stats import *
+from .test_string_cache import *
+from .test_verify import *
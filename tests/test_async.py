@@ -0,0 +1,121 @@
+from __future__ import unicode_literals
+
+import os.path
+import shutil
+import tempfile
+import unittest
+
+try:
+    import asyncio
+except ImportError:
+    asyncio = None
+
+from torrent_parser import (
+    BDecoder,
+    InvalidTorrentDataException,
+    TorrentFileCreator,
+    async_create,
+    async_parse,
+    async_parse_file,
+    parse_torrent_file,
+)
+
+
+class FakeStreamReader(object):
+    def __init__(self, loop, content):
+        self.loop = loop
+        self.content = content
+        self.reads = 0
+
+        self.pos = 0
+
+    def read(self, n):
+        self.reads += 1
+        future = self.loop.create_future()
+        future.set_result(self.content[self.pos:self.pos + n])
+        self.pos += n
+        return future
+
+
+@unittest.skipIf(asyncio is None, 'asyncio is not available')
+class TestAsync(unittest.TestCase):
+    TEST_FILES_DIR = os.path.join(os.path.dirname(__file__), 'test_files')
+    REAL_FILE = os.path.join(TEST_FILES_DIR, 'real.torrent')
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+
+    def tearDown(self):
+        asyncio.set_event_loop(None)
+        self.loop.close()
+
+    def run_async(self, make_future):
+        # like other asyncio functions, they need a running loop
+        result = self.loop.create_future()
+
+        def done(future):
+            if future.exception() is not None:
+                result.set_exception(future.exception())
+            else:
+                result.set_result(future.result())
+
+        self.loop.call_soon(lambda: make_future().add_done_callback(done))
+        return self.loop.run_until_complete(result)
+
+    @unittest.skipIf(
+        not hasattr(asyncio, 'get_running_loop'), 'asyncio.get_running_loop is not available'
+    )
+    def test_need_running_loop(self):
+        with self.assertRaises(RuntimeError):
+            async_parse_file(self.REAL_FILE)
+
+    def test_async_parse(self):
+        with open(self.REAL_FILE, 'rb') as f:
+            content = f.read()
+        expected = parse_torrent_file(self.REAL_FILE)
+        for spool_size in (None, 1024):
+            reader = FakeStreamReader(self.loop, content)
+            data = self.run_async(
+                lambda: async_parse(reader, chunk_size=4096, spool_size=spool_size)
+            )
+            self.assertEqual(data, expected)
+            self.assertGreater(reader.reads, len(content) // 4096)
+
+    def test_async_parse_spooled_and_mapped(self):
+        # big enough to be memory-mapped after spooled, and read in small
+        # chunks so data is still in write buffer of the file at the end
+        data = {
+            'info': {
+                'length': 1,
+                'name': 'big',
+                'piece length': 16384,
+                'pieces': [
+                    '%040x' % i for i in range(BDecoder.MMAP_THRESHOLD // 15)
+                ],
+            },
+        }
+        content = TorrentFileCreator(data).create_filelike().read()
+        self.assertGreater(len(content), BDecoder.MMAP_THRESHOLD + 1024 * 1024)
+        reader = FakeStreamReader(self.loop, content)
+        self.assertEqual(
+            self.run_async(lambda: async_parse(reader, chunk_size=5000)), data,
+        )
+
+    def test_async_parse_error(self):
+        reader = FakeStreamReader(self.loop, b'd4:info')
+        with self.assertRaises(InvalidTorrentDataException):
+            self.run_async(lambda: async_parse(reader))
+
+    def test_async_parse_file_and_create(self):
+        expected = parse_torrent_file(self.REAL_FILE)
+        data = self.run_async(lambda: async_parse_file(self.REAL_FILE))
+        self.assertEqual(data, expected)
+
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            filename = os.path.join(tmp_dir, 'out.torrent')
+            self.run_async(lambda: async_create(filename, data))
+            self.assertEqual(parse_torrent_file(filename), expected)
+        finally:
+            shutil.rmtree(tmp_dir)
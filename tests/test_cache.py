@@ -0,0 +1,91 @@
+from __future__ import unicode_literals
+
+import copy
+import os
+import os.path
+import pickle
+import shutil
+import tempfile
+import unittest
+
+from torrent_parser import (
+    FrozenDict,
+    FrozenList,
+    ParseCache,
+    create_torrent_file,
+    encode,
+    parse_torrent_file,
+)
+
+
+class TestParseCache(unittest.TestCase):
+    TEST_FILES_DIR = os.path.join(os.path.dirname(__file__), 'test_files')
+    REAL_FILE = os.path.join(TEST_FILES_DIR, 'real.torrent')
+    REAL_FILE_V2 = os.path.join(TEST_FILES_DIR, 'bittorrent-v2-test.torrent')
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_hit_and_miss(self):
+        cache = ParseCache()
+        data = cache.parse_torrent_file(self.REAL_FILE)
+        self.assertEqual(data, parse_torrent_file(self.REAL_FILE))
+        self.assertIs(cache.parse_torrent_file(self.REAL_FILE), data)
+        self.assertIsNot(
+            cache.parse_torrent_file(self.REAL_FILE, hash_raw=True), data
+        )
+        self.assertEqual((cache.hits, cache.misses, len(cache)), (1, 2, 2))
+
+    def test_file_changed(self):
+        filename = os.path.join(self.tmp_dir, 'a.torrent')
+        create_torrent_file(filename, {'a': 1})
+        cache = ParseCache()
+        self.assertEqual(cache.parse_torrent_file(filename), {'a': 1})
+        create_torrent_file(filename, {'a': 22})
+        self.assertEqual(cache.parse_torrent_file(filename), {'a': 22})
+        self.assertEqual(cache.misses, 2)
+
+    def test_eviction(self):
+        cache = ParseCache(max_entries=2)
+        cache.parse_torrent_file(self.REAL_FILE)
+        cache.parse_torrent_file(self.REAL_FILE_V2)
+        cache.parse_torrent_file(self.REAL_FILE)
+        cache.parse_torrent_file(self.REAL_FILE, hash_raw=True)
+        self.assertEqual(cache.evictions, 1)
+        cache.parse_torrent_file(self.REAL_FILE)
+        self.assertEqual(cache.hits, 2)
+        self.assertEqual(cache.size, 2 * os.path.getsize(self.REAL_FILE))
+
+        cache = ParseCache(max_bytes=os.path.getsize(self.REAL_FILE) - 1)
+        cache.parse_torrent_file(self.REAL_FILE)
+        cache.parse_torrent_file(self.REAL_FILE_V2)
+        self.assertEqual((len(cache), cache.evictions), (1, 0))
+
+    def test_read_only(self):
+        data = ParseCache().parse_torrent_file(self.REAL_FILE)
+        self.assertIsInstance(data, FrozenDict)
+        self.assertIsInstance(data['announce-list'], FrozenList)
+        with self.assertRaises(TypeError):
+            data['a'] = 1
+        with self.assertRaises(TypeError):
+            data['info'].update({'a': 1})
+        with self.assertRaises(TypeError):
+            data['announce-list'].append([])
+        with self.assertRaises(TypeError):
+            data['announce-list'][0][0] = ''
+
+    def test_copy(self):
+        data = ParseCache().parse_torrent_file(self.REAL_FILE)
+        mutable = copy.deepcopy(data)
+        self.assertIs(type(mutable), dict)
+        self.assertIs(type(mutable['announce-list'][0]), list)
+        mutable['announce-list'][0].append('x')
+        self.assertNotEqual(mutable, data)
+        self.assertEqual(pickle.loads(pickle.dumps(data)), data)
+        self.assertEqual(
+            encode(data, hash_fields=['pieces']),
+            encode(parse_torrent_file(self.REAL_FILE), hash_fields=['pieces']),
+        )
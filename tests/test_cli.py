@@ -0,0 +1,169 @@
+from __future__ import unicode_literals
+
+import io
+import json
+import os
+import os.path
+import shutil
+import sys
+import tempfile
+import unittest
+
+import torrent_parser
+from torrent_parser import create_torrent_file, parse_torrent_file
+
+# module level function, its name would be mangled in class body
+main = getattr(torrent_parser, '__main')
+
+
+class TestCLI(unittest.TestCase):
+    TEST_FILES_DIR = os.path.join(os.path.dirname(__file__), 'test_files')
+    REAL_FILE = os.path.join(
+        TEST_FILES_DIR, 'xubuntu-22.04-desktop-amd64.iso.torrent'
+    )
+    INFO_HASH = 'f435d2324f313bad7ff941633320fe4d1c9c3079'
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.multi = os.path.join(self.tmp_dir, 'multi.torrent')
+        create_torrent_file(self.multi, {
+            'info': {'name': 'm', 'files': [
+                {'length': 1, 'path': ['a']},
+                {'length': 2, 'path': ['b', 'c']},
+            ]},
+        })
+        self.single = os.path.join(self.tmp_dir, 'single.torrent')
+        create_torrent_file(self.single, {'info': {'name': 's', 'length': 3}})
+        self.bad = os.path.join(self.tmp_dir, 'bad.torrent')
+        with open(self.bad, 'wb') as f:
+            f.write(b'd4:infod4:name')
+        self.sub = os.path.join(self.tmp_dir, 'sub')
+        os.mkdir(self.sub)
+        self.nested = os.path.join(self.sub, 'nested.torrent')
+        create_torrent_file(self.nested, {'info': {'name': 'n', 'length': 4}})
+        with open(os.path.join(self.tmp_dir, 'other.txt'), 'wb') as f:
+            f.write(b'not a torrent')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def run_main(self, *argv, **kwargs):
+        stdin = io.TextIOWrapper(io.BytesIO(kwargs.get('stdin', b'')))
+        stdout = io.StringIO()
+        saved = sys.argv, sys.stdin, sys.stdout
+        sys.argv = ['torrent_parser'] + list(argv)
+        sys.stdin, sys.stdout = stdin, stdout
+        try:
+            main()
+        finally:
+            sys.argv, sys.stdin, sys.stdout = saved
+        return [json.loads(line) for line in stdout.getvalue().splitlines()]
+
+    def test_single_file(self):
+        data, = self.run_main(self.REAL_FILE)
+        self.assertEqual(
+            data['info']['name'], parse_torrent_file(self.REAL_FILE)['info']['name']
+        )
+        self.assertNotIn('path', data)
+
+    def test_stdin(self):
+        with open(self.single, 'rb') as f:
+            content = f.read()
+        data, = self.run_main(stdin=content)
+        self.assertEqual(data, {'info': {'name': 's', 'length': 3}})
+
+    def test_ndjson(self):
+        record, = self.run_main('--ndjson', self.single)
+        self.assertEqual(list(record), [
+            'path', 'info_hash_v1', 'info_hash_v2', 'data',
+        ])
+        self.assertEqual(record['path'], self.single)
+        self.assertIsNone(record['info_hash_v2'])
+        self.assertEqual(record['data'], {'info': {'name': 's', 'length': 3}})
+
+    def test_ndjson_stdin(self):
+        with open(self.REAL_FILE, 'rb') as f:
+            content = f.read()
+        record, = self.run_main('--ndjson', '-q', 'info.name', stdin=content)
+        self.assertEqual(record['path'], '-')
+        self.assertEqual(record['info_hash_v1'], self.INFO_HASH)
+        self.assertEqual(
+            record['data'], {'info.name': 'xubuntu-22.04-desktop-amd64.iso'}
+        )
+
+        record, = self.run_main('--ndjson', stdin=b'd4:infod4:name')
+        self.assertEqual(list(record), ['path', 'error'])
+        self.assertEqual(record['path'], '-')
+
+    def test_error_record(self):
+        records = self.run_main('--ordered', self.single, self.bad)
+        self.assertEqual([r['path'] for r in records], [self.single, self.bad])
+        self.assertNotIn('error', records[0])
+        self.assertEqual(list(records[1]), ['path', 'error'])
+        self.assertIn('EOF', records[1]['error'])
+
+    def test_directory(self):
+        records = self.run_main('--ordered', self.tmp_dir)
+        self.assertEqual(
+            [r['path'] for r in records], [self.bad, self.multi, self.single],
+        )
+
+        # one directory is a batch too
+        records = self.run_main('--ordered', '--recursive', self.tmp_dir)
+        self.assertEqual(
+            [r['path'] for r in records],
+            [self.bad, self.multi, self.single, self.nested],
+        )
+
+    def test_jobs(self):
+        paths = [self.single, self.bad, self.multi, self.nested] * 4
+        records = self.run_main('--jobs', '2', '--ordered', *paths)
+        self.assertEqual([r['path'] for r in records], paths)
+        records = self.run_main('-j', '2', *paths)
+        self.assertEqual(
+            sorted(r['path'] for r in records), sorted(paths),
+        )
+
+    def test_query(self):
+        lines = self.run_main(
+            self.REAL_FILE, '-q', 'info.name', '-q', 'info.length', '-q', 'nope',
+        )
+        self.assertEqual(
+            lines, ['xubuntu-22.04-desktop-amd64.iso', 2701512704, None],
+        )
+
+    def test_query_all_items(self):
+        lines = self.run_main(
+            self.multi, '-q', 'info.files[*].length', '-q', 'info.files[*].path',
+        )
+        self.assertEqual(lines, [[1, 2], [['a'], ['b', 'c']]])
+
+    def test_query_many_files(self):
+        records = self.run_main(
+            '--ordered',
+            '-q', 'info.name',
+            '-q', 'info.files[*].length',
+            self.multi,
+            self.single,
+        )
+        self.assertEqual(records[0]['data'], {
+            'info.name': 'm', 'info.files[*].length': [1, 2],
+        })
+        self.assertEqual(list(records[0]['data']), [
+            'info.name', 'info.files[*].length',
+        ])
+        self.assertEqual(records[1]['data'], {
+            'info.name': 's', 'info.files[*].length': None,
+        })
+        self.assertIsNotNone(records[1]['info_hash_v1'])
+
+    def test_query_invalid_path(self):
+        stderr = io.StringIO()
+        saved, sys.stderr = sys.stderr, stderr
+        try:
+            with self.assertRaises(SystemExit) as cm:
+                self.run_main(self.single, '-q', 'info[')
+        finally:
+            sys.stderr = saved
+        self.assertEqual(cm.exception.code, 1)
+        self.assertIn('Invalid path', stderr.getvalue())
@@ -4,9 +4,16 @@ import collections
 import hashlib
 import io
 import os.path
+import shutil
+import tempfile
 import unittest
 
-from torrent_parser import BEncoder, TorrentFileCreator, TorrentFileParser
+from torrent_parser import (
+    BEncoder,
+    TorrentFileCreator,
+    TorrentFileParser,
+    create_torrent_file,
+)
 
 
 class TestCreate(unittest.TestCase):
@@ -47,3 +54,37 @@ class TestCreate(unittest.TestCase):
     def test_dont_need_dict_outmost(self):
         data = 123456
         self.assertEqual(BEncoder(data).encode(), b"i123456e")
+
+    def test_encode_to(self):
+        data = collections.OrderedDict()
+        data["a"] = [b"x" * 100, memoryview(b"yz")]
+        data["b"] = 1
+        out = io.BytesIO()
+        BEncoder(data).encode_to(out, chunk_size=8)
+        self.assertEqual(out.getvalue(), b"d1:al100:" + b"x" * 100 + b"2:yze1:bi1ee")
+
+    def test_encode_to_sendall(self):
+        class Socket(object):
+            def __init__(self):
+                self.chunks = []
+
+            def sendall(self, data):
+                self.chunks.append(bytes(data))
+
+        sock = Socket()
+        BEncoder([b"abc", 123]).encode_to(sock, chunk_size=4)
+        self.assertEqual(b"".join(sock.chunks), b"l3:abci123ee")
+        self.assertGreater(len(sock.chunks), 1)
+
+    def test_create_streaming(self):
+        with open(self.REAL_FILE, "rb") as fp:
+            in_data = fp.read()
+        data = TorrentFileParser(io.BytesIO(in_data), True).parse()
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            filename = os.path.join(tmp_dir, "new.torrent")
+            create_torrent_file(filename, data, streaming=True)
+            with open(filename, "rb") as fp:
+                self.assertEqual(fp.read(), in_data)
+        finally:
+            shutil.rmtree(tmp_dir)
@@ -1,11 +1,56 @@
 from __future__ import unicode_literals
 
+import io
 import unittest
 
-from torrent_parser import decode
+from torrent_parser import InvalidTorrentDataException, decode, extract, iterparse
 
 
 class TestDecode(unittest.TestCase):
 
     def test_decode(self):
         self.assertEqual(decode(b'i12345e'), 12345)
+
+    def test_decode_buffer_types(self):
+        data = b'd1:ai-1e1:bl3:abcee'
+        expected = {'a': -1, 'b': ['abc']}
+        self.assertEqual(decode(data), expected)
+        self.assertEqual(decode(bytearray(data)), expected)
+        self.assertEqual(decode(memoryview(data)), expected)
+        self.assertEqual(decode(io.BytesIO(data)), expected)
+
+    def test_error_position(self):
+        with self.assertRaisesRegex(InvalidTorrentDataException, 'pos 3$'):
+            decode(b'i12x4e')
+        with self.assertRaisesRegex(InvalidTorrentDataException, 'Unexpected EOF'):
+            decode(b'l1:a')
+        with self.assertRaisesRegex(InvalidTorrentDataException, 'at pos 5$'):
+            decode(b'i12ei')
+
+    def test_deep_nesting(self):
+        data = b'l' * 5000 + b'e' * 5000
+        with self.assertRaisesRegex(InvalidTorrentDataException, 'max depth'):
+            decode(data)
+        result = decode(data, max_depth=5000)
+        for _ in range(4999):
+            result = result[0]
+        self.assertEqual(result, [])
+        with self.assertRaises(InvalidTorrentDataException):
+            decode(b'd1:ad1:ad1:ai1eeee', max_depth=2)
+
+    def test_invalid_values(self):
+        for data in (
+            b'd8:encoding4:nope1:a1:be',
+            b'd1:ad8:encodingi1ee1:b1:ce',
+            b'd8:encodingle1:a1:be',
+            b'd8:encoding1:\xff1:a1:be',
+            b'd1:a-1:be',
+        ):
+            with self.assertRaises(InvalidTorrentDataException):
+                decode(data)
+            with self.assertRaises(InvalidTorrentDataException):
+                decode(data, lazy=True)
+            with self.assertRaises(InvalidTorrentDataException):
+                extract(data, ['a'])
+        with self.assertRaises(InvalidTorrentDataException):
+            list(iterparse(io.BytesIO(b'd8:encoding4:nope1:a1:be')))
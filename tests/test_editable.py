@@ -0,0 +1,102 @@
+from __future__ import unicode_literals
+
+import io
+import os.path
+import shutil
+import tempfile
+import unittest
+
+from torrent_parser import (
+    BEncoder,
+    EditableDict,
+    EditableList,
+    TorrentFileCreator,
+    TorrentFileParser,
+    create_torrent_file,
+    decode,
+    encode,
+    parse_torrent_file,
+)
+
+
+class TestEditable(unittest.TestCase):
+    TEST_FILES_DIR = os.path.join(os.path.dirname(__file__), 'test_files')
+    REAL_FILE = os.path.join(TEST_FILES_DIR, 'real.torrent')
+    REAL_FILE_V2 = os.path.join(TEST_FILES_DIR, 'bittorrent-v2-test.torrent')
+
+    # keys of info are not sorted and name is not valid utf-8, eager decoding
+    # and encoding changes both of them
+    QUIRKY = b'd8:announce1:a4:infod4:name2:\xff\xfe6:lengthi1eee'
+
+    def test_types(self):
+        data = decode(b'd1:ald1:bi1eee1:ci2ee', editable=True)
+        self.assertIsInstance(data, EditableDict)
+        self.assertIsInstance(data['a'], EditableList)
+        self.assertIsInstance(data['a'][0], EditableDict)
+        self.assertEqual(data, {'a': [{'b': 1}], 'c': 2})
+
+    def test_encode_back(self):
+        for filename in (self.REAL_FILE, self.REAL_FILE_V2):
+            with open(filename, 'rb') as f:
+                content = f.read()
+            data = TorrentFileParser(io.BytesIO(content), editable=True).parse()
+            self.assertEqual(data, parse_torrent_file(filename))
+            self.assertEqual(
+                TorrentFileCreator(data).create_filelike().read(), content,
+            )
+
+    def test_info_is_kept(self):
+        data = decode(self.QUIRKY, errors='replace', editable=True)
+        self.assertEqual(data['info']['name'], '��')
+        data['announce'] = 'http://tracker'
+        data['announce-list'] = [['http://tracker']]
+        self.assertEqual(
+            encode(data),
+            b'd8:announce14:http://tracker4:infod4:name2:\xff\xfe6:lengthi1ee'
+            b'13:announce-listll14:http://trackereee',
+        )
+
+    def test_edit(self):
+        data = decode(b'd1:ali1ei2ei3ee1:bd1:ci1e1:di2eee', editable=True)
+        data['a'].append(4)
+        del data['a'][0]
+        data['a'][0:1] = [5, 6]
+        data['b']['c'] = 7
+        del data['b']['d']
+        data['b']['e'] = 8
+        self.assertEqual(data, {'a': [5, 6, 3, 4], 'b': {'c': 7, 'e': 8}})
+        self.assertEqual(encode(data), b'd1:ali5ei6ei3ei4ee1:bd1:ci7e1:ei8eee')
+
+    def test_encode_to_and_length(self):
+        with open(self.REAL_FILE, 'rb') as f:
+            content = f.read()
+        data = TorrentFileParser(io.BytesIO(content), editable=True).parse()
+        data['announce'] = 'http://tracker'
+        data['info']['name'] = 'new name'
+        encoder = BEncoder(data, hash_fields=['pieces', 'ed2k', 'filehash'])
+        expected = encoder.encode()
+        self.assertEqual(encoder.encoded_length(), len(expected))
+        f = io.BytesIO()
+        encoder.encode_to(f, chunk_size=16)
+        self.assertEqual(f.getvalue(), expected)
+        data = parse_torrent_file(self.REAL_FILE)
+        data['announce'] = 'http://tracker'
+        data['info']['name'] = 'new name'
+        self.assertEqual(TorrentFileCreator(data).create_filelike().read(), expected)
+
+    def test_overwrite_file(self):
+        tmp_dir = tempfile.mkdtemp()
+        try:
+            filename = os.path.join(tmp_dir, 'a.torrent')
+            shutil.copy(self.REAL_FILE_V2, filename)
+            with open(filename, 'rb') as f:
+                parser = TorrentFileParser(f, editable=True)
+                data = parser.parse()
+            data['announce'] = 'http://tracker'
+            create_torrent_file(filename, data)
+            with open(filename, 'rb') as f:
+                new = TorrentFileParser(f)
+                self.assertEqual(new.parse()['announce'], 'http://tracker')
+            self.assertEqual(new.info_hash_v2, parser.info_hash_v2)
+        finally:
+            shutil.rmtree(tmp_dir)
@@ -1,11 +1,39 @@
 from __future__ import unicode_literals
 
+import collections
+import os.path
 import unittest
 
-from torrent_parser import encode
+from torrent_parser import (
+    BEncoder,
+    TorrentFileCreator,
+    TorrentFileParser,
+    encode,
+    parse_torrent_file,
+)
 
 
 class TestEncode(unittest.TestCase):
+    TEST_FILES_DIR = os.path.join(os.path.dirname(__file__), 'test_files')
+    REAL_FILE = os.path.join(TEST_FILES_DIR, 'real.torrent')
 
     def test_encode(self):
         self.assertEqual(encode(12345), b'i12345e')
+
+    def test_encode_subclass(self):
+        class MyDict(collections.OrderedDict):
+            pass
+
+        class MyStr(str):
+            pass
+
+        data = MyDict([('b', [MyStr('x'), 1]), ('a', b'\x00')])
+        self.assertEqual(encode(data), b'd1:bl1:xi1ee1:a1:\x00e')
+
+    def test_encoded_length(self):
+        data = parse_torrent_file(self.REAL_FILE)
+        content = TorrentFileCreator(data).create_filelike().getvalue()
+        hash_fields = list(TorrentFileParser.HASH_FIELD_DEFAULT_PARAMS)
+        encoder = BEncoder(data, hash_fields=hash_fields)
+        self.assertEqual(encoder.encoded_length(), len(content))
+        self.assertEqual(BEncoder({'a': ['中文', -1]}).encoded_length(), 19)
@@ -0,0 +1,101 @@
+from __future__ import unicode_literals
+
+import io
+import os.path
+import unittest
+import warnings
+
+import torrent_parser
+from torrent_parser import BDecoder, TorrentFileParser, decode, encode
+
+
+class TestEncodingAuto(unittest.TestCase):
+    TEST_FILES_DIR = os.path.join(os.path.dirname(__file__), 'test_files')
+    REAL_FILE = os.path.join(TEST_FILES_DIR, 'real.torrent')
+
+    def setUp(self):
+        self.samples = []
+        self._detect = torrent_parser._detect
+
+        def fake_detect(raw):
+            self.samples.append(raw)
+            return {'encoding': 'GB2312', 'confidence': 0.8}
+
+        torrent_parser._detect = fake_detect
+
+    def tearDown(self):
+        torrent_parser._detect = self._detect
+
+    def make(self, count, encoding=None):
+        files = [
+            {
+                'length': 1,
+                'path': ['目录'.encode('gbk'), '文件{}'.format(i).encode('gbk')],
+            }
+            for i in range(count)
+        ]
+        data = {
+            'announce': 'http://tracker',
+            'info': {
+                'files': files,
+                'name': '名字'.encode('gbk'),
+                'piece length': 16384,
+                'pieces': b'\x00' * 20,
+            },
+        }
+        if encoding is not None:
+            data['encoding'] = encoding
+        return encode(data, hash_fields=[])
+
+    def parse(self, content):
+        parser = TorrentFileParser(io.BytesIO(content), encoding='auto')
+        return parser, parser.parse()
+
+    def test_detect_once(self):
+        parser, data = self.parse(self.make(10000))
+        self.assertEqual(len(self.samples), 1)
+        self.assertEqual(len(self.samples[0]), BDecoder.ENCODING_SAMPLE_SIZE)
+        self.assertEqual(parser.detected_encoding, 'gb18030')
+        self.assertEqual(parser.encoding_confidence, 0.8)
+        self.assertEqual(data['info']['name'], '名字')
+        self.assertEqual(data['info']['files'][-1]['path'], ['目录', '文件9999'])
+
+    def test_encoding_field(self):
+        parser, data = self.parse(self.make(10, 'GBK'))
+        self.assertEqual(self.samples, [])
+        self.assertEqual(parser.detected_encoding, 'gbk')
+        self.assertEqual(parser.encoding_confidence, 1.0)
+        self.assertEqual(data['info']['name'], '名字')
+
+    def test_utf8(self):
+        with open(self.REAL_FILE, 'rb') as f:
+            parser, _ = self.parse(f.read())
+        self.assertEqual(self.samples, [])
+        self.assertEqual(parser.detected_encoding, 'utf-8')
+        self.assertEqual(parser.encoding_confidence, 1.0)
+
+    def test_fallback_per_string(self):
+        content = b'd4:infod4:name3:abc5:otheri1ee7:comment2:\xd6\xd0e'
+        data = decode(content, encoding='auto')
+        self.assertEqual(data['comment'], '中')
+        self.assertEqual(self.samples, [b'\xd6\xd0'])
+
+        # not valid in detected encoding either
+        data = decode(content.replace(b'\xd6\xd0', b'\xff\xff'),
+                      encoding='auto', errors='usebytes')
+        self.assertEqual(data['comment'], b'\xff\xff')
+
+    def test_no_chardet(self):
+        torrent_parser._detect = torrent_parser._detect_fallback
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            # same result as it always was
+            self.assertEqual(
+                torrent_parser._detect(b'\xd6\xd0'),
+                {'encoding': 'utf-8', 'confidence': 1},
+            )
+            parser, data = self.parse(self.make(10))
+        # but names are not utf-8, so it is only a guess
+        self.assertEqual(parser.detected_encoding, 'utf-8')
+        self.assertEqual(parser.encoding_confidence, 0.0)
+        self.assertEqual(data['info']['name'], '名字'.encode('gbk'))
@@ -0,0 +1,67 @@
+from __future__ import unicode_literals
+
+import os.path
+import unittest
+
+from torrent_parser import (
+    InvalidTorrentDataException,
+    extract,
+    extract_torrent_file,
+    parse_torrent_file,
+)
+
+
+class TestExtract(unittest.TestCase):
+    TEST_FILES_DIR = os.path.join(os.path.dirname(__file__), "test_files")
+    REAL_FILE = os.path.join(TEST_FILES_DIR, "real.torrent")
+
+    def test_extract(self):
+        data = b"d1:ali1ei2ee1:bd1:ci3eee"
+        self.assertEqual(
+            extract(data, ["a", "a[1]", "b.c", "b.d", "a[5]"]),
+            {"a": [1, 2], "a[1]": 2, "b.c": 3},
+        )
+        self.assertEqual(extract(data, [""]), {"": {"a": [1, 2], "b": {"c": 3}}})
+
+    def test_extract_all_items(self):
+        data = b"ld1:ai1eed1:bi2eed1:ai3eee"
+        self.assertEqual(extract(data, ["[*].a"]), {"[*].a": [1, 3]})
+
+    def test_quoted_key(self):
+        data = b"d3:a.bi1ee"
+        self.assertEqual(extract(data, ['["a.b"]']), {'["a.b"]': 1})
+
+    def test_same_as_parse(self):
+        data = parse_torrent_file(self.REAL_FILE)
+        result = extract_torrent_file(
+            self.REAL_FILE,
+            ["info.name", "info.files[*].length", "announce-list", "info.pieces"],
+        )
+        self.assertEqual(result["info.name"], data["info"]["name"])
+        self.assertEqual(
+            result["info.files[*].length"],
+            [f["length"] for f in data["info"]["files"]],
+        )
+        self.assertEqual(result["announce-list"], data["announce-list"])
+        self.assertEqual(result["info.pieces"], data["info"]["pieces"])
+
+    def test_skipped_value_is_not_decoded(self):
+        data = b"d1:a1:\xff1:b1:be"
+        self.assertEqual(extract(data, ["b"]), {"b": "b"})
+        with self.assertRaises(InvalidTorrentDataException):
+            extract(data, ["a"])
+
+    def test_invalid_path(self):
+        with self.assertRaises(ValueError):
+            extract(b"i1e", ["a..b"])
+
+    def test_irregular_int_same_as_decode(self):
+        data = b"d1:aie1:bi-e1:cli1-2ei007ee1:di1ee"
+        self.assertEqual(
+            extract(data, ["a", "b", "c[*]", "d"]),
+            {"a": 0, "b": 0, "c[*]": [-12, 7], "d": 1},
+        )
+        # skipped values are accepted like decode too
+        self.assertEqual(extract(data, ["d"]), {"d": 1})
+        with self.assertRaises(InvalidTorrentDataException):
+            extract(b"d1:ai--1e1:di1ee", ["d"])
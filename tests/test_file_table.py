@@ -0,0 +1,114 @@
+from __future__ import unicode_literals
+
+import collections
+import copy
+import io
+import os.path
+import pickle
+import unittest
+
+from torrent_parser import (
+    FileTable,
+    TorrentFileCreator,
+    TorrentFileParser,
+    encode,
+    parse_torrent_file,
+)
+
+
+class TestFileTable(unittest.TestCase):
+    TEST_FILES_DIR = os.path.join(os.path.dirname(__file__), 'test_files')
+    REAL_FILE = os.path.join(TEST_FILES_DIR, 'real.torrent')
+
+    FILES = [
+        collections.OrderedDict([('length', 10), ('path', ['a', 'b'])]),
+        collections.OrderedDict([
+            ('attr', 'p'), ('length', 0), ('path', ['.pad', '0']),
+        ]),
+        # keys not in order are kept
+        collections.OrderedDict([
+            ('path', ['a', 'c']), ('md5sum', 'x' * 32), ('length', 5),
+        ]),
+        collections.OrderedDict([('length', 7), ('path', ['d'])]),
+    ]
+
+    def parse(self, files, **kwargs):
+        content = encode({
+            'info': collections.OrderedDict([
+                ('files', files), ('name', 'n'), ('piece length', 16384),
+            ]),
+        })
+        parser = TorrentFileParser(io.BytesIO(content), file_table=True, **kwargs)
+        return content, parser.parse()
+
+    def test_columns(self):
+        _, data = self.parse(self.FILES)
+        table = data['info']['files']
+        self.assertIsInstance(table, FileTable)
+        self.assertEqual(list(table.lengths), [10, 0, 5, 7])
+        self.assertEqual(list(table.offsets), [0, 10, 10, 15])
+        self.assertEqual(table.paths[2], ('a', 'c'))
+        self.assertIs(table.paths[0][0], table.paths[2][0])
+        self.assertEqual(table.total_length, 22)
+        self.assertEqual([table.file_at(x) for x in (0, 9, 10, 14, 15, 21)],
+                         [0, 0, 2, 2, 3, 3])
+        with self.assertRaises(IndexError):
+            table.file_at(22)
+
+    def test_items(self):
+        _, data = self.parse(self.FILES, use_ordered_dict=True)
+        table = data['info']['files']
+        self.assertEqual(table, self.FILES)
+        self.assertEqual(list(table[2].items()), list(self.FILES[2].items()))
+        self.assertEqual(table[-1], self.FILES[-1])
+        self.assertEqual(table[1:3], self.FILES[1:3])
+        self.assertEqual(len(table), 4)
+        with self.assertRaises(IndexError):
+            table[4]
+        self.assertEqual(pickle.loads(pickle.dumps(table)), table)
+
+    def test_encode_back(self):
+        content, data = self.parse(self.FILES)
+        self.assertEqual(encode(data), content)
+
+        with open(self.REAL_FILE, 'rb') as f:
+            content = f.read()
+        data = parse_torrent_file(self.REAL_FILE, file_table=True)
+        self.assertIsInstance(data['info']['files'], FileTable)
+        self.assertEqual(data, parse_torrent_file(self.REAL_FILE))
+        self.assertEqual(TorrentFileCreator(data).create_filelike().read(), content)
+
+    def test_read_only_items(self):
+        _, data = self.parse(self.FILES)
+        table = data['info']['files']
+        item = table[0]
+        with self.assertRaises(TypeError):
+            item['length'] = 1
+        with self.assertRaises(TypeError):
+            item['path'].append('x')
+        with self.assertRaises(TypeError):
+            table[1].update(attr='x')
+        self.assertEqual(table[0], self.FILES[0])
+        self.assertEqual(copy.deepcopy(item), self.FILES[0])
+        copy.deepcopy(item)['path'].append('x')
+
+    def test_invalid_file_is_kept_as_list(self):
+        files = self.FILES + [{'length': -1, 'path': ['e']}]
+        _, data = self.parse(files)
+        self.assertIsInstance(data['info']['files'], list)
+        with self.assertRaises(ValueError):
+            FileTable([{'length': 1, 'path': 'e'}])
+
+        # files decoded before the invalid one are normal dicts too
+        files = self.FILES[:2] + [{'length': 1, 'path': 'e'}] + self.FILES[2:]
+        _, data = self.parse(files, use_ordered_dict=True)
+        self.assertEqual(data['info']['files'], files)
+        for item in data['info']['files']:
+            self.assertIs(type(item), collections.OrderedDict)
+        data['info']['files'][0]['path'].append('x')
+
+        # valid bencode, but a path item can't be in the table
+        for item in (['e', ['f']], ['e', {'f': 1}]):
+            files = self.FILES + [{'length': 1, 'path': item}]
+            _, data = self.parse(files)
+            self.assertEqual(data['info']['files'], files)
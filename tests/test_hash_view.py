@@ -0,0 +1,73 @@
+from __future__ import unicode_literals
+
+import json
+import os.path
+import unittest
+
+from torrent_parser import (
+    DataWrapper,
+    JSONEncoderDataWrapperBytesToString,
+    PiecesView,
+    TorrentFileCreator,
+    TorrentFileParser,
+    decode,
+    parse_torrent_file,
+)
+
+
+class TestHashView(unittest.TestCase):
+    TEST_FILES_DIR = os.path.join(os.path.dirname(__file__), 'test_files')
+    REAL_FILE = os.path.join(TEST_FILES_DIR, 'real.torrent')
+
+    def test_view_decode(self):
+        data = b'd6:pieces8:\xAA\xBB\xCC\xDD\x00\x01\x02\x03e'
+        res = decode(data, hash_fields={'pieces': (4, True)}, hash_view=True)
+        pieces = res['pieces']
+        self.assertIsInstance(pieces, PiecesView)
+        self.assertEqual(len(pieces), 2)
+        self.assertEqual(pieces[0], 'aabbccdd')
+        self.assertEqual(pieces[-1], '00010203')
+        self.assertEqual(pieces.raw(1), b'\x00\x01\x02\x03')
+        self.assertEqual(list(pieces), ['aabbccdd', '00010203'])
+        self.assertEqual(pieces, ['aabbccdd', '00010203'])
+        self.assertEqual(pieces[1:], ['00010203'])
+        self.assertEqual(pieces[::-1], ['00010203', 'aabbccdd'])
+        self.assertEqual(bytes(pieces), b'\xAA\xBB\xCC\xDD\x00\x01\x02\x03')
+        with self.assertRaises(IndexError):
+            pieces[2]
+
+    def test_single_block_is_str(self):
+        data = b'd4:hash4:\xAA\xBB\xCC\xDDe'
+        res = decode(data, hash_fields={'hash': (4, False)}, hash_view=True)
+        self.assertEqual(res['hash'], 'aabbccdd')
+
+    def test_hash_raw_precedence(self):
+        data = b'd6:pieces4:\xAA\xBB\xCC\xDDe'
+        res = decode(
+            data, hash_fields={'pieces': (4, True)},
+            hash_raw=True, hash_view=True,
+        )
+        self.assertEqual(res['pieces'], b'\xAA\xBB\xCC\xDD')
+
+    def test_same_as_list(self):
+        expected = parse_torrent_file(self.REAL_FILE)
+        res = parse_torrent_file(self.REAL_FILE, hash_view=True)
+        self.assertIsInstance(res['info']['pieces'], PiecesView)
+        self.assertEqual(res, expected)
+        lazy = parse_torrent_file(self.REAL_FILE, lazy=True, hash_view=True)
+        self.assertIsInstance(lazy['info']['pieces'], PiecesView)
+        self.assertEqual(lazy, expected)
+
+    def test_encode_round_trip(self):
+        with open(self.REAL_FILE, 'rb') as f:
+            content = f.read()
+            data = TorrentFileParser(f, hash_view=True).parse()
+        self.assertEqual(TorrentFileCreator(data).create_filelike().read(), content)
+
+    def test_json(self):
+        data = decode(
+            b'd6:pieces8:\xAA\xBB\xCC\xDD\x00\x01\x02\x03e',
+            hash_fields={'pieces': (4, True)}, hash_view=True,
+        )
+        res = json.dumps(DataWrapper(data), cls=JSONEncoderDataWrapperBytesToString)
+        self.assertEqual(json.loads(res), {'pieces': ['aabbccdd', '00010203']})
@@ -0,0 +1,105 @@
+from __future__ import unicode_literals
+
+import os
+import os.path
+import shutil
+import tempfile
+import unittest
+
+from torrent_parser import TorrentIndex, create_torrent_file
+
+
+class TestTorrentIndex(unittest.TestCase):
+    TEST_FILES_DIR = os.path.join(os.path.dirname(__file__), 'test_files')
+    INFO_HASH = 'f435d2324f313bad7ff941633320fe4d1c9c3079'
+    INFO_HASH_V2 = (
+        'caf1e1c30e81cb361b9ee167c4aa64228a7fa4fa9f6105232b28ad099f3a302e'
+    )
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.root = os.path.join(self.tmp_dir, 'torrents')
+        shutil.copytree(self.TEST_FILES_DIR, self.root)
+        self.index = TorrentIndex(os.path.join(self.tmp_dir, 'index.db'), jobs=1)
+
+    def tearDown(self):
+        self.index.close()
+        shutil.rmtree(self.tmp_dir)
+
+    def test_lookup(self):
+        count = len(os.listdir(self.root))
+        # outmost.string.torrent can't be parsed, neg.torrent has no info dict
+        self.assertEqual(self.index.scan(self.root), (count, 2, 0))
+        res, = self.index.lookup(self.INFO_HASH.upper())
+        self.assertEqual(res['name'], 'xubuntu-22.04-desktop-amd64.iso')
+        self.assertEqual(res['total_size'], 2701512704)
+        self.assertEqual(res['file_count'], 1)
+        self.assertEqual(res['piece_length'], 262144)
+        self.assertEqual(res['trackers'], ['https://torrent.ubuntu.com/announce'])
+        self.assertEqual(
+            self.index.files(res['path']),
+            [('xubuntu-22.04-desktop-amd64.iso', 2701512704)],
+        )
+
+        res, = self.index.lookup(self.INFO_HASH_V2)
+        self.assertEqual(res['file_count'], 11)
+        self.assertEqual(len(self.index.files(res['path'])), 11)
+        paths = [r['path'] for r in self.index.find_by_file_size(27551708)]
+        self.assertEqual(paths, [res['path']])
+
+    def test_rescan(self):
+        self.index.scan(self.root)
+        self.assertEqual(self.index.scan(self.root), (0, 0, 0))
+
+        filename = os.path.join(self.root, 'sub', 'new.torrent')
+        os.mkdir(os.path.dirname(filename))
+        create_torrent_file(filename, {
+            'announce': 'http://tracker',
+            'info': {'name': 'a', 'files': [
+                {'length': 12345, 'path': ['b', 'c']},
+            ]},
+        })
+        os.remove(os.path.join(self.root, 'real.torrent'))
+        self.assertEqual(self.index.scan(self.root), (1, 0, 1))
+        res, = self.index.find_by_file_size(12345)
+        self.assertEqual(res['path'], filename)
+        self.assertEqual(res['trackers'], ['http://tracker'])
+        self.assertEqual(self.index.files(filename), [('b/c', 12345)])
+
+        # a changed failed file is parsed again
+        with open(os.path.join(self.root, 'neg.torrent'), 'ab') as f:
+            f.write(b'x')
+        self.assertEqual(self.index.scan(self.root), (1, 1, 0))
+
+    def test_malformed(self):
+        root = os.path.join(self.tmp_dir, 'malformed')
+        os.mkdir(root)
+        cases = {
+            'files.torrent': {'info': {'name': 'a', 'files': [1, 2]}},
+            'length.torrent': {'info': {'name': 'a', 'length': 'abc'}},
+            'path.torrent': {'info': {'name': 'a', 'files': [
+                {'length': 1, 'path': 'b'},
+            ]}},
+            'tier.torrent': {
+                'announce-list': ['http://tracker'],
+                'info': {'name': 'a', 'length': 1},
+            },
+        }
+        for filename, data in cases.items():
+            create_torrent_file(os.path.join(root, filename), data)
+        good = os.path.join(root, 'good.torrent')
+        create_torrent_file(good, {'info': {'name': 'a', 'length': 54321}})
+
+        self.assertEqual(self.index.scan(root), (len(cases) + 1, len(cases), 0))
+        res, = self.index.find_by_file_size(54321)
+        self.assertEqual(res['path'], good)
+        errors = dict(self.index._db.execute(
+            'SELECT path, error FROM torrents WHERE error IS NOT NULL'
+        ))
+        self.assertEqual(
+            sorted(errors), sorted(os.path.join(root, f) for f in cases),
+        )
+        self.assertIn('info.files item', errors[os.path.join(root, 'files.torrent')])
+        self.assertIn('info.length', errors[os.path.join(root, 'length.torrent')])
+        # failed files are not parsed again
+        self.assertEqual(self.index.scan(root), (0, 0, 0))
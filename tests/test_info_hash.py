@@ -3,14 +3,23 @@ from __future__ import unicode_literals
 import binascii
 import hashlib
 import os.path
+import tempfile
 import unittest
 
-from torrent_parser import encode, parse_torrent_file
+from torrent_parser import (
+    InvalidTorrentDataException,
+    TorrentFileParser,
+    encode,
+    info_hash,
+    parse_torrent_file,
+)
 
 
 class TestInfoHash(unittest.TestCase):
     TEST_FILES_DIR = os.path.join(os.path.dirname(__file__), "test_files")
     REAL_FILE = os.path.join(TEST_FILES_DIR, "xubuntu-22.04-desktop-amd64.iso.torrent")
+    REAL_FILE_V2 = os.path.join(TEST_FILES_DIR, "bittorrent-v2-test.torrent")
+    INFO_HASH = "f435d2324f313bad7ff941633320fe4d1c9c3079"
 
     def test_info_hash_is_right(self):
         torrent = parse_torrent_file(self.REAL_FILE, hash_raw=True)
@@ -18,3 +27,88 @@ class TestInfoHash(unittest.TestCase):
         info_hash = binascii.hexlify(hashlib.sha1(info_bytes).digest()).decode()
         # print(f"info_hash: {info_hash}")
         self.assertEqual(info_hash, "f435d2324f313bad7ff941633320fe4d1c9c3079")
+
+    def test_info_hash_from_parser(self):
+        with open(self.REAL_FILE, "rb") as f:
+            parser = TorrentFileParser(f)
+            parser.parse()
+        self.assertEqual(parser.info_hash_v1, self.INFO_HASH)
+        self.assertIsNone(parser.info_hash_v2)
+
+    def test_info_hash_v2(self):
+        torrent = parse_torrent_file(self.REAL_FILE_V2, hash_raw=True)
+        info_bytes = encode(torrent["info"])
+        with open(self.REAL_FILE_V2, "rb") as f:
+            parser = TorrentFileParser(f)
+            parser.parse()
+        self.assertEqual(parser.info_hash_v2, hashlib.sha256(info_bytes).hexdigest())
+        self.assertEqual(info_hash(self.REAL_FILE_V2, 2), parser.info_hash_v2)
+
+    def test_info_hash_standalone(self):
+        self.assertEqual(info_hash(self.REAL_FILE), self.INFO_HASH)
+        with open(self.REAL_FILE, "rb") as f:
+            content = f.read()
+        self.assertEqual(info_hash(content), self.INFO_HASH)
+        self.assertIsNone(info_hash(b"d1:ai1ee"))
+
+    def test_info_hash_standalone_irregular_int(self):
+        # ints decode accepts are skipped the same way when finding info
+        content = b"d1:aie4:infod6:lengthi-ee1:zi1-0ee"
+        parser = TorrentFileParser(content)
+        parser.parse()
+        self.assertEqual(info_hash(content), parser.info_hash_v1)
+        self.assertEqual(
+            info_hash(content),
+            hashlib.sha1(b"d6:lengthi-ee").hexdigest(),
+        )
+
+    def test_info_hash_after_file_changed(self):
+        # hashes are computed when accessed, from info dict of the last parse
+        for lazy in (False, True):
+            tmp = tempfile.NamedTemporaryFile(delete=False)
+            try:
+                with open(self.REAL_FILE, "rb") as f:
+                    tmp.write(f.read())
+                tmp.close()
+                with open(tmp.name, "rb") as f:
+                    parser = TorrentFileParser(f, lazy=lazy)
+                    parser.parse()
+                with open(tmp.name, "wb") as f:
+                    f.write(b"d4:infod1:ai1eee")
+                self.assertEqual(parser.info_hash_v1, self.INFO_HASH)
+                self.assertIsNone(parser.info_hash_v2)
+            finally:
+                os.remove(tmp.name)
+
+        parser = TorrentFileParser(b"d1:ai1ee")
+        parser.parse()
+        self.assertIsNone(parser.info_hash_v1)
+        self.assertIsNone(parser.info_hash_v2)
+
+    def test_info_hash_lazy(self):
+        for filename in (self.REAL_FILE, self.REAL_FILE_V2):
+            with open(filename, "rb") as f:
+                eager = TorrentFileParser(f)
+                eager.parse()
+                lazy = TorrentFileParser(f, lazy=True)
+                lazy.parse()
+            self.assertEqual(lazy.info_hash_v1, eager.info_hash_v1)
+            self.assertEqual(lazy.info_hash_v2, eager.info_hash_v2)
+
+        # info dict is not decoded by parse, even its keys
+        content = b"d4:infodi1ei2eee"
+        parser = TorrentFileParser(content, lazy=True)
+        data = parser.parse()
+        self.assertEqual(parser.info_hash_v1, hashlib.sha1(content[7:-1]).hexdigest())
+        with self.assertRaises(InvalidTorrentDataException):
+            data["info"]
+
+        content = b"d4:infod12:meta versioni2eee"
+        parser = TorrentFileParser(content, lazy=True)
+        parser.parse()
+        self.assertEqual(
+            parser.info_hash_v2, hashlib.sha256(content[7:-1]).hexdigest()
+        )
+        parser = TorrentFileParser(b"d4:infod12:meta version1:2ee", lazy=True)
+        parser.parse()
+        self.assertIsNone(parser.info_hash_v2)
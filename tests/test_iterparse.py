@@ -0,0 +1,67 @@
+from __future__ import unicode_literals
+
+import io
+import os.path
+import unittest
+
+from torrent_parser import InvalidTorrentDataException, TorrentFileParser, iterparse
+
+
+class TestIterParse(unittest.TestCase):
+    TEST_FILES_DIR = os.path.join(os.path.dirname(__file__), "test_files")
+    REAL_FILE = os.path.join(TEST_FILES_DIR, "real.torrent")
+
+    def test_events(self):
+        events = list(iterparse(io.BytesIO(b"d1:ali1e2:bce1:di-2ee"), chunk_size=2))
+        self.assertEqual(
+            events,
+            [
+                ("start_dict",),
+                ("key", "a"),
+                ("start_list",),
+                ("int", 1),
+                ("string", "bc"),
+                ("end",),
+                ("key", "d"),
+                ("int", -2),
+                ("end",),
+            ],
+        )
+
+    def test_hash_field(self):
+        events = list(
+            iterparse(b"d6:pieces4:\xaa\xbb\xcc\xdde", hash_fields={"pieces": (2, True)})
+        )
+        self.assertIn(("string", ["aabb", "ccdd"]), events)
+
+    def test_usebytes(self):
+        events = list(iterparse(b"l1:\xffe", errors="usebytes"))
+        self.assertIn(("string", b"\xff"), events)
+
+    def test_multiple(self):
+        events = list(iterparse(io.BytesIO(b"i1e3:abci2e"), multiple=True))
+        self.assertEqual(events, [("int", 1), ("string", "abc"), ("int", 2)])
+        with self.assertRaises(InvalidTorrentDataException):
+            list(iterparse(io.BytesIO(b"i1e3:abc")))
+
+    def test_eof(self):
+        with self.assertRaises(InvalidTorrentDataException):
+            list(iterparse(io.BytesIO(b"d1:al1:a"), chunk_size=1))
+
+    def test_real_file(self):
+        with open(self.REAL_FILE, "rb") as f:
+            data = TorrentFileParser(f).parse()
+            f.seek(0)
+            events = list(
+                iterparse(
+                    f,
+                    errors="usebytes",
+                    hash_fields=TorrentFileParser.HASH_FIELD_DEFAULT_PARAMS,
+                    chunk_size=1024,
+                )
+            )
+        self.assertIn(("string", data["info"]["pieces"]), events)
+        self.assertEqual(
+            sum(1 for e in events if e == ("key", "length")),
+            len(data["info"]["files"]),
+        )
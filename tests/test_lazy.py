@@ -0,0 +1,86 @@
+from __future__ import unicode_literals
+
+import io
+import os.path
+import unittest
+
+from torrent_parser import (
+    InvalidTorrentDataException,
+    LazyDict,
+    LazyList,
+    TorrentFileCreator,
+    TorrentFileParser,
+    decode,
+    parse_torrent_file,
+)
+
+
+class TestLazy(unittest.TestCase):
+    TEST_FILES_DIR = os.path.join(os.path.dirname(__file__), "test_files")
+    REAL_FILE = os.path.join(TEST_FILES_DIR, "real.torrent")
+    REAL_FILE_V2 = os.path.join(TEST_FILES_DIR, "bittorrent-v2-test.torrent")
+
+    def test_lazy_types(self):
+        data = decode(b"d1:ald1:bi1eee1:ci2ee", lazy=True)
+        self.assertIsInstance(data, LazyDict)
+        self.assertIsInstance(data["a"], LazyList)
+        self.assertIsInstance(data["a"][0], LazyDict)
+        self.assertEqual(list(data), ["a", "c"])
+        self.assertEqual(data["c"], 2)
+        self.assertEqual(data, {"a": [{"b": 1}], "c": 2})
+
+    def test_same_as_eager(self):
+        for filename in (self.REAL_FILE, self.REAL_FILE_V2):
+            expected = parse_torrent_file(filename)
+            self.assertEqual(parse_torrent_file(filename, lazy=True), expected)
+
+    def test_value_is_cached(self):
+        data = parse_torrent_file(self.REAL_FILE, lazy=True)
+        self.assertIs(data["info"], data["info"])
+        self.assertIs(data["info"]["pieces"], data["info"]["pieces"])
+
+    def test_decode_error_when_access(self):
+        data = decode(b"d1:a1:\xff1:b1:be", lazy=True)
+        self.assertEqual(data["b"], "b")
+        with self.assertRaises(InvalidTorrentDataException):
+            data["a"]
+
+    def test_structure_error(self):
+        with self.assertRaises(InvalidTorrentDataException):
+            decode(b"d1:ali1ee", lazy=True)
+        with self.assertRaises(InvalidTorrentDataException):
+            decode(b"d1:ai1eei1e", lazy=True)
+
+    def test_encode_back(self):
+        with open(self.REAL_FILE, "rb") as fp:
+            content = fp.read()
+        data = TorrentFileParser(io.BytesIO(content), lazy=True).parse()
+        self.assertEqual(TorrentFileCreator(data).create_filelike().getvalue(), content)
+
+    def test_irregular_int_same_as_eager(self):
+        for content in (
+            b"d1:aie1:bi1ee",
+            b"d1:ai-e1:bi1-2ee",
+            b"d1:ai-0e1:bi007ee",
+            b"d:i1e1:ali-3eee",
+        ):
+            self.assertEqual(decode(content, lazy=True), decode(content))
+        for content in (b"d1:ai--1ee", b"d1:ai1x2ee", b"d1:ai12"):
+            with self.assertRaises(InvalidTorrentDataException) as eager:
+                decode(content)
+            with self.assertRaises(InvalidTorrentDataException) as lazy:
+                decode(content, lazy=True)
+            self.assertEqual(lazy.exception.pos, eager.exception.pos)
+
+    def test_nested_encoding_same_as_eager(self):
+        for content in (
+            b"d8:encoding3:gbk4:infod4:name2:\xc4\xe3ee",
+            b"d1:ald8:encoding3:gbkee1:b2:\xc4\xe3e",
+            b"d1:ad8:encoding3:gbk4:name2:\xc4\xe3e"
+            b"1:bd8:encoding5:utf-84:name2:\xc3\xa9ee",
+            # not a key, but bytes in a string
+            b"d1:a13:8:encoding1:b1:b2:\xc3\xa9e",
+        ):
+            expected = decode(content)
+            self.assertEqual(decode(content, lazy=True), expected)
+            self.assertEqual(decode(content, editable=True), expected)
@@ -0,0 +1,201 @@
+from __future__ import unicode_literals
+
+import binascii
+import hashlib
+import io
+import os
+import os.path
+import random
+import shutil
+import tempfile
+import unittest
+
+from torrent_parser import (
+    TorrentFileCreator,
+    TorrentFileParser,
+    make_torrent,
+    parse_torrent_file,
+)
+
+
+class TestMakeTorrent(unittest.TestCase):
+    PIECE_LENGTH = 16 * 1024
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.root = os.path.join(self.tmp_dir, 'data')
+        rng = random.Random(0)
+        self.files = [
+            (['a.bin'], 70000),
+            (['b', 'c.bin'], 16384),
+            (['b', 'd.bin'], 0),
+            (['b', 'e', 'f.bin'], 1),
+            (['g.bin'], 300001),
+        ]
+        for items, size in self.files:
+            filename = os.path.join(self.root, *items)
+            if not os.path.isdir(os.path.dirname(filename)):
+                os.makedirs(os.path.dirname(filename))
+            with open(filename, 'wb') as f:
+                f.write(bytes(bytearray(rng.getrandbits(8) for _ in range(size))))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def expected_pieces(self):
+        content = b''
+        for items, _ in self.files:
+            with open(os.path.join(self.root, *items), 'rb') as f:
+                content += f.read()
+        return [
+            hashlib.sha1(content[x:x + self.PIECE_LENGTH]).hexdigest()
+            for x in range(0, len(content), self.PIECE_LENGTH)
+        ]
+
+    def test_directory(self):
+        for jobs in (1, 3):
+            data = make_torrent(
+                self.root, piece_length=self.PIECE_LENGTH, jobs=jobs,
+            )
+            info = data['info']
+            self.assertEqual(info['name'], 'data')
+            self.assertEqual(info['piece length'], self.PIECE_LENGTH)
+            self.assertEqual(
+                info['files'],
+                [{'length': size, 'path': items} for items, size in self.files],
+            )
+            self.assertEqual(info['pieces'], self.expected_pieces())
+
+    def test_single_file(self):
+        filename = os.path.join(self.root, 'g.bin')
+        data = make_torrent(
+            filename, trackers=['http://a', ['http://b', 'http://c']],
+            private=True, comment='test', created_by='me', creation_date=1,
+        )
+        self.assertEqual(data['announce'], 'http://a')
+        self.assertEqual(
+            data['announce-list'], [['http://a'], ['http://b', 'http://c']],
+        )
+        self.assertEqual(data['info']['length'], 300001)
+        self.assertEqual(data['info']['name'], 'g.bin')
+        self.assertEqual(data['info']['private'], 1)
+        with open(filename, 'rb') as f:
+            content = f.read()
+        piece_length = data['info']['piece length']
+        self.assertEqual(
+            data['info']['pieces'],
+            [
+                hashlib.sha1(content[x:x + piece_length]).hexdigest()
+                for x in range(0, len(content), piece_length)
+            ],
+        )
+
+    def test_round_trip(self):
+        data = make_torrent(self.root, trackers=['http://a'])
+        filename = os.path.join(self.tmp_dir, 'data.torrent')
+        TorrentFileCreator(data).create(filename)
+        self.assertEqual(parse_torrent_file(filename), data)
+
+    def merkle_root(self, content, min_leaves=1):
+        # whole merkle tree of 16 KiB blocks, without piece layer shortcut
+        blocks = max(1, -(-len(content) // 16384))
+        count = 1
+        while count < max(blocks, min_leaves):
+            count *= 2
+        layer = [
+            hashlib.sha256(content[x * 16384:(x + 1) * 16384]).digest()
+            for x in range(blocks)
+        ]
+        layer += [b'\x00' * 32] * (count - blocks)
+        while len(layer) > 1:
+            layer = [
+                hashlib.sha256(layer[x] + layer[x + 1]).digest()
+                for x in range(0, len(layer), 2)
+            ]
+        return layer[0]
+
+    def test_v2(self):
+        piece_length = 32 * 1024
+        data = make_torrent(
+            self.root, piece_length=piece_length, version=2, jobs=3,
+        )
+        info = data['info']
+        self.assertEqual(info['meta version'], 2)
+        self.assertNotIn('pieces', info)
+        self.assertNotIn('files', info)
+        layers = data['piece layers']
+        for items, size in self.files:
+            node = info['file tree']
+            for item in items:
+                node = node[item]
+            self.assertEqual(node[''].get('length'), size)
+            if size == 0:
+                self.assertEqual(list(node['']), ['length'])
+                continue
+            with open(os.path.join(self.root, *items), 'rb') as f:
+                content = f.read()
+            if size > piece_length:
+                root = self.merkle_root(content, piece_length // 16384)
+                self.assertEqual(
+                    layers[root],
+                    b''.join(
+                        self.merkle_root(
+                            content[x:x + piece_length], piece_length // 16384,
+                        )
+                        for x in range(0, size, piece_length)
+                    ),
+                )
+            else:
+                root = self.merkle_root(content)
+                self.assertNotIn(root, layers)
+            self.assertEqual(
+                node['']['pieces root'], binascii.hexlify(root).decode(),
+            )
+
+    def test_hybrid(self):
+        data = make_torrent(
+            self.root, piece_length=self.PIECE_LENGTH, version='hybrid',
+        )
+        info = data['info']
+        self.assertEqual(info['meta version'], 2)
+        files = []
+        content = b''
+        # every file is padded, the last one too, as libtorrent does
+        for items, size in self.files:
+            files.append({'length': size, 'path': items})
+            with open(os.path.join(self.root, *items), 'rb') as f:
+                content += f.read()
+            padding = -size % self.PIECE_LENGTH
+            if padding:
+                files.append({
+                    'attr': 'p', 'length': padding, 'path': ['.pad', str(padding)],
+                })
+                content += b'\x00' * padding
+        self.assertEqual(info['files'], files)
+        self.assertEqual(info['pieces'], [
+            hashlib.sha1(content[x:x + self.PIECE_LENGTH]).hexdigest()
+            for x in range(0, len(content), self.PIECE_LENGTH)
+        ])
+
+    def test_v2_round_trip(self):
+        for version in (2, 'hybrid'):
+            data = make_torrent(self.root, trackers=['http://a'], version=version)
+            content = TorrentFileCreator(data).create_filelike().read()
+            parser = TorrentFileParser(io.BytesIO(content))
+            self.assertEqual(parser.parse(), data)
+            self.assertIsNotNone(parser.info_hash_v2)
+            self.assertEqual(
+                TorrentFileCreator(data).create_filelike().read(), content,
+            )
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            make_torrent(self.root, piece_length=12345)
+        with self.assertRaises(ValueError):
+            make_torrent(self.root, piece_length=8192, version=2)
+        with self.assertRaises(ValueError):
+            make_torrent(self.root, version=3)
+        empty = os.path.join(self.tmp_dir, 'empty')
+        os.mkdir(empty)
+        with self.assertRaises(ValueError):
+            make_torrent(empty)
@@ -1,10 +1,11 @@
 from __future__ import unicode_literals
 
 import collections
+import mmap
 import os.path
 import unittest
 
-from torrent_parser import TorrentFileParser, parse_torrent_file
+from torrent_parser import BDecoder, TorrentFileParser, parse_torrent_file
 
 
 class TestParse(unittest.TestCase):
@@ -60,6 +61,19 @@ class TestParse(unittest.TestCase):
                           data['announce-list'])
             self.assertEqual(data['creation date'], 1409254242)
 
+    def test_parse_mmap(self):
+        expected = parse_torrent_file(self.REAL_FILE)
+        threshold = BDecoder.MMAP_THRESHOLD
+        BDecoder.MMAP_THRESHOLD = 0
+        try:
+            self.assertEqual(parse_torrent_file(self.REAL_FILE), expected)
+        finally:
+            BDecoder.MMAP_THRESHOLD = threshold
+        with open(self.REAL_FILE, 'rb') as fp:
+            mm = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+            self.assertEqual(TorrentFileParser(mm).parse(), expected)
+            mm.close()
+
     def test_int_is_negative(self):
         data = parse_torrent_file(self.NEG_FILE)
         self.assertEqual(data['neg'], -1)
@@ -0,0 +1,116 @@
+from __future__ import unicode_literals
+
+import os.path
+import pickle
+import shutil
+import tempfile
+import unittest
+
+from torrent_parser import (
+    FileTable,
+    InvalidTorrentDataException,
+    TorrentFileParser,
+    create_torrent_file,
+    parse_many,
+    parse_torrent_file,
+)
+
+
+class TestParseMany(unittest.TestCase):
+    TEST_FILES_DIR = os.path.join(os.path.dirname(__file__), "test_files")
+    REAL_FILE = os.path.join(TEST_FILES_DIR, "xubuntu-22.04-desktop-amd64.iso.torrent")
+    REAL_FILE_V2 = os.path.join(TEST_FILES_DIR, "bittorrent-v2-test.torrent")
+    NOT_EXIST = os.path.join(TEST_FILES_DIR, "not.exist.torrent")
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.bad_file = os.path.join(self.tmp_dir, "bad.torrent")
+        with open(self.bad_file, "wb") as f:
+            f.write(b"d4:infod4:name")
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def paths(self):
+        return [self.REAL_FILE, self.bad_file, self.REAL_FILE_V2, self.NOT_EXIST] * 3
+
+    def test_ordered(self):
+        paths = self.paths()
+        for jobs in (1, 2):
+            results = list(parse_many(paths, jobs=jobs, ordered=True, chunk_size=1))
+            self.assertEqual([r.path for r in results], paths)
+            for r in results:
+                if r.path in (self.REAL_FILE, self.REAL_FILE_V2):
+                    self.assertIsNone(r.error)
+                    self.assertEqual(r.data, parse_torrent_file(r.path))
+                elif r.path == self.bad_file:
+                    self.assertIsNone(r.data)
+                    self.assertIsInstance(r.error, InvalidTorrentDataException)
+                else:
+                    self.assertIsInstance(r.error, EnvironmentError)
+
+    def test_unordered(self):
+        paths = self.paths()
+        results = list(parse_many(iter(paths), jobs=2, chunk_size=2))
+        self.assertEqual(sorted(r.path for r in results), sorted(paths))
+
+    def test_info_hashes(self):
+        for path in (self.REAL_FILE, self.REAL_FILE_V2):
+            with open(path, "rb") as f:
+                parser = TorrentFileParser(f)
+                parser.parse()
+            for fields in (None, [], ["info.name"]):
+                r, = parse_many([path], jobs=1, fields=fields)
+                self.assertEqual(r.info_hash_v1, parser.info_hash_v1)
+                self.assertEqual(r.info_hash_v2, parser.info_hash_v2)
+        self.assertIsNotNone(r.info_hash_v2)
+
+    def test_fields(self):
+        r, = parse_many([self.REAL_FILE], jobs=2, fields=["info.name"])
+        self.assertEqual(r.data, {"info.name": "xubuntu-22.04-desktop-amd64.iso"})
+        r, = parse_many([self.REAL_FILE], jobs=2, fields=[])
+        self.assertEqual(r.data, {})
+
+    def test_parser_options(self):
+        path = os.path.join(self.tmp_dir, "multi.torrent")
+        create_torrent_file(path, {"info": {"name": "m", "files": [
+            {"length": 1, "path": ["d", "a"]},
+            {"length": 2, "path": ["d", "b"]},
+        ]}})
+        for jobs in (1, 2):
+            r, = parse_many([path], jobs=jobs, cache_strings=True, file_table=True)
+            files = r.data["info"]["files"]
+            self.assertIsInstance(files, FileTable)
+            self.assertEqual(files, parse_torrent_file(path)["info"]["files"])
+            self.assertIs(files.paths[0][0], files.paths[1][0])
+
+    def test_exception_pickle(self):
+        e = InvalidTorrentDataException(10, "Bad data at pos {pos}", kind="eof")
+        loaded = pickle.loads(pickle.dumps(e))
+        self.assertEqual(str(loaded), str(e))
+        self.assertEqual(loaded.pos, 10)
+        self.assertEqual(loaded.kind, "eof")
+
+    def test_unknown_encoding(self):
+        path = os.path.join(self.tmp_dir, "encoding.torrent")
+        with open(path, "wb") as f:
+            f.write(b"d8:encoding4:nope4:infod6:lengthi1e4:name1:aee")
+        for jobs in (1, 2):
+            for fields in (None, ["info.name"]):
+                results = list(
+                    parse_many(
+                        [path, self.REAL_FILE], jobs=jobs, ordered=True, fields=fields
+                    )
+                )
+                self.assertIsInstance(
+                    results[0].error, InvalidTorrentDataException
+                )
+                self.assertIsNone(results[0].data)
+                self.assertIsNone(results[1].error)
+
+    def test_fields_outmost_not_dict(self):
+        path = os.path.join(self.TEST_FILES_DIR, "outmost.string.torrent")
+        r, = parse_many([path], jobs=1, fields=["info.name"])
+        self.assertIsNone(r.error)
+        self.assertEqual(r.data, {})
+        self.assertIsNone(r.info_hash_v1)
@@ -0,0 +1,103 @@
+from __future__ import unicode_literals
+
+import os.path
+import unittest
+
+from torrent_parser import (
+    BDecoder,
+    BEncoder,
+    InvalidTorrentDataException,
+    TorrentFileCreator,
+    TorrentFileParser,
+)
+
+
+class TestStats(unittest.TestCase):
+    TEST_FILES_DIR = os.path.join(os.path.dirname(__file__), 'test_files')
+    REAL_FILE = os.path.join(TEST_FILES_DIR, 'real.torrent')
+
+    def test_disabled(self):
+        decoder = BDecoder(b'd1:ai1ee')
+        decoder.decode()
+        self.assertIsNone(decoder.stats)
+
+    def test_decode_stats(self):
+        data = b'd1:ai12e1:bl2:xyd1:c0:ee6:pieces4:\x00\x01\x02\x03e'
+        decoder = BDecoder(data, hash_fields={'pieces': (2, True)}, stats=True)
+        decoder.decode()
+        stats = decoder.stats
+        self.assertEqual(
+            stats.counts, {'dict': 2, 'list': 1, 'int': 1, 'string': 7},
+        )
+        self.assertEqual(
+            stats.bytes, {'dict': 4, 'list': 2, 'int': 4, 'string': 29},
+        )
+        self.assertEqual(sum(stats.bytes.values()), len(data))
+        self.assertEqual(stats.hash_bytes, {'pieces': 4})
+        self.assertEqual(stats.max_depth, 3)
+        for phase in ('string', 'hash', 'detect', 'decode'):
+            self.assertIn(phase, stats.times)
+
+    def test_failures_and_callback(self):
+        called = []
+        decoder = BDecoder(b'd1:a1:\xffe', errors='usebytes', stats=called.append)
+        decoder.decode()
+        self.assertEqual(called, [decoder.stats])
+        self.assertEqual(decoder.stats.failures, {'string_fallback': 1})
+
+        decoder = BDecoder(b'd1:ai1e', stats=called.append)
+        with self.assertRaises(InvalidTorrentDataException):
+            decoder.decode()
+        self.assertEqual(len(called), 2)
+        self.assertEqual(called[1].failures, {'eof': 1})
+
+        decoder = BDecoder(b'l' * 10 + b'e' * 10, max_depth=5, stats=True)
+        with self.assertRaises(InvalidTorrentDataException):
+            decoder.decode()
+        self.assertEqual(decoder.stats.failures, {'depth': 1})
+
+    def test_encode_stats_same_as_decode(self):
+        with open(self.REAL_FILE, 'rb') as f:
+            parser = TorrentFileParser(f, stats=True)
+            data = parser.parse()
+        creator = TorrentFileCreator(data, stats=True)
+        creator.create_filelike()
+        decode_stats = parser.stats.as_dict()
+        encode_stats = creator.stats.as_dict()
+        for key in ('counts', 'bytes', 'hash_bytes', 'max_depth'):
+            self.assertEqual(decode_stats[key], encode_stats[key])
+        self.assertEqual(
+            sum(encode_stats['bytes'].values()), os.path.getsize(self.REAL_FILE),
+        )
+        self.assertIn('hash', encode_stats['times'])
+
+    def test_encode_failure(self):
+        called = []
+        encoder = BEncoder({'a': 1.5}, stats=called.append)
+        with self.assertRaises(Exception):
+            encoder.encode()
+        self.assertEqual(len(called), 1)
+        self.assertEqual(sum(called[0].failures.values()), 1)
+
+    def test_failure_kind(self):
+        cases = [
+            (b'd1:ai1e', 'eof'),
+            (b'l' * 10 + b'e' * 10, 'depth'),
+            (b'd1:a1:\xffe', 'string'),
+            (b'i1ei2e', 'format'),
+            (b'd1:ai1x', 'format'),
+        ]
+        for data, kind in cases:
+            decoder = BDecoder(data, max_depth=5, stats=True)
+            with self.assertRaises(InvalidTorrentDataException) as cm:
+                decoder.decode()
+            self.assertEqual(cm.exception.kind, kind)
+            self.assertEqual(decoder.stats.failures, {kind: 1})
+
+    def test_extract_not_counted(self):
+        decoder = BDecoder(b'd1:ai1e1:bi2ee', stats=True)
+        decoder.decode()
+        stats = decoder.stats.as_dict()
+        decoder.extract(['a'])
+        self.assertEqual(decoder.stats.as_dict(), stats)
+        self.assertEqual(stats['counts']['int'], 2)
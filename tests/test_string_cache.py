@@ -0,0 +1,40 @@
+from __future__ import unicode_literals
+
+import unittest
+
+from torrent_parser import BDecoder, decode
+
+
+class TestStringCache(unittest.TestCase):
+    CONTENT = b'ld4:pathl3:dir1:aeed4:pathl3:dir1:beee'
+
+    def test_keys_are_shared(self):
+        first, second = decode(self.CONTENT)
+        key1, = first.keys()
+        key2, = second.keys()
+        self.assertEqual(key1, 'path')
+        self.assertIs(key1, key2)
+        self.assertIsNot(first['path'][0], second['path'][0])
+
+    def test_values_opt_in(self):
+        first, second = BDecoder(self.CONTENT, cache_strings=True).decode()
+        self.assertIs(first['path'][0], second['path'][0])
+        self.assertEqual(second['path'], ['dir', 'b'])
+
+    def test_lazy_keys_are_shared(self):
+        first, second = decode(self.CONTENT, lazy=True)
+        self.assertIs(list(first)[0], list(second)[0])
+
+    def test_encoding_switch(self):
+        content = b'd1:a2:\xd6\xd08:encoding3:gbk1:b2:\xd6\xd0e'
+        data = BDecoder(content, errors='usebytes', cache_strings=True).decode()
+        self.assertEqual(data['a'], b'\xd6\xd0')
+        self.assertEqual(data['b'], '中')
+
+    def test_bounded(self):
+        items = b''.join(b'4:k%03di1e' % i for i in range(300))
+        decoder = BDecoder(b'd' + items + b'e')
+        decoder.STRING_CACHE_SIZE = 100
+        data = decoder.decode()
+        self.assertEqual(len(data), 300)
+        self.assertLessEqual(len(decoder._strings), 100)
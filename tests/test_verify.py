@@ -0,0 +1,143 @@
+from __future__ import unicode_literals
+
+import io
+import os
+import os.path
+import random
+import shutil
+import tempfile
+import unittest
+
+from torrent_parser import (
+    InvalidTorrentDataException,
+    TorrentFileCreator,
+    TorrentFileParser,
+    make_torrent,
+    verify,
+)
+
+
+def bits(bitfield, count):
+    return [bool(bitfield[i >> 3] & (0x80 >> (i & 7))) for i in range(count)]
+
+
+class TestVerify(unittest.TestCase):
+    PIECE_LENGTH = 16 * 1024
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.root = os.path.join(self.tmp_dir, 'data')
+        rng = random.Random(0)
+        self.files = [
+            (['a.bin'], 40000),
+            (['b', 'c.bin'], 0),
+            (['b', 'd.bin'], 1),
+            (['e.bin'], 70000),
+        ]
+        for items, size in self.files:
+            filename = os.path.join(self.root, *items)
+            if not os.path.isdir(os.path.dirname(filename)):
+                os.makedirs(os.path.dirname(filename))
+            with open(filename, 'wb') as f:
+                f.write(bytes(bytearray(rng.getrandbits(8) for _ in range(size))))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def make(self, version, **options):
+        data = make_torrent(
+            self.root, piece_length=self.PIECE_LENGTH, version=version,
+        )
+        content = TorrentFileCreator(data).create_filelike().read()
+        return TorrentFileParser(io.BytesIO(content), **options).parse()
+
+    def corrupt(self):
+        with open(os.path.join(self.root, 'e.bin'), 'r+b') as f:
+            f.seek(self.PIECE_LENGTH * 2 + 10)
+            f.write(b'x')
+        os.remove(os.path.join(self.root, 'b', 'd.bin'))
+
+    def test_v1(self):
+        torrent = self.make(1)
+        self.assertEqual(bits(verify(torrent, self.tmp_dir, jobs=2), 7), [True] * 7)
+        self.corrupt()
+        # d.bin is in piece 2 with a.bin and e.bin
+        self.assertEqual(
+            bits(verify(torrent, self.tmp_dir, jobs=2), 7),
+            [True, True, False, True, False, True, True],
+        )
+
+    def test_v2_and_hybrid(self):
+        torrents = [self.make(2), self.make('hybrid')]
+        for torrent in torrents:
+            self.assertEqual(bits(verify(torrent, self.tmp_dir), 9), [True] * 9)
+        self.corrupt()
+        for torrent in torrents:
+            # pieces are aligned to files: a.bin 0-2, d.bin 3, e.bin 4-8
+            self.assertEqual(
+                bits(verify(torrent, self.tmp_dir), 9),
+                [True, True, True, False, True, True, False, True, True],
+            )
+
+    def test_single_file(self):
+        filename = os.path.join(self.root, 'e.bin')
+        for version in (1, 2):
+            torrent = make_torrent(
+                filename, piece_length=self.PIECE_LENGTH, version=version,
+            )
+            self.assertEqual(bits(verify(torrent, self.root), 5), [True] * 5)
+
+    def test_resume(self):
+        torrent = self.make(2)
+        self.corrupt()
+        calls = []
+        bitfield = verify(torrent, self.tmp_dir, progress=calls.append)
+        self.assertEqual(
+            bits(bitfield, 9),
+            [True, True, True, False, True, True, False, True, True],
+        )
+        self.assertEqual(calls, [bitfield])
+        self.assertEqual(verify(torrent, self.tmp_dir, resume=bitfield), bitfield)
+        with self.assertRaises(ValueError):
+            verify(torrent, self.tmp_dir, resume=b'\x00')
+
+    def test_bad_piece_layer(self):
+        torrent = self.make(2)
+        root = list(torrent['piece layers'])[0]
+        layer = torrent['piece layers'][root]
+        torrent['piece layers'][root] = layer[:-1] + b'\x00'
+        bitfield = bits(verify(torrent, self.tmp_dir), 9)
+        self.assertEqual(bitfield.count(False), len(layer) // 32)
+
+    def test_parse_modes(self):
+        modes = [
+            {},
+            {'file_table': True},
+            {'hash_view': True},
+            {'lazy': True},
+            {'editable': True},
+        ]
+        for version, count in ((1, 7), (2, 9), ('hybrid', 9)):
+            for options in modes:
+                torrent = self.make(version, **options)
+                self.assertEqual(
+                    bits(verify(torrent, self.tmp_dir), count), [True] * count,
+                    (version, options),
+                )
+
+    def test_unsafe_path(self):
+        for items in (['..', 'data', 'a.bin'], ['b/c.bin'], [self.root], ['.'], ['']):
+            torrent = self.make(1)
+            torrent['info']['files'][0]['path'] = items
+            with self.assertRaises(InvalidTorrentDataException):
+                verify(torrent, self.tmp_dir)
+        torrent = self.make(1)
+        torrent['info']['name'] = '..'
+        with self.assertRaises(InvalidTorrentDataException):
+            verify(torrent, self.root)
+
+        torrent = self.make(2)
+        tree = torrent['info']['file tree']
+        tree['..'] = tree.pop('a.bin')
+        with self.assertRaises(InvalidTorrentDataException):
+            verify(torrent, self.tmp_dir)
@@ -13,6 +13,11 @@ Usage:
     with open(filename, 'rb') as f: # the binary mode 'b' is necessary
         data = TorrentFileParser(f).parse()
 
+    # or decode values only when accessed, and keep unchanged parts (like
+    # the info dict) as their original bytes when creating a new file
+
+    data = parse_torrent_file(filename, editable=True)
+
     # then you can edit the data
 
     data['announce-list'].append(['http://127.0.0.1:8080'])
@@ -37,11 +42,22 @@ from __future__ import print_function, unicode_literals
 
 import argparse
 import binascii
+import bisect
+import codecs
 import collections
+import hashlib
 import io
 import json
+import mmap
+import os
+import re
+import stat
 import sys
+import tempfile
+import threading
+import time
 import warnings
+from array import array
 
 try:
     FileNotFoundError
@@ -50,25 +66,60 @@ except NameError:
     # noinspection PyShadowingBuiltins
     FileNotFoundError = IOError
 
+
+def _detect_fallback(_):
+    warnings.warn("No chardet module installed, encoding will be utf-8")
+    return {"encoding": "utf-8", "confidence": 1}
+
+
 try:
     # noinspection PyPackageRequirements
     from chardet import detect as _detect
 except ImportError:
+    _detect = _detect_fallback
+
+
+try:
+    from collections.abc import Mapping, MutableMapping, MutableSequence, Sequence
+except ImportError:
+    # For Python 2
+    from collections import Mapping, MutableMapping, MutableSequence, Sequence
+
+try:
+    import sqlite3
+except ImportError:
+    # Python can be built without sqlite3, TorrentIndex is not available
+    sqlite3 = None
 
-    def _detect(_):
-        warnings.warn("No chardet module installed, encoding will be utf-8")
-        return {"encoding": "utf-8", "confidence": 1}
+try:
+    import asyncio
+except ImportError:
+    # For Python 2, async_* functions are not available
+    asyncio = None
 
+try:
+    from concurrent.futures import (
+        FIRST_COMPLETED,
+        ProcessPoolExecutor,
+        ThreadPoolExecutor,
+        wait,
+    )
+except ImportError:
+    # For Python 2 without the futures backport, parse_many and make_torrent
+    # run serially
+    ProcessPoolExecutor = ThreadPoolExecutor = None
 
 try:
     # noinspection PyUnresolvedReferences
     # For Python 2
     str_type = unicode
     bytes_type = str
+    int_types = (int, long)
 except NameError:
     # For Python 3
     str_type = str
     bytes_type = bytes
+    int_types = (int,)
 
 __all__ = [
     "InvalidTorrentDataException",
@@ -76,25 +127,73 @@ __all__ = [
     "BDecoder",
     "encode",
     "decode",
+    "iterparse",
     "TorrentFileParser",
     "TorrentFileCreator",
     "create_torrent_file",
+    "make_torrent",
+    "verify",
     "parse_torrent_file",
+    "info_hash",
+    "parse_many",
+    "ParseResult",
+    "async_parse",
+    "async_parse_file",
+    "async_create",
+    "ParseCache",
+    "FrozenDict",
+    "FrozenList",
+    "TorrentIndex",
+    "extract",
+    "extract_torrent_file",
+    "LazyDict",
+    "LazyList",
+    "EditableDict",
+    "EditableList",
+    "PiecesView",
+    "FileTable",
+    "Stats",
 ]
 
 __version__ = "0.4.1"
 
+try:
+    _timer = time.perf_counter
+except AttributeError:
+    # For Python 2
+    _timer = time.time
+
+try:
+    array("Q")
+    _ARRAY_UINT64 = "Q"
+except ValueError:
+    # For Python 2, which has no "Q" type code
+    _ARRAY_UINT64 = "L"
+
 
 def detect(content):
     return _detect(content)["encoding"]
 
 
 class InvalidTorrentDataException(Exception):
-    def __init__(self, pos, msg=None):
+    """
+    ``kind`` attribute is the kind of failure, "eof" for unexpected end of
+    data, "depth" for too deep nesting, "string" for decoding error of
+    strings, and "format" for other invalid data.
+    """
+
+    def __init__(self, pos, msg=None, kind="format"):
+        self.pos = pos
+        self.kind = kind
+        self._msg = msg
         msg = msg or "Invalid torrent format when read at pos {pos}"
         msg = msg.format(pos=pos)
         super(InvalidTorrentDataException, self).__init__(msg)
 
+    def __reduce__(self):
+        # keep it picklable, for passing it between processes
+        return type(self), (self.pos, self._msg, self.kind)
+
 
 class __EndCls(object):
     pass
@@ -103,6 +202,442 @@ class __EndCls(object):
 _END = __EndCls()
 
 
+def _can_map_file(fp, threshold):
+    """
+    :return: True if ``fp`` is a regular file which size reaches ``threshold``
+    """
+    try:
+        st = os.fstat(fp.fileno())
+    except (AttributeError, OSError, ValueError):
+        return False
+    return stat.S_ISREG(st.st_mode) and st.st_size > 0 and st.st_size >= threshold
+
+
+def _map_file(fp, threshold):
+    """
+    Memory-map a binary file object read-only, see :any:`_can_map_file`.
+
+    :return: the mmap object, or None if the file can't or should not be mapped
+    """
+    if not _can_map_file(fp, threshold):
+        return None
+    try:
+        return mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+
+def _parse_int(digits, pos):
+    """
+    Parse integer leniently as the decoder always did: a "-" can appear once
+    anywhere, and empty digits is 0.
+
+    :param bytes digits: integer content
+    :param int pos: position of integer content, for error message
+    """
+    if digits.isdigit():
+        return int(digits)
+    value = 0
+    neg = False
+    for i in range(len(digits)):
+        char = digits[i : i + 1]
+        if not neg and char == b"-":
+            neg = True
+        elif not b"0" <= char <= b"9":
+            raise InvalidTorrentDataException(pos + i)
+        else:
+            value = value * 10 + int(char)
+    return -value if neg else value
+
+
+def _check_encoding(encoding, pos):
+    """
+    :param int pos: position of the ``encoding`` value, for error message
+    :return: ``encoding`` if it's a known encoding name
+    :raise: :any:`InvalidTorrentDataException` if it's not
+    """
+    if isinstance(encoding, str_type):
+        try:
+            codecs.lookup(encoding)
+            return encoding
+        except (LookupError, ValueError):
+            pass
+    raise InvalidTorrentDataException(pos, "Invalid value of encoding field")
+
+
+def _skip_int(buffer, pos, end):
+    """
+    :return: value of the integer start at ``pos`` and terminated by ``end``,
+      and the position after ``end``
+    """
+    stop = buffer.find(end, pos)
+    if stop == -1:
+        # raise at the invalid char if any, like BDecoder._next_int_slow
+        _parse_int(buffer[pos:], pos)
+        raise InvalidTorrentDataException(
+            len(buffer), "Unexpected EOF when reading torrent file", kind="eof"
+        )
+    digits = buffer[pos:stop]
+    if digits.isdigit():
+        return int(digits), stop + 1
+    # same lenient rules as the decoder, so lazy mode and extract accept
+    # what decode accepts
+    return _parse_int(digits, pos), stop + 1
+
+
+def _skip_element(buffer, pos):
+    """
+    Find the end of the element start at ``pos`` without decoding it.
+
+    :return: position after the element
+    """
+    size = len(buffer)
+    depth = 0
+    while True:
+        char = buffer[pos : pos + 1]
+        if char == b"d" or char == b"l":
+            depth += 1
+            pos += 1
+            continue
+        if char == b"i":
+            _, pos = _skip_int(buffer, pos + 1, b"e")
+        elif char == b"e":
+            if depth == 0:
+                raise InvalidTorrentDataException(pos)
+            depth -= 1
+            pos += 1
+        elif not char:
+            raise InvalidTorrentDataException(
+                pos, "Unexpected EOF when reading torrent file", kind="eof"
+            )
+        else:
+            length, pos = _skip_int(buffer, pos, b":")
+            if length < 0 or pos + length > size:
+                raise InvalidTorrentDataException(
+                    pos, "Unexpected EOF when reading torrent file", kind="eof"
+                )
+            pos += length
+        if depth == 0:
+            return pos
+
+
+def _iter_dict(buffer, pos):
+    """
+    Yield (raw key, value start, value end) of items in the dict start at
+    ``pos``, without decoding values.
+    """
+    pos += 1
+    while buffer[pos : pos + 1] != b"e":
+        if not buffer[pos : pos + 1]:
+            raise InvalidTorrentDataException(
+                pos, "Unexpected EOF when reading torrent file", kind="eof"
+            )
+        length, pos = _skip_int(buffer, pos, b":")
+        if length < 0 or pos + length > len(buffer):
+            raise InvalidTorrentDataException(
+                pos, "Unexpected EOF when reading torrent file", kind="eof"
+            )
+        key = buffer[pos : pos + length]
+        pos += length
+        end = _skip_element(buffer, pos)
+        yield key, pos, end
+        pos = end
+
+
+def _iter_list(buffer, pos):
+    """
+    Yield start positions of items in the list start at ``pos``.
+    """
+    pos += 1
+    while buffer[pos : pos + 1] != b"e":
+        if not buffer[pos : pos + 1]:
+            raise InvalidTorrentDataException(
+                pos, "Unexpected EOF when reading torrent file", kind="eof"
+            )
+        yield pos
+        pos = _skip_element(buffer, pos)
+
+
+def _find_info_span(buffer):
+    """
+    :return: (start, end) of the value of "info" key in outmost dict, or None
+      if there is no such key
+    """
+    if buffer[0:1] != b"d":
+        raise InvalidTorrentDataException(0, "Outmost element is not a dict")
+    for key, start, end in _iter_dict(buffer, 0):
+        if key == b"info":
+            return start, end
+    return None
+
+
+def _find_encoding_keys(buffer):
+    """
+    Find ``encoding`` keys of dicts at any depth of the element start at 0.
+    Only containers which have the raw bytes of such a key are walked into,
+    and the walk stops after the last one.
+
+    :return: list of value start positions of the keys, in the order they are
+      in ``buffer``
+    """
+    candidates = []
+    pos = buffer.find(b"8:encoding")
+    while pos != -1:
+        candidates.append(pos)
+        pos = buffer.find(b"8:encoding", pos + 1)
+    result = []
+    if not candidates or buffer[0:1] not in (b"d", b"l"):
+        return result
+    last = candidates[-1]
+    # every frame is [is dict, position of next item]
+    stack = [[buffer[0:1] == b"d", 1]]
+    while stack:
+        frame = stack[-1]
+        pos = frame[1]
+        if pos > last:
+            break
+        if buffer[pos : pos + 1] == b"e":
+            stack.pop()
+            continue
+        if not buffer[pos : pos + 1]:
+            raise InvalidTorrentDataException(
+                pos, "Unexpected EOF when reading torrent file", kind="eof"
+            )
+        if frame[0]:
+            length, start = _skip_int(buffer, pos, b":")
+            if length < 0 or start + length > len(buffer):
+                raise InvalidTorrentDataException(
+                    start, "Unexpected EOF when reading torrent file", kind="eof"
+                )
+            key = buffer[start : start + length]
+            start += length
+            if key == b"encoding":
+                result.append(start)
+        else:
+            start = pos
+        end = _skip_element(buffer, start)
+        frame[1] = end
+        lead = buffer[start : start + 1]
+        if lead == b"d" or lead == b"l":
+            index = bisect.bisect_left(candidates, start)
+            if index < len(candidates) and candidates[index] < end:
+                stack.append([lead == b"d", start + 1])
+    return result
+
+
+def _is_v2_info(raw):
+    """
+    :param bytes raw: raw bytes of an info dict
+    :return: if its ``meta version`` is 2, checked without decoding it
+    """
+    buffer = bytes_type(raw)
+    if buffer[0:1] != b"d":
+        return False
+    result = False
+    for key, start, _ in _iter_dict(buffer, 0):
+        if key == b"meta version":
+            lead = buffer[start : start + 1]
+            result = lead == b"i" and _skip_int(buffer, start + 1, b"e")[0] == 2
+    return result
+
+
+def _string_at(buffer, pos):
+    length, pos = _skip_int(buffer, pos, b":")
+    return buffer[pos : pos + length]
+
+
+def _name_strings(buffer, pos):
+    """
+    Yield raw ``name``, ``path`` items and ``file tree`` keys of the info
+    dict start at ``pos``, in the order they are in ``buffer``.
+    """
+    # every item is (kind, iterator of dict items or list item positions)
+    stack = [("dict", _iter_dict(buffer, pos))]
+    while stack:
+        kind, items = stack[-1]
+        item = next(items, None)
+        if item is None:
+            stack.pop()
+            continue
+        if kind == "dict":
+            key, start, _ = item
+            lead = buffer[start : start + 1]
+            if key == b"name" and lead.isdigit():
+                yield _string_at(buffer, start)
+            elif key in (b"files", b"path") and lead == b"l":
+                stack.append((key, _iter_list(buffer, start)))
+            elif key == b"file tree" and lead == b"d":
+                stack.append(("tree", _iter_dict(buffer, start)))
+        elif kind == "tree":
+            key, start, _ = item
+            if key:
+                yield key
+            if buffer[start : start + 1] == b"d":
+                stack.append(("tree", _iter_dict(buffer, start)))
+        else:
+            lead = buffer[item : item + 1]
+            if kind == b"files" and lead == b"d":
+                stack.append(("dict", _iter_dict(buffer, item)))
+            elif kind == b"path" and lead.isdigit():
+                yield _string_at(buffer, item)
+
+
+# detected encodings which have a superset decoding more strings
+_ENCODING_SUPERSETS = {"gb2312": "gb18030", "gbk": "gb18030"}
+
+
+def _detect_encoding(buffer, sample_size):
+    """
+    Detect encoding of a torrent once for all strings.
+
+    The ``encoding`` field in outmost dict is used if it is a known encoding.
+    Otherwise file names and paths in info dict, at most ``sample_size``
+    bytes, are used as sample, which is utf-8 if it can be decoded, or
+    detected by chardet.
+
+    :return: (encoding, confidence between 0 and 1)
+    :rtype: Tuple[str, float]
+    """
+    samples = []
+    try:
+        if buffer[0:1] != b"d":
+            return "utf-8", 0.0
+        info = None
+        for key, start, _ in _iter_dict(buffer, 0):
+            lead = buffer[start : start + 1]
+            if key == b"encoding" and lead.isdigit():
+                try:
+                    encoding = _string_at(buffer, start).decode("ascii")
+                    return codecs.lookup(encoding).name, 1.0
+                except (UnicodeError, LookupError):
+                    pass
+            elif key == b"info" and lead == b"d":
+                info = start
+        if info is not None:
+            size = 0
+            for raw in _name_strings(buffer, info):
+                samples.append(raw)
+                size += len(raw) + 1
+                if size >= sample_size:
+                    break
+    except InvalidTorrentDataException:
+        # let the parser report it, detect with what we got
+        pass
+    if not samples:
+        return "utf-8", 0.0
+    sample = b"\n".join(samples)[:sample_size]
+    try:
+        sample.decode("utf-8")
+        return "utf-8", 1.0
+    except UnicodeDecodeError as e:
+        # a multi-byte char may be cut at the end
+        if e.start >= len(sample) - 3 and e.reason == "unexpected end of data":
+            return "utf-8", 1.0
+    result = _detect(sample)
+    encoding = result["encoding"]
+    if not encoding or _detect is _detect_fallback:
+        # without chardet, utf-8 is only a guess for names which are not
+        # utf-8, though the fallback reports confidence 1 like it always did
+        return "utf-8", 0.0
+    encoding = codecs.lookup(encoding).name
+    return _ENCODING_SUPERSETS.get(encoding, encoding), result["confidence"]
+
+
+_MISSING = object()
+
+# path token means all items of a list
+_ALL = object()
+
+_PATH_TOKEN_RE = re.compile(
+    r"""\.?(?:\[(?:(\*)|(\d+)|"([^"]*)"|'([^']*)')\]|([^.\[\]]+))"""
+)
+
+
+def _parse_path(path):
+    """
+    :return: list of path tokens, str for dict key, int for list index,
+      and :any:`_ALL` for all items of a list
+    """
+    tokens = []
+    pos = 0
+    while pos < len(path):
+        match = _PATH_TOKEN_RE.match(path, pos)
+        if match is None or (pos == 0 and path[0] == "."):
+            raise ValueError("Invalid path {!r} at pos {}".format(path, pos))
+        every, index, quoted, single_quoted, key = match.groups()
+        if every is not None:
+            tokens.append(_ALL)
+        elif index is not None:
+            tokens.append(int(index))
+        elif key is not None:
+            tokens.append(key)
+        else:
+            tokens.append(quoted if quoted is not None else single_quoted)
+        pos = match.end()
+    return tokens
+
+
+def _make_path_tree(tokens):
+    """
+    :return: nested dict from path token to sub-tree, None means the whole
+      value is needed
+    """
+    tree = None
+    for token in reversed(tokens):
+        tree = {token: tree}
+    return tree
+
+
+def _merge_path_tree(a, b):
+    if a is _MISSING:
+        return b
+    if b is _MISSING:
+        return a
+    if a is None or b is None:
+        return None
+    merged = dict(a)
+    for token, subtree in b.items():
+        merged[token] = _merge_path_tree(merged.get(token, _MISSING), subtree)
+    return merged
+
+
+class _SelectedList(dict):
+    """
+    Items of a list selected by :any:`BDecoder.extract`, from index to value.
+    """
+
+
+def _resolve_path(value, tokens):
+    for i, token in enumerate(tokens):
+        if token is _ALL:
+            if isinstance(value, _SelectedList):
+                items = [value[index] for index in sorted(value)]
+            elif isinstance(value, list):
+                items = value
+            else:
+                return _MISSING
+            rest = tokens[i + 1 :]
+            return [
+                x
+                for x in (_resolve_path(item, rest) for item in items)
+                if x is not _MISSING
+            ]
+        if isinstance(token, int):
+            if isinstance(value, _SelectedList):
+                value = value.get(token, _MISSING)
+            elif isinstance(value, list) and token < len(value):
+                value = value[token]
+            else:
+                return _MISSING
+        elif isinstance(value, dict) and not isinstance(value, _SelectedList):
+            value = value.get(token, _MISSING)
+        else:
+            return _MISSING
+        if value is _MISSING:
+            return value
+    return value
+
+
 def _check_hash_field_params(name, value):
     return (
         isinstance(name, str_type)
@@ -113,6 +648,90 @@ def _check_hash_field_params(name, value):
     )
 
 
+class Stats(object):
+    """
+    Counters and timings of one decode or encode run, enabled by ``stats``
+    option of :any:`BDecoder` and :any:`BEncoder`.
+
+    - ``counts`` and ``bytes``: count and encoded bytes of every element type,
+      "dict", "list", "int" and "string". Bytes of dict and list only include
+      their start and end mark
+    - ``hash_bytes``: raw bytes of every hash field
+    - ``failures``: count of failures by kind, the ``kind`` of
+      :any:`InvalidTorrentDataException`, or "string_fallback" for strings
+      returned as bytes by "usebytes" handler. For other exceptions of
+      encoding, the kind is the exception type name
+    - ``max_depth``: max nesting level of dict and list
+    - ``times``: seconds used by every phase. For decoding, "decode" for the
+      whole decoding, and "string" for decoding strings, "hash" for
+      converting hash fields and "detect" for encoding detection in it. For
+      encoding, "encode" for the whole encoding and "hash" in it
+
+    They are collected by the decoding and encoding loops when they read or
+    write every element, which makes them slower, nothing is done when
+    disabled. In lazy and editable mode, values are decoded after
+    :any:`BDecoder.decode` returns, so elements are not counted, and only
+    changed parts of editable containers are counted when encoding.
+    """
+
+    TYPES = ("dict", "list", "int", "string")
+
+    def __init__(self):
+        self.counts = dict.fromkeys(self.TYPES, 0)
+        self.bytes = dict.fromkeys(self.TYPES, 0)
+        self.hash_bytes = {}
+        self.failures = {}
+        self.max_depth = 0
+        self.times = {}
+
+    def add_element(self, kind, size):
+        self.counts[kind] += 1
+        self.bytes[kind] += size
+
+    def add_container(self, kind, depth):
+        """
+        Count a dict or list, and its start and end mark.
+
+        :param int depth: nesting level of it
+        """
+        self.add_element(kind, 2)
+        if depth > self.max_depth:
+            self.max_depth = depth
+
+    def add_hash(self, field, size):
+        self.hash_bytes[field] = self.hash_bytes.get(field, 0) + size
+
+    def add_time(self, phase, seconds):
+        self.times[phase] = self.times.get(phase, 0) + seconds
+
+    def add_failure(self, kind):
+        self.failures[kind] = self.failures.get(kind, 0) + 1
+
+    def as_dict(self):
+        """
+        :return: all stats as a JSON serializable dict
+        :rtype: dict
+        """
+        return {
+            "counts": dict(self.counts),
+            "bytes": dict(self.bytes),
+            "hash_bytes": dict(self.hash_bytes),
+            "failures": dict(self.failures),
+            "max_depth": self.max_depth,
+            "times": dict(self.times),
+        }
+
+    def __repr__(self):
+        return "Stats({!r})".format(self.as_dict())
+
+
+# kinds of containers in decoding, see BDecoder._next_element
+_FRAME_OTHER = 0
+_FRAME_OUTMOST = 1
+_FRAME_INFO = 2
+_FRAME_FILES = 3
+
+
 class BDecoder(object):
 
     TYPE_LIST = "list"
@@ -140,6 +759,20 @@ class BDecoder(object):
     # for other usable error handler string
     ERROR_HANDLER_USEBYTES = "usebytes"
 
+    # regular files at least this large are memory-mapped instead of read
+    MMAP_THRESHOLD = 4 * 1024 * 1024
+
+    # default max nesting level of dict and list
+    MAX_DEPTH = 1000
+
+    # max bytes of file names used to detect encoding when encoding is "auto"
+    ENCODING_SAMPLE_SIZE = 64 * 1024
+
+    # max count of decoded strings cached in one decoding, and max length of
+    # a cached string
+    STRING_CACHE_SIZE = 4096
+    STRING_CACHE_MAX_LENGTH = 256
+
     def __init__(
         self,
         data,
@@ -148,14 +781,28 @@ class BDecoder(object):
         errors="strict",
         hash_fields=None,
         hash_raw=False,
+        lazy=False,
+        max_depth=None,
+        hash_view=False,
+        stats=None,
+        editable=False,
+        cache_strings=False,
+        file_table=False,
     ):
         """
-        :param bytes|file data: bytes or a **binary** file-like object to parse,
-          which means need 'b' mode when use built-in open function
+        :param bytes|bytearray|memoryview|mmap|file data: bytes or a
+          **binary** file-like object to parse, which means need 'b' mode
+          when use built-in open function. file content is read into memory
+          when decoding, then parsed with an index into the buffer. regular
+          files larger than :any:`MMAP_THRESHOLD` are memory-mapped instead
         :param bool use_ordered_dict: Use collections.OrderedDict as dict
           container default False, which mean use built-in dict
         :param str encoding: file content encoding, default utf-8, use 'auto'
-          to enable charset auto detection (need 'chardet' package installed)
+          to detect it once for every decoding, from the ``encoding`` field,
+          or from file names and paths (need 'chardet' package installed if
+          they are not utf-8), see ``detected_encoding`` and
+          ``encoding_confidence`` attributes. Strings that can't be decoded
+          with the detected encoding are detected again one by one
         :param str errors: how to deal with encoding error when try to parse
           string from content with ``encoding``.
           see https://docs.python.org/3/library/codecs.html#error-handlers
@@ -166,9 +813,41 @@ class BDecoder(object):
           be treated as hash value. dict key is the field name, value is a
           two-element tuple of (hash_block_length, as_a_list).
           See :any:`hash_field` for detail
+        :param bool hash_raw: if True, hash fields are returned as raw bytes
+          instead of split into blocks of hex strings
+        :param bool lazy: if True, dict and list are returned as
+          :any:`LazyDict` and :any:`LazyList`, which only record where their
+          items are after a structural scan, and decode an item when it is
+          first accessed. ``use_ordered_dict`` is ignored in this mode
+        :param int max_depth: max nesting level of dict and list, deeper
+          data is treated as invalid. default is :any:`MAX_DEPTH`
+        :param bool hash_view: if True, hash fields which would be a list of
+          hex strings are returned as a :any:`PiecesView` over the raw bytes
+          instead, which converts a block to hex only when it is accessed.
+          ``hash_raw`` takes precedence over this option
+        :param bool|Callable[[Stats], None] stats: if True or a callable,
+          collect :any:`Stats` of every :any:`decode` call into ``stats``
+          attribute, and call the callable with it after decoding, even if
+          decoding failed
+        :param bool editable: if True, works like ``lazy`` but dict and list
+          are returned as mutable :any:`EditableDict` and
+          :any:`EditableList`. :any:`BEncoder` writes unchanged parts of them
+          as the original bytes, so editing ``announce`` does not touch
+          ``info``. Files are always read into memory in this mode, so the
+          source file can be overwritten
+        :param bool cache_strings: dict keys not longer than
+          :any:`STRING_CACHE_MAX_LENGTH` are always cached by raw bytes, so
+          same keys are decoded once and share one object. The cache is
+          cleared when it has :any:`STRING_CACHE_SIZE` strings. If True,
+          string values are cached in the same way, which saves memory when
+          many values are same, like directory names in paths
+        :param bool file_table: if True, ``info.files`` is returned as a
+          :any:`FileTable`, filled when every file is decoded, so the list of
+          dicts is never built. It is ignored in lazy and editable mode, and
+          ``info.files`` is a list if a file has no valid length or path
         """
-        if isinstance(data, bytes_type):
-            data = io.BytesIO(data)
+        if isinstance(data, (bytes_type, bytearray, memoryview, mmap.mmap)):
+            pass
         elif getattr(data, "read") is not None and getattr(data, "seek") is not None:
             pass
         else:
@@ -176,8 +855,19 @@ class BDecoder(object):
 
         self._pos = 0
         self._encoding = encoding
+        self._auto_encoding = encoding == "auto"
+        self._detect_time = 0
+        self.detected_encoding = None
+        self.encoding_confidence = None
         self._content = data
+        self._buffer = b""
+        self._mapped = None
+        self._info_span = None
+        self._info_v2 = False
+        self._info_raw = None
+        self._info_hashes = {}
         self._use_ordered_dict = use_ordered_dict
+        self._errors = errors
         self._error_handler = errors
         self._error_use_bytes = False
         if self._error_handler == BDecoder.ERROR_HANDLER_USEBYTES:
@@ -195,6 +885,17 @@ class BDecoder(object):
                         "Dict[str, Tuple[int, bool]]"
                     )
         self._hash_raw = bool(hash_raw)
+        self._hash_view = bool(hash_view)
+        self._editable = bool(editable)
+        self._cache_strings = bool(cache_strings)
+        self._strings = {}
+        self._lazy = bool(lazy) or self._editable
+        self._file_table = bool(file_table) and not self._lazy
+        self._max_depth = self.MAX_DEPTH if max_depth is None else max_depth
+        self._stats_hook = stats
+        self.stats = None
+        # stats of running decode call
+        self._stats = None
 
     def hash_field(self, name, block_length=20, need_list=False):
         """
@@ -215,136 +916,341 @@ class BDecoder(object):
             raise ValueError("Invalid hash field parameter")
         return self
 
+    @property
+    def info_hash_v1(self):
+        """
+        see :any:`TorrentFileParser.info_hash_v1`
+
+        :rtype: str|None
+        """
+        return self._info_hash(hashlib.sha1)
+
+    @property
+    def info_hash_v2(self):
+        """
+        see :any:`TorrentFileParser.info_hash_v2`
+
+        :rtype: str|None
+        """
+        if self._info_v2 is None and self._info_raw is not None:
+            # lazy mode, only check the info dict when needed
+            self._info_v2 = _is_v2_info(self._info_raw)
+        if not self._info_v2:
+            return None
+        return self._info_hash(hashlib.sha256)
+
+    def _info_hash(self, algorithm):
+        digest = self._info_hashes.get(algorithm)
+        if digest is None and self._info_raw is not None:
+            digest = self._info_hashes[algorithm] = algorithm(
+                self._info_raw
+            ).hexdigest()
+        return digest
+
     def decode(self):
         """
+        After decoding, ``info_hash_v1`` and ``info_hash_v2`` properties give
+        the hashes of raw bytes of the ``info`` value in outmost dict, see
+        :any:`TorrentFileParser.info_hash_v1`. They are computed when first
+        accessed.
+
         :rtype: dict|list|int|str|unicode|bytes
         :raise: :any:`InvalidTorrentDataException` when parse failed or error
           happened when decode string using specified encoding
         """
+        stats = None
+        if self._stats_hook:
+            self.stats = self._stats = stats = Stats()
+            start_time = _timer()
         self._restart()
-        data = self._next_element()
+        try:
+            if self._lazy:
+                data = self._lazy_decode()
+            else:
+                data = self._next_element()
+
+            self._check_eof()
+
+            if self._info_span is not None:
+                # only keep the raw info dict, hashes are computed when needed
+                start, end = self._info_span
+                if isinstance(self._content, bytes_type):
+                    # immutable, so a view of it is enough
+                    self._info_raw = memoryview(self._content)[start:end]
+                else:
+                    self._info_raw = self._buffer[start:end]
+        except InvalidTorrentDataException as e:
+            if stats is not None:
+                stats.add_failure(e.kind)
+            raise
+        finally:
+            self._release()
+            if stats is not None:
+                self._stats = None
+                stats.add_time("detect", self._detect_time)
+                stats.add_time("decode", _timer() - start_time)
+                if callable(self._stats_hook):
+                    self._stats_hook(stats)
+
+        return data
+
+    def extract(self, paths):
+        """
+        Decode only the values at ``paths``, everything else is skipped
+        without being decoded.
+
+        A path is a list of dict keys separated by ".", like ``info.name``,
+        use ``[n]`` to select n-th item of a list and ``[*]`` for all items,
+        like ``info.files[*].length``, the result for ``[*]`` is a list.
+        Keys which contains ".", "[" or "]" can be quoted, like
+        ``info["name.utf-8"]``. An empty path means the whole data.
+
+        :param List[str] paths: paths to be extracted
+        :return: dict from path to its value, path not found in data is not
+          included. ``[*]`` skips items which the rest of path is not found
+        :rtype: dict
+        :raise: :any:`InvalidTorrentDataException` when parse failed, and
+          ``ValueError`` when path is invalid
+        """
+        parsed = [(path, _parse_path(path)) for path in paths]
+        tree = {}
+        for _, tokens in parsed:
+            tree = _merge_path_tree(tree, _make_path_tree(tokens))
 
+        self._restart()
         try:
-            c = self._read_byte(1, True)
+            selected = self._next_selected(tree)
+            self._check_eof()
+        finally:
+            self._release()
+
+        result = {}
+        for path, tokens in parsed:
+            value = _resolve_path(selected, tokens)
+            if value is not _MISSING:
+                result[path] = value
+        return result
+
+    def _next_selected(self, tree, field=None):
+        if tree is None or (field is not None and field in self._hash_fields):
+            if field is not None and field in self._hash_fields:
+                return self._next_hash(*self._hash_fields[field])
+            return self._next_element(field)
+
+        buffer = self._buffer
+        pos = self._pos
+        lead = buffer[pos : pos + 1]
+        if lead == self.DICT_INDICATOR:
+            self._pos = pos + 1
+            result = {}
+            while True:
+                k = self._next_element()
+                if k is _END:
+                    return result
+                if not isinstance(k, str_type) and not isinstance(k, bytes_type):
+                    raise InvalidTorrentDataException(
+                        self._pos, "Type of dict key can't be " + type(k).__name__
+                    )
+                start = self._pos
+                if k in tree:
+                    value = result[k] = self._next_selected(tree[k], k)
+                elif k == "encoding":
+                    value = self._next_element(k)
+                else:
+                    self._pos = _skip_element(buffer, self._pos)
+                    continue
+                if k == "encoding":
+                    self._encoding = _check_encoding(value, start)
+        if lead == self.LIST_INDICATOR:
+            self._pos = pos + 1
+            result = _SelectedList()
+            index = 0
+            while buffer[self._pos : self._pos + 1] != self.END_INDICATOR:
+                subtree = _merge_path_tree(
+                    tree.get(index, _MISSING), tree.get(_ALL, _MISSING)
+                )
+                if subtree is _MISSING:
+                    self._pos = _skip_element(buffer, self._pos)
+                else:
+                    result[index] = self._next_selected(subtree)
+                index += 1
+            self._pos += 1
+            return result
+        self._pos = _skip_element(buffer, pos)
+        return _MISSING
+
+    def _check_eof(self):
+        if self._pos < len(self._buffer):
+            c = bytes_type(self._buffer[self._pos : self._pos + 1])
             raise InvalidTorrentDataException(
-                0, "Expect EOF, but get [{}] at pos {}".format(c, self._pos)
+                0, "Expect EOF, but get [{}] at pos {}".format(c, self._pos + 1)
             )
-        except EOFError:  # expect EOF
-            pass
 
+    def _lazy_decode(self):
+        document = _LazyDocument(self)
+        data = document.value_at(0)
+        if isinstance(data, LazyDict):
+            if "info" in data:
+                self._info_span = data.span_of("info")
+                # unknown until info_hash_v2 is accessed
+                self._info_v2 = None
+            self._pos = data.span[1]
+        elif isinstance(data, LazyList):
+            self._pos = data.span[1]
+        else:
+            self._pos = document.decoder._pos
+        # mapped file is owned by the lazy containers now
+        self._mapped = None
         return data
 
-    def _read_byte(self, count=1, raise_eof=False):
-        assert count >= 0
-        gotten = self._content.read(count)
-        if count != 0 and len(gotten) == 0:
-            if raise_eof:
-                raise EOFError()
+    def _read_byte(self, count=1):
+        pos = self._pos
+        if count < 0:
+            raise InvalidTorrentDataException(pos, "Negative string length")
+        if count != 0 and pos >= len(self._buffer):
             raise InvalidTorrentDataException(
-                self._pos, "Unexpected EOF when reading torrent file"
+                pos, "Unexpected EOF when reading torrent file", kind="eof"
             )
-        self._pos += count
-        return gotten
-
-    def _seek_back(self, count):
-        self._content.seek(-count, 1)
-        self._pos = self._pos - count
+        self._pos = pos + count
+        return self._buffer[pos : pos + count]
 
     def _restart(self):
-        self._content.seek(0, 0)
-        self._pos = 0
-
-    def _dict_items_generator(self):
-        while True:
-            k = self._next_element()
-            if k is _END:
-                return
-            if not isinstance(k, str_type) and not isinstance(k, bytes_type):
-                raise InvalidTorrentDataException(
-                    self._pos, "Type of dict key can't be " + type(k).__name__
-                )
-            if k in self._hash_fields:
-                v = self._next_hash(*self._hash_fields[k])
+        content = self._content
+        if isinstance(content, bytes_type):
+            self._buffer = content
+        elif isinstance(content, mmap.mmap):
+            # slicing a mmap gives bytes, so it can be used as buffer directly
+            self._buffer = content
+        elif isinstance(content, (bytearray, memoryview)):
+            # slices of those types are not bytes, copy once here so every
+            # value we return is a real bytes object
+            self._buffer = bytes_type(content)
+        else:
+            if not self._editable:
+                self._mapped = _map_file(content, self.MMAP_THRESHOLD)
+            if self._mapped is not None:
+                self._buffer = self._mapped
             else:
-                v = self._next_element(k)
-            if k == "encoding":
-                self._encoding = v
-            yield k, v
-
-    def _next_dict(self):
-        data = collections.OrderedDict() if self._use_ordered_dict else dict()
-        for key, element in self._dict_items_generator():
-            data[key] = element
-        return data
-
-    def _list_items_generator(self):
-        while True:
-            element = self._next_element()
-            if element is _END:
-                return
-            yield element
+                content.seek(0, 0)
+                self._buffer = content.read()
+        self._pos = 0
+        self._info_span = None
+        self._info_v2 = False
+        self._info_raw = None
+        self._info_hashes = {}
+        self._strings = {}
+        if self._auto_encoding:
+            start_time = _timer()
+            self._encoding, self.encoding_confidence = _detect_encoding(
+                self._buffer, self.ENCODING_SAMPLE_SIZE
+            )
+            self.detected_encoding = self._encoding
+            self._detect_time = _timer() - start_time
 
-    def _next_list(self):
-        return [element for element in self._list_items_generator()]
+    def _release(self):
+        self._buffer = b""
+        if self._mapped is not None:
+            self._mapped.close()
+            self._mapped = None
 
     def _next_int(self, end=END_INDICATOR):
-        value = 0
-        char = self._read_byte(1)
-        neg = False
-        while char != end:
-            if not neg and char == b"-":
-                neg = True
-            elif not b"0" <= char <= b"9":
-                raise InvalidTorrentDataException(self._pos - 1)
-            else:
-                value = value * 10 + int(char) - int(b"0")
-            char = self._read_byte(1)
-        return -value if neg else value
+        buffer = self._buffer
+        start = self._pos
+        stop = buffer.find(end, start)
+        if stop != -1:
+            digits = buffer[start:stop]
+            if digits.isdigit():
+                self._pos = stop + 1
+                return int(digits)
+        return self._next_int_slow(end)
+
+    def _next_int_slow(self, end):
+        # handle "-" and report the exact error position
+        buffer = self._buffer
+        start = self._pos
+        stop = buffer.find(end, start)
+        if stop == -1:
+            # raise at the invalid char if any, otherwise it's an EOF
+            _parse_int(buffer[start:], start)
+            self._pos = max(start, len(buffer))
+            raise InvalidTorrentDataException(
+                self._pos, "Unexpected EOF when reading torrent file", kind="eof"
+            )
+        value = _parse_int(buffer[start:stop], start)
+        self._pos = stop + 1
+        return value
 
     def _next_string(self, need_decode=True, field=None):
         length = self._next_int(self.STRING_DELIMITER)
         raw = self._read_byte(length)
         if need_decode:
-            encoding = self._encoding
-            if encoding == "auto":
-                self.encoding = encoding = detect(raw)
-            try:
-                string = raw.decode(encoding, self._error_handler)
-            except UnicodeDecodeError as e:
-                if self._error_use_bytes:
-                    return raw
-                else:
-                    msg = [
-                        "Fail to decode string at pos {pos} using encoding ",
-                        e.encoding,
-                    ]
-                    if field:
-                        msg.extend(
-                            [
-                                ' when parser field "',
-                                field,
-                                '"' ", maybe it is an hash field. ",
-                                'You can use self.hash_field("',
-                                field,
-                                '") ',
-                                "to let it be treated as hash value, ",
-                                "so this error may disappear",
-                            ]
-                        )
-                    raise InvalidTorrentDataException(
-                        self._pos - length + e.start, "".join(msg)
-                    )
-            return string
+            return self._decode_string(raw, self._pos - length, field)
         return raw
 
+    def _decode_string(self, raw, pos, field=None):
+        """
+        :param bytes raw: string content
+        :param int pos: position of string content, for error message
+        :param str field: dict key of this string, for error message
+        """
+        encoding = self._encoding
+        if encoding == "auto":
+            # not detected for the whole document, like in iterparse
+            encoding = "utf-8"
+        try:
+            string = raw.decode(encoding, self._error_handler)
+        except UnicodeDecodeError as e:
+            if self._auto_encoding:
+                fallback = detect(raw)
+                if fallback and fallback.lower() != encoding:
+                    try:
+                        return raw.decode(fallback, self._error_handler)
+                    except (UnicodeDecodeError, LookupError):
+                        pass
+            if self._error_use_bytes:
+                if self._stats is not None:
+                    self._stats.add_failure("string_fallback")
+                return raw
+            else:
+                msg = [
+                    "Fail to decode string at pos {pos} using encoding ",
+                    e.encoding,
+                ]
+                if field:
+                    msg.extend(
+                        [
+                            ' when parser field "',
+                            field,
+                            '"' ", maybe it is an hash field. ",
+                            'You can use self.hash_field("',
+                            field,
+                            '") ',
+                            "to let it be treated as hash value, ",
+                            "so this error may disappear",
+                        ]
+                    )
+                raise InvalidTorrentDataException(
+                    pos + e.start, "".join(msg), kind="string"
+                )
+        return string
+
     def _next_hash(self, p_len, need_list):
         raw = self._next_string(need_decode=False)
+        return self._split_hash(raw, self._pos - len(raw), p_len, need_list)
+
+    def _split_hash(self, raw, pos, p_len, need_list):
+        """
+        :param bytes raw: hash field content
+        :param int pos: position of hash field content, for error message
+        """
         if len(raw) % p_len != 0:
             raise InvalidTorrentDataException(
-                self._pos - len(raw), "Hash bit length not match at pos {pos}"
+                pos, "Hash bit length not match at pos {pos}"
             )
         if self._hash_raw:
             return raw
+        if self._hash_view and (need_list or len(raw) > p_len):
+            return PiecesView(raw, p_len)
         res = [
             binascii.hexlify(chunk).decode("ascii")
             for chunk in (raw[x : x + p_len] for x in range(0, len(raw), p_len))
@@ -355,49 +1261,866 @@ class BDecoder(object):
             return res[0]
         return res
 
-    @staticmethod
-    def _next_end():
-        return _END
-
-    def _next_type(self):
-        for (element_type, indicator) in self.TYPES:
-            indicator_length = len(indicator)
-            char = self._read_byte(indicator_length)
-            if indicator == char:
-                return element_type
-            self._seek_back(indicator_length)
-        raise InvalidTorrentDataException(self._pos)
-
-    def _type_to_func(self, t):
-        return getattr(self, "_next_" + t)
-
     def _next_element(self, field=None):
-        element_type = self._next_type()
-        if element_type is BDecoder.TYPE_STRING and field is not None:
-            element = self._type_to_func(element_type)(field=field)
-        else:
-            element = self._type_to_func(element_type)()
-        return element
+        """
+        Parse next element, dict and list are handled with an explicit stack
+        instead of recursion, so nesting level is only limited by max_depth.
 
+        :param str field: dict key of the element, for error message
+        """
+        buffer = self._buffer
+        size = len(buffer)
+        hash_fields = self._hash_fields
+        error_handler = self._error_handler
+        max_depth = self._max_depth
+        container_type = collections.OrderedDict if self._use_ordered_dict else dict
+        # raw bytes -> decoded string
+        strings = self._strings
+        cache_values = self._cache_strings
+        max_cached = self.STRING_CACHE_MAX_LENGTH
+        stats = self._stats
+        file_table = self._file_table
+        # frames of unfinished containers, as
+        # [container, is_dict, current_key, value_start, kind], kind is one of
+        # _FRAME_* to find info dict and info.files
+        stack = []
+        frame = None
+        while True:
+            pos = self._pos
+            lead = buffer[pos : pos + 1]
+            if stats is not None:
+                start_time = _timer()
+            if frame is not None:
+                # only dict value has a field name
+                field = frame[2] if frame[1] else _MISSING
+                if field is _MISSING:
+                    field = None
+                elif field in hash_fields:
+                    lead = None
 
-class BEncoder(object):
+            if lead is None:
+                value = self._next_hash(*hash_fields[field])
+            elif lead == b"d" or lead == b"l":
+                if len(stack) >= max_depth:
+                    raise InvalidTorrentDataException(
+                        pos,
+                        "Nesting level exceeds max depth at pos {pos}",
+                        kind="depth",
+                    )
+                self._pos = pos + 1
+                kind = _FRAME_OTHER
+                if pos == 0:
+                    kind = _FRAME_OUTMOST
+                elif frame is not None and frame[4] != _FRAME_OTHER:
+                    if frame[4] == _FRAME_OUTMOST and frame[2] == "info":
+                        kind = _FRAME_INFO
+                    elif frame[4] == _FRAME_INFO and frame[2] == "files":
+                        kind = _FRAME_FILES
+                if lead == b"d":
+                    frame = [container_type(), True, _MISSING, 0, kind]
+                elif kind == _FRAME_FILES and file_table:
+                    # decoded files go into the table one by one
+                    builder = _FileTableBuilder(FileTable(), container_type)
+                    frame = [builder, False, _MISSING, 0, kind]
+                else:
+                    frame = [[], False, _MISSING, 0, kind]
+                stack.append(frame)
+                if stats is not None:
+                    stats.add_container(
+                        self.TYPE_DICT if frame[1] else self.TYPE_LIST, len(stack)
+                    )
+                continue
+            elif lead == b"i":
+                stop = buffer.find(b"e", pos)
+                digits = buffer[pos + 1 : stop]
+                if stop != -1 and digits.isdigit():
+                    self._pos = stop + 1
+                    value = int(digits)
+                else:
+                    self._pos = pos + 1
+                    value = self._next_int()
+            elif lead == b"e":
+                self._pos = pos + 1
+                value = _END
+            elif not lead:
+                raise InvalidTorrentDataException(
+                    pos, "Unexpected EOF when reading torrent file", kind="eof"
+                )
+            else:
+                # inlined fast path of _next_string, for valid length only
+                colon = buffer.find(b":", pos)
+                digits = buffer[pos:colon]
+                if colon != -1 and digits.isdigit() and colon + 1 < size:
+                    start = colon + 1
+                    self._pos = end = start + int(digits)
+                    raw = buffer[start:end]
+                    cached = end - start <= max_cached and (
+                        cache_values
+                        or (frame is not None and frame[1] and frame[2] is _MISSING)
+                    )
+                    value = strings.get(raw) if cached else None
+                    if value is None:
+                        encoding = self._encoding
+                        try:
+                            if encoding == "auto":
+                                raise UnicodeError()
+                            value = raw.decode(encoding, error_handler)
+                        except UnicodeError:
+                            value = self._decode_string(raw, start, field)
+                        if cached:
+                            if len(strings) >= self.STRING_CACHE_SIZE:
+                                # start over, so new repeated strings are cached
+                                strings.clear()
+                            strings[raw] = value
+                else:
+                    value = self._next_string(field=field)
 
-    TYPES = {
-        (dict,): BDecoder.TYPE_DICT,
-        (list,): BDecoder.TYPE_LIST,
+            if stats is not None and value is not _END:
+                self._add_stats(stats, pos, lead, field, start_time)
+
+            # put value into unfinished containers, until one is not finished
+            while True:
+                if frame is None:
+                    return value
+                if not frame[1]:
+                    if value is _END:
+                        value = stack.pop()[0]
+                        if frame[4] == _FRAME_FILES and file_table:
+                            value = value.result()
+                        frame = stack[-1] if stack else None
+                        continue
+                    frame[0].append(value)
+                    break
+                k = frame[2]
+                if k is _MISSING:
+                    if value is _END:
+                        value = stack.pop()[0]
+                        frame = stack[-1] if stack else None
+                        continue
+                    if not isinstance(value, (str_type, bytes_type)):
+                        raise InvalidTorrentDataException(
+                            self._pos,
+                            "Type of dict key can't be " + type(value).__name__,
+                        )
+                    frame[2] = value
+                    frame[3] = self._pos
+                    break
+                frame[0][k] = value
+                frame[2] = _MISSING
+                if k == "encoding":
+                    self._encoding = _check_encoding(value, frame[3])
+                    # cached strings are decoded with the old encoding
+                    strings.clear()
+                if frame[4] == _FRAME_OUTMOST and k == "info":
+                    self._info_span = (frame[3], self._pos)
+                    self._info_v2 = (
+                        isinstance(value, dict) and value.get("meta version") == 2
+                    )
+                break
+
+    def _add_stats(self, stats, pos, lead, field, start_time):
+        """
+        Count the int or string element from ``pos`` to current position.
+
+        :param bytes lead: first byte of the element, None for a hash field
+        :param float start_time: when reading the element started
+        """
+        size = self._pos - pos
+        if lead == self.INT_INDICATOR:
+            stats.add_element(self.TYPE_INT, size)
+            return
+        stats.add_element(self.TYPE_STRING, size)
+        if lead is None:
+            colon = self._buffer.find(self.STRING_DELIMITER, pos)
+            stats.add_hash(field, self._pos - colon - 1)
+            stats.add_time("hash", _timer() - start_time)
+        else:
+            stats.add_time("string", _timer() - start_time)
+
+
+class _LazyDocument(object):
+    """
+    Shared decoding state of all lazy containers of one decoded document.
+    """
+
+    def __init__(self, decoder):
+        self.buffer = decoder._buffer
+        self.decoder = BDecoder(
+            self.buffer,
+            encoding=decoder._encoding,
+            errors=decoder._errors,
+            hash_fields=decoder._hash_fields,
+            hash_raw=decoder._hash_raw,
+            hash_view=decoder._hash_view,
+        )
+        self.decoder._buffer = self.buffer
+        self.decoder._auto_encoding = decoder._auto_encoding
+        self.hash_fields = decoder._hash_fields
+        if decoder._editable:
+            self.dict_type, self.list_type = EditableDict, EditableList
+        else:
+            self.dict_type, self.list_type = LazyDict, LazyList
+        self._encoding = decoder._encoding
+        # raw bytes -> decoded dict key, for keys decoded with keys_encoding
+        self._keys = {}
+        self._keys_encoding = None
+        # like eager decoding, an "encoding" field in a dict at any depth
+        # applies to strings after it, so find them all before decoding
+        self._encoding_starts = []
+        self._encodings = []
+        for start in _find_encoding_keys(self.buffer):
+            encoding = _check_encoding(self.value_at(start, "encoding"), start)
+            self._encoding_starts.append(start)
+            self._encodings.append(encoding)
+
+    def _prepare(self, pos):
+        decoder = self.decoder
+        decoder._pos = pos
+        index = bisect.bisect_left(self._encoding_starts, pos)
+        if index:
+            decoder._encoding = self._encodings[index - 1]
+        else:
+            decoder._encoding = self._encoding
+        return decoder
+
+    def key_at(self, pos):
+        """
+        :return: the decoded dict key start at ``pos`` and position after it
+        """
+        lead = self.buffer[pos : pos + 1]
+        if lead in (BDecoder.DICT_INDICATOR, BDecoder.LIST_INDICATOR):
+            raise InvalidTorrentDataException(
+                pos, "Type of dict key can't be container"
+            )
+        if lead == BDecoder.INT_INDICATOR:
+            raise InvalidTorrentDataException(pos, "Type of dict key can't be int")
+        decoder = self._prepare(pos)
+        length = decoder._next_int(BDecoder.STRING_DELIMITER)
+        raw = decoder._read_byte(length)
+        if decoder._encoding != self._keys_encoding:
+            self._keys = {}
+            self._keys_encoding = decoder._encoding
+        key = self._keys.get(raw)
+        if key is None:
+            key = decoder._decode_string(raw, decoder._pos - length)
+            if length <= BDecoder.STRING_CACHE_MAX_LENGTH:
+                if len(self._keys) >= BDecoder.STRING_CACHE_SIZE:
+                    self._keys.clear()
+                self._keys[raw] = key
+        return key, decoder._pos
+
+    def value_at(self, pos, field=None):
+        lead = self.buffer[pos : pos + 1]
+        if field is None or field not in self.hash_fields:
+            if lead == BDecoder.DICT_INDICATOR:
+                return self.dict_type(self, pos)
+            if lead == BDecoder.LIST_INDICATOR:
+                return self.list_type(self, pos)
+        decoder = self._prepare(pos)
+        if field is not None and field in self.hash_fields:
+            return decoder._next_hash(*self.hash_fields[field])
+        if lead == BDecoder.END_INDICATOR:
+            raise InvalidTorrentDataException(pos)
+        return decoder._next_element(field)
+
+
+class LazyDict(Mapping):
+    """
+    Read-only mapping returned by :any:`BDecoder` in lazy mode.
+
+    Keys are decoded when it's created, values are decoded when first
+    accessed then cached. Nested dict and list values are lazy too.
+    """
+
+    def __init__(self, document, pos):
+        """
+        :param _LazyDocument document:
+        :param int pos: position of the leading "d"
+        """
+        buffer = document.buffer
+        self._document = document
+        self._spans = collections.OrderedDict()
+        self._cache = {}
+        start = pos
+        pos += 1
+        while buffer[pos : pos + 1] != BDecoder.END_INDICATOR:
+            if not buffer[pos : pos + 1]:
+                raise InvalidTorrentDataException(
+                    pos, "Unexpected EOF when reading torrent file", kind="eof"
+                )
+            key, pos = document.key_at(pos)
+            end = _skip_element(buffer, pos)
+            self._spans[key] = (pos, end)
+            pos = end
+        self.span = (start, pos + 1)
+
+    def span_of(self, key):
+        """
+        :return: (start, end) position of the raw value of ``key``
+        """
+        return self._spans[key]
+
+    def __getitem__(self, key):
+        value = self._cache.get(key, _MISSING)
+        if value is _MISSING:
+            value = self._document.value_at(self._spans[key][0], key)
+            self._cache[key] = value
+        return value
+
+    def __contains__(self, key):
+        return key in self._spans
+
+    def __iter__(self):
+        return iter(self._spans)
+
+    def __len__(self):
+        return len(self._spans)
+
+    def __repr__(self):
+        return "{}({!r})".format(type(self).__name__, list(self._spans))
+
+
+class LazyList(Sequence):
+    """
+    Read-only sequence returned by :any:`BDecoder` in lazy mode.
+
+    See :any:`LazyDict`.
+    """
+
+    def __init__(self, document, pos):
+        """
+        :param _LazyDocument document:
+        :param int pos: position of the leading "l"
+        """
+        buffer = document.buffer
+        self._document = document
+        self._starts = []
+        start = pos
+        pos += 1
+        while buffer[pos : pos + 1] != BDecoder.END_INDICATOR:
+            self._starts.append(pos)
+            pos = _skip_element(buffer, pos)
+        self._cache = [_MISSING] * len(self._starts)
+        self.span = (start, pos + 1)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        value = self._cache[index]
+        if value is _MISSING:
+            value = self._document.value_at(self._starts[index])
+            self._cache[index] = value
+        return value
+
+    def __len__(self):
+        return len(self._starts)
+
+    def __eq__(self, other):
+        if isinstance(other, (list, LazyList)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    __hash__ = None
+
+    def __repr__(self):
+        return "{}(<{} items>)".format(type(self).__name__, len(self))
+
+
+class EditableDict(LazyDict, MutableMapping):
+    """
+    Mutable :any:`LazyDict` returned by :any:`BDecoder` in editable mode.
+
+    It keeps where every original item is, :any:`BEncoder` writes items
+    which are not set or deleted, and whose value is not accessed or is
+    unchanged, as their original bytes without encoding them again. New keys
+    are added to the end like built-in dict, and :any:`span_of` is None for
+    keys set after decoding.
+    """
+
+    def __init__(self, document, pos):
+        """
+        :param _LazyDocument document:
+        :param int pos: position of the leading "d"
+        """
+        super(EditableDict, self).__init__(document, pos)
+        self._modified = False
+        self._key_starts = {}
+        start = self.span[0] + 1
+        for key, (_, end) in self._spans.items():
+            self._key_starts[key] = start
+            start = end
+
+    def __setitem__(self, key, value):
+        self._modified = True
+        self._spans[key] = None
+        self._cache[key] = value
+
+    def __delitem__(self, key):
+        del self._spans[key]
+        self._cache.pop(key, None)
+        self._modified = True
+
+
+class EditableList(LazyList, MutableSequence):
+    """
+    Mutable :any:`LazyList` returned by :any:`BDecoder` in editable mode.
+
+    See :any:`EditableDict`.
+    """
+
+    def __init__(self, document, pos):
+        """
+        :param _LazyDocument document:
+        :param int pos: position of the leading "l"
+        """
+        super(EditableList, self).__init__(document, pos)
+        self._modified = False
+        self._ends = self._starts[1:] + [self.span[1] - 1]
+
+    def __setitem__(self, index, value):
+        if isinstance(index, slice):
+            value = list(value)
+            self._starts[index] = [None] * len(value)
+            self._ends[index] = [None] * len(value)
+        else:
+            self._starts[index] = None
+            self._ends[index] = None
+        self._cache[index] = value
+        self._modified = True
+
+    def __delitem__(self, index):
+        del self._starts[index]
+        del self._ends[index]
+        del self._cache[index]
+        self._modified = True
+
+    def insert(self, index, value):
+        self._starts.insert(index, None)
+        self._ends.insert(index, None)
+        self._cache.insert(index, value)
+        self._modified = True
+
+
+class _StreamReader(object):
+    """
+    Read a binary file-like object in chunks, keeps at most one chunk (and the
+    value being read) in memory.
+    """
+
+    # longest content of an integer, including the length of a string
+    MAX_INT_LENGTH = 1024
+
+    def __init__(self, source, chunk_size):
+        if isinstance(source, (bytes_type, bytearray, memoryview, mmap.mmap)):
+            self._source_read = None
+            self._chunk = bytes_type(source)
+        else:
+            self._source_read = source.read
+            self._chunk = b""
+        self._chunk_size = chunk_size
+        self._offset = 0
+        # absolute position of current chunk
+        self._base = 0
+
+    @property
+    def pos(self):
+        return self._base + self._offset
+
+    def _fill(self):
+        """
+        :return: False if EOF
+        """
+        if self._offset < len(self._chunk):
+            return True
+        if self._source_read is None:
+            return False
+        chunk = self._source_read(self._chunk_size)
+        self._base += len(self._chunk)
+        self._chunk = chunk
+        self._offset = 0
+        return len(chunk) > 0
+
+    def peek(self):
+        """
+        :return: next byte without consuming it, empty if EOF
+        """
+        if not self._fill():
+            return b""
+        return self._chunk[self._offset : self._offset + 1]
+
+    def skip(self, count):
+        # only used after peek, so the bytes are in current chunk
+        self._offset += count
+
+    def read(self, count):
+        """
+        :return: exactly ``count`` bytes
+        """
+        if count < 0:
+            raise InvalidTorrentDataException(self.pos)
+        parts = []
+        while count > 0:
+            if not self._fill():
+                raise InvalidTorrentDataException(
+                    self.pos, "Unexpected EOF when reading torrent file", kind="eof"
+                )
+            if not parts and self._offset == 0 and count > len(self._chunk):
+                # big value, read rest of it directly instead of in chunks
+                rest = self._read_direct(count - len(self._chunk))
+                parts.append(self._chunk)
+                parts.extend(rest)
+                self._offset = len(self._chunk)
+                self._base += sum(len(x) for x in rest)
+                break
+            part = self._chunk[self._offset : self._offset + count]
+            self._offset += len(part)
+            count -= len(part)
+            parts.append(part)
+        return parts[0] if len(parts) == 1 else b"".join(parts)
+
+    def _read_direct(self, count):
+        parts = []
+        while count > 0 and self._source_read is not None:
+            part = self._source_read(count)
+            if not part:
+                break
+            parts.append(part)
+            count -= len(part)
+        if count > 0:
+            raise InvalidTorrentDataException(
+                self._base + len(self._chunk) + sum(len(x) for x in parts),
+                "Unexpected EOF when reading torrent file",
+                kind="eof",
+            )
+        return parts
+
+    def read_until(self, end):
+        """
+        :return: content before ``end`` and consume ``end`` too, the content
+          must be an integer, whose length is bound by chunk size
+        """
+        start = self.pos
+        parts = []
+        size = 0
+        while True:
+            if not self._fill():
+                _parse_int(b"".join(parts), start)
+                raise InvalidTorrentDataException(
+                    self.pos, "Unexpected EOF when reading torrent file", kind="eof"
+                )
+            stop = self._chunk.find(end, self._offset)
+            if stop != -1:
+                parts.append(self._chunk[self._offset : stop])
+                self._offset = stop + 1
+                return _parse_int(b"".join(parts), start)
+            part = self._chunk[self._offset :]
+            self._offset = len(self._chunk)
+            parts.append(part)
+            size += len(part)
+            if size > self.MAX_INT_LENGTH:
+                _parse_int(b"".join(parts), start)
+                raise InvalidTorrentDataException(
+                    start, "Integer too long at pos {pos}"
+                )
+
+
+class PiecesView(Sequence):
+    """
+    Read-only sequence of hex strings over the raw bytes of a hash field,
+    returned by :any:`BDecoder` when ``hash_view`` option is enabled.
+
+    It compares equal to a list of the same hex strings, and
+    :any:`BEncoder` writes its raw bytes back without hex conversion.
+    """
+
+    __slots__ = ("_raw", "_block_length")
+
+    def __init__(self, raw, block_length=20):
+        """
+        :param bytes raw: concatenated hash blocks
+        :param int block_length: length of every hash block
+        """
+        if len(raw) % block_length != 0:
+            raise ValueError("Raw bytes length is not multiple of block length")
+        self._raw = raw
+        self._block_length = block_length
+
+    @property
+    def block_length(self):
+        return self._block_length
+
+    def raw(self, index):
+        """
+        :return: raw bytes of the ``index``-th hash block
+        :rtype: bytes
+        """
+        n = len(self)
+        if index < 0:
+            index += n
+        if not 0 <= index < n:
+            raise IndexError("PiecesView index out of range")
+        b = self._block_length
+        return self._raw[index * b : (index + 1) * b]
+
+    def hex(self, index):
+        """
+        :return: hex string of the ``index``-th hash block
+        :rtype: str
+        """
+        return binascii.hexlify(self.raw(index)).decode("ascii")
+
+    def tobytes(self):
+        """
+        :return: all hash blocks concatenated
+        :rtype: bytes
+        """
+        return bytes_type(self._raw)
+
+    __bytes__ = tobytes
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            b = self._block_length
+            if step == 1:
+                return PiecesView(self._raw[start * b : max(start, stop) * b], b)
+            return PiecesView(
+                b"".join(self.raw(i) for i in range(start, stop, step)), b
+            )
+        return self.hex(index)
+
+    def __iter__(self):
+        raw = self._raw
+        b = self._block_length
+        for x in range(0, len(raw), b):
+            yield binascii.hexlify(raw[x : x + b]).decode("ascii")
+
+    def __len__(self):
+        return len(self._raw) // self._block_length
+
+    def __eq__(self, other):
+        if isinstance(other, PiecesView):
+            return (
+                self._block_length == other._block_length
+                and self.tobytes() == other.tobytes()
+            )
+        if isinstance(other, (list, tuple)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    __hash__ = None
+
+    def __repr__(self):
+        return "{}(<{} blocks of {} bytes>)".format(
+            type(self).__name__, len(self), self._block_length
+        )
+
+
+class FileTable(Sequence):
+    """
+    Compact read-only sequence of ``info.files`` of a multi-file torrent,
+    returned by :any:`TorrentFileParser` when ``file_table`` option is
+    enabled.
+
+    Lengths and start offsets of files in torrent data are kept in
+    ``array('Q')`` as :any:`lengths` and :any:`offsets`, and paths as tuples
+    sharing same path items in :any:`paths`. Other fields of a file, like
+    ``attr`` and ``md5sum``, are kept as they are. The table compares equal to
+    the original list, and :any:`BEncoder` writes it as the list.
+
+    An item is a read-only snapshot of a file built when it is accessed, as a
+    :any:`FrozenDict` whose ``path`` is a :any:`FrozenList`, so it can't be
+    changed as if it was in the table.
+    """
+
+    __slots__ = ("lengths", "offsets", "paths", "_keys", "_extra")
+
+    def __init__(self, files=()):
+        """
+        :param List[dict] files: items of ``info.files``
+        :raise: ValueError if a file has no non-negative int ``length`` or no
+          list ``path``
+        """
+        self.lengths = array(_ARRAY_UINT64)
+        self.offsets = array(_ARRAY_UINT64)
+        self.paths = []
+        # keys of every file in order, same key tuples are shared
+        self._keys = []
+        # index -> fields except length and path
+        self._extra = {}
+        builder = _FileTableBuilder(self)
+        for f in files:
+            builder.add(f)
+
+    @property
+    def total_length(self):
+        """
+        :rtype: int
+        """
+        if not self.lengths:
+            return 0
+        return self.offsets[-1] + self.lengths[-1]
+
+    def file_at(self, offset):
+        """
+        :param int offset: offset in torrent data
+        :return: index of the file containing byte at ``offset``
+        :rtype: int
+        """
+        if not 0 <= offset < self.total_length:
+            raise IndexError("Offset out of range")
+        return bisect.bisect_right(self.offsets, offset) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("FileTable index out of range")
+        extra = self._extra.get(index)
+        items = []
+        for key in self._keys[index]:
+            if key == "length":
+                items.append((key, self.lengths[index]))
+            elif key == "path":
+                items.append((key, FrozenList(self.paths[index])))
+            else:
+                items.append((key, extra[key]))
+        return FrozenDict(items)
+
+    def __len__(self):
+        return len(self.lengths)
+
+    def __eq__(self, other):
+        if isinstance(other, (list, tuple, FileTable)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    __hash__ = None
+
+    def __repr__(self):
+        return "{}(<{} files>)".format(type(self).__name__, len(self))
+
+
+class _FileTableBuilder(object):
+    """
+    Fill columns of a :any:`FileTable` with items of ``info.files`` one by
+    one, so :any:`BDecoder` does not keep the decoded dicts.
+    """
+
+    def __init__(self, table, dict_type=dict):
+        """
+        :param FileTable table: the table to be filled
+        :param type dict_type: type of dicts in the list of items
+        """
+        self.table = table
+        self._dict_type = dict_type
+        # items of ``info.files`` if one of them can't be in the table
+        self.files = None
+        self._names = {}
+        self._key_tuples = {}
+        self._offset = 0
+
+    def add(self, f):
+        """
+        :raise: ValueError if ``f`` is not a valid file
+        """
+        table = self.table
+        index = len(table.lengths)
+        length = f.get("length") if isinstance(f, dict) else None
+        path = f.get("path") if isinstance(f, dict) else None
+        if (
+            isinstance(length, bool)
+            or not isinstance(path, list)
+            or any(isinstance(p, (dict, list)) for p in path)
+        ):
+            raise ValueError("Invalid file at index {}".format(index))
+        try:
+            table.lengths.append(length)
+        except (TypeError, OverflowError):
+            raise ValueError("Invalid file at index {}".format(index))
+        table.offsets.append(self._offset)
+        self._offset += length
+        names = self._names
+        table.paths.append(tuple(names.setdefault(p, p) for p in path))
+        keys = tuple(f)
+        table._keys.append(self._key_tuples.setdefault(keys, keys))
+        if len(keys) > 2:
+            table._extra[index] = _convert_containers(
+                dict((k, v) for k, v in f.items() if k != "length" and k != "path"),
+                FrozenDict,
+                FrozenList,
+            )
+
+    def append(self, f):
+        """
+        Add ``f`` like :any:`add`, but keep all items as a list from the first
+        invalid one.
+        """
+        if self.files is None:
+            try:
+                self.add(f)
+                return
+            except ValueError:
+                self.files = [
+                    _convert_containers(item, self._dict_type, list)
+                    for item in self.table
+                ]
+        self.files.append(f)
+
+    def result(self):
+        """
+        :return: the table, or list of all items if one is invalid
+        :rtype: FileTable|list
+        """
+        return self.table if self.files is None else self.files
+
+
+class BEncoder(object):
+
+    TYPES = {
+        (dict, LazyDict): BDecoder.TYPE_DICT,
+        (list, LazyList, PiecesView, FileTable): BDecoder.TYPE_LIST,
         (int,): BDecoder.TYPE_INT,
-        (str_type, bytes_type): BDecoder.TYPE_STRING,
+        (str_type, bytes_type, bytearray, memoryview): BDecoder.TYPE_STRING,
+        (EditableDict, EditableList): "editable",
     }
 
-    def __init__(self, data, encoding="utf-8", hash_fields=None):
+    # decoded values of these types can't be changed in place
+    _IMMUTABLE_TYPES = (int, str_type, bytes_type, PiecesView)
+
+    def __init__(self, data, encoding="utf-8", hash_fields=None, stats=None):
         """
         :param dict|list|int|str data: data will be encoded
         :param str encoding: string field output encoding
         :param List[str] hash_fields: see
           :any:`BDecoder.__init__`
+        :param bool|Callable[[Stats], None] stats: if True or a callable,
+          collect :any:`Stats` of every :any:`encode` and :any:`encode_to`
+          call, see :any:`BDecoder.__init__`
         """
         self._data = data
         self._encoding = encoding
+        self._stats_hook = stats
+        self.stats = None
+        # stats of running encode call, and nesting level of current element
+        self._stats = None
+        self._depth = 0
+        self._write = None
+        self._chunk_size = 0
         self._hash_fields = []
         if hash_fields is not None:
             self._hash_fields = hash_fields
@@ -417,7 +2140,13 @@ class BEncoder(object):
 
         :rtype: bytes
         """
-        return b"".join(self._output_element(self._data))
+        out = bytearray()
+        self._prepare()
+        if self._stats_hook:
+            self._run_with_stats(self._data, out)
+        else:
+            self._encode_element(self._data, out)
+        return bytes_type(out)
 
     def encode_to_filelike(self):
         """
@@ -425,25 +2154,142 @@ class BEncoder(object):
 
         :rtype: BytesIO
         """
-        return io.BytesIO(self.encode())
+        f = io.BytesIO()
+        self.encode_to(f)
+        f.seek(0)
+        return f
+
+    def encode_to(self, fp, chunk_size=64 * 1024):
+        """
+        Encode and write to a binary file-like object or a socket in chunks,
+        so the full encoded data is never in memory. Strings not shorter than
+        ``chunk_size`` are written directly without being copied.
 
-    def _output_string(self, data):
+        If an error happened, data before it is already written.
+
+        :param file|socket fp: object with ``write`` or ``sendall`` method
+        :param int chunk_size: write when buffered data reaches this size
+        """
+        out = bytearray()
+        self._prepare()
+        self._write = getattr(fp, "write", None) or fp.sendall
+        self._chunk_size = chunk_size
+        try:
+            if self._stats_hook:
+                self._run_with_stats(self._data, out)
+            else:
+                self._encode_element(self._data, out)
+            if out:
+                self._write(out)
+        finally:
+            self._write = None
+
+    def _flush(self, out):
+        self._write(out)
+        del out[:]
+
+    def _run_with_stats(self, data, out):
+        self.stats = self._stats = stats = Stats()
+        self._depth = 0
+        start_time = _timer()
+        try:
+            self._encode_element(data, out)
+        except Exception as e:
+            if isinstance(e, InvalidTorrentDataException):
+                stats.add_failure(e.kind)
+            else:
+                stats.add_failure(type(e).__name__)
+            raise
+        finally:
+            self._stats = None
+            stats.add_time("encode", _timer() - start_time)
+            if callable(self._stats_hook):
+                self._stats_hook(stats)
+
+    def encoded_length(self):
+        """
+        Calculate length of encoded data without encoding it.
+
+        :rtype: int
+        """
+        self._prepare()
+        return self._element_length(self._data)
+
+    def _prepare(self):
+        self._write = None
+        self._hash_field_set = frozenset(self._hash_fields)
+        # exact type -> (encode method, length method), subclasses of TYPES
+        # are added when first met
+        self._dispatch = {}
+        for types, t in self.TYPES.items():
+            for tp in types:
+                self._dispatch[tp] = self._type_to_func(t)
+
+    def _type_to_func(self, t):
+        return getattr(self, "_encode_" + t), getattr(self, "_length_" + t)
+
+    def _funcs_of(self, data):
+        funcs = self._dispatch.get(type(data))
+        if funcs is None:
+            for types, t in self.TYPES.items():
+                if isinstance(data, types):
+                    funcs = self._dispatch[type(data)] = self._type_to_func(t)
+                    break
+            else:
+                raise InvalidTorrentDataException(
+                    None,
+                    "Invalid type for torrent file: " + type(data).__name__,
+                )
+        return funcs
+
+    def _encode_element(self, data, out):
+        self._funcs_of(data)[0](data, out)
+
+    def _element_length(self, data):
+        return self._funcs_of(data)[1](data)
+
+    def _encode_string(self, data, out):
         if isinstance(data, str_type):
             data = data.encode(self._encoding)
-        yield str(len(data)).encode("ascii")
-        yield BDecoder.STRING_DELIMITER
-        yield data
+        elif isinstance(data, memoryview) and data.itemsize != 1:
+            data = data.tobytes()
+        length = str(len(data)).encode("ascii")
+        out += length
+        out += BDecoder.STRING_DELIMITER
+        if self._write is not None and len(data) >= self._chunk_size:
+            self._flush(out)
+            self._write(data)
+        else:
+            out += data
+        if self._stats is not None:
+            self._stats.add_element(BDecoder.TYPE_STRING, len(length) + 1 + len(data))
+
+    def _length_string(self, data):
+        if isinstance(data, str_type):
+            data = data.encode(self._encoding)
+        elif isinstance(data, memoryview) and data.itemsize != 1:
+            data = data.tobytes()
+        return len(str(len(data))) + 1 + len(data)
+
+    def _encode_int(self, data, out):
+        digits = str(data).encode("ascii")
+        out += BDecoder.INT_INDICATOR
+        out += digits
+        out += BDecoder.END_INDICATOR
+        if self._stats is not None:
+            self._stats.add_element(BDecoder.TYPE_INT, len(digits) + 2)
 
     @staticmethod
-    def _output_int(data):
-        yield BDecoder.INT_INDICATOR
-        yield str(data).encode("ascii")
-        yield BDecoder.END_INDICATOR
+    def _length_int(data):
+        return len(str(data)) + 2
 
-    def _output_decode_hash(self, data):
+    @staticmethod
+    def _check_hash(data):
+        """
+        :return: list of hash hex strings in hash field value ``data``
+        """
         if isinstance(data, str_type):
             data = [data]
-        result = []
         for hash_line in data:
             if not isinstance(hash_line, str_type):
                 raise InvalidTorrentDataException(
@@ -462,64 +2308,233 @@ class BEncoder(object):
                     + str(len(hash_line))
                     + ") is a not even number",
                 )
+        return data
+
+    def _encode_decode_hash(self, data, out, key=None):
+        """
+        :param str key: dict key of the hash field, for stats
+        """
+        if self._stats is not None:
+            start_time = _timer()
+        if isinstance(data, PiecesView):
+            raw = data._raw
+        else:
             try:
-                raw = binascii.unhexlify(hash_line)
+                raw = binascii.unhexlify("".join(self._check_hash(data)))
             except binascii.Error as e:
                 raise InvalidTorrentDataException(
                     None,
                     str(e),
                 )
-            result.append(raw)
-        for x in self._output_string(b"".join(result)):
-            yield x
+        self._encode_string(raw, out)
+        if self._stats is not None:
+            self._stats.add_hash(key, len(raw))
+            self._stats.add_time("hash", _timer() - start_time)
+
+    def _length_decode_hash(self, data):
+        if isinstance(data, PiecesView):
+            return self._length_string(data._raw)
+        length = sum(len(x) for x in self._check_hash(data)) // 2
+        return len(str(length)) + 1 + length
+
+    @staticmethod
+    def _check_key(k):
+        if not isinstance(k, str_type) and not isinstance(k, bytes_type):
+            raise InvalidTorrentDataException(
+                None,
+                "Dict key must be " + str_type.__name__ + " or " + bytes_type.__name__,
+            )
 
-    def _output_dict(self, data):
-        yield BDecoder.DICT_INDICATOR
+    def _encode_dict(self, data, out):
+        hash_fields = self._hash_field_set
+        encoding = self._encoding
+        write = self._write
+        chunk_size = self._chunk_size
+        stats = self._stats
+        if stats is not None:
+            self._depth += 1
+            stats.add_container(BDecoder.TYPE_DICT, self._depth)
+        out += BDecoder.DICT_INDICATOR
         for k, v in data.items():
-            if not isinstance(k, str_type) and not isinstance(k, bytes_type):
-                raise InvalidTorrentDataException(
-                    None,
-                    "Dict key must be "
-                    + str_type.__name__
-                    + " or "
-                    + bytes_type.__name__,
-                )
-            for x in self._output_element(k):
-                yield x
-            if k in self._hash_fields:
-                for x in self._output_decode_hash(v):
-                    yield x
+            if type(k) is str_type:
+                k_raw = k.encode(encoding)
+            elif isinstance(k, bytes_type):
+                k_raw = k
+            else:
+                self._check_key(k)
+                k_raw = k.encode(encoding)
+            length = str(len(k_raw)).encode("ascii")
+            out += length
+            out += BDecoder.STRING_DELIMITER
+            out += k_raw
+            if stats is not None:
+                stats.add_element(BDecoder.TYPE_STRING, len(length) + 1 + len(k_raw))
+            if k in hash_fields:
+                self._encode_decode_hash(v, out, k)
+            elif type(v) is int and stats is None:
+                out += BDecoder.INT_INDICATOR
+                out += str(v).encode("ascii")
+                out += BDecoder.END_INDICATOR
+            elif type(v) is str_type:
+                self._encode_string(v, out)
             else:
-                for x in self._output_element(v):
-                    yield x
-        yield BDecoder.END_INDICATOR
+                self._encode_element(v, out)
+            if write is not None and len(out) >= chunk_size:
+                self._flush(out)
+        out += BDecoder.END_INDICATOR
+        if stats is not None:
+            self._depth -= 1
 
-    def _output_list(self, data):
-        yield BDecoder.LIST_INDICATOR
-        for v in data:
-            for x in self._output_element(v):
-                yield x
-        yield BDecoder.END_INDICATOR
+    def _length_dict(self, data):
+        hash_fields = self._hash_field_set
+        length = 2
+        for k, v in data.items():
+            self._check_key(k)
+            length += self._length_string(k)
+            if k in hash_fields:
+                length += self._length_decode_hash(v)
+            else:
+                length += self._element_length(v)
+        return length
 
-    def _type_to_func(self, t):
-        return getattr(self, "_output_" + t)
+    def _encode_list(self, data, out):
+        write = self._write
+        chunk_size = self._chunk_size
+        stats = self._stats
+        if stats is not None:
+            self._depth += 1
+            stats.add_container(BDecoder.TYPE_LIST, self._depth)
+        out += BDecoder.LIST_INDICATOR
+        for v in data:
+            if type(v) is str_type:
+                self._encode_string(v, out)
+            else:
+                self._encode_element(v, out)
+            if write is not None and len(out) >= chunk_size:
+                self._flush(out)
+        out += BDecoder.END_INDICATOR
+        if stats is not None:
+            self._depth -= 1
 
-    def _output_element(self, data):
-        for types, t in self.TYPES.items():
-            if isinstance(data, types):
-                # noinspection PyCallingNonCallable
-                return self._type_to_func(t)(data)
-        raise InvalidTorrentDataException(
-            None,
-            "Invalid type for torrent file: " + type(data).__name__,
-        )
+    def _length_list(self, data):
+        return 2 + sum(self._element_length(v) for v in data)
 
+    def _unchanged(self, value):
+        """
+        :param value: cached value of an editable container, or ``_MISSING``
+          if it is not accessed
+        :return: True if original bytes of ``value`` can be written
+        """
+        if value is _MISSING or type(value) in self._IMMUTABLE_TYPES:
+            return True
+        if isinstance(value, (EditableDict, EditableList)):
+            if value._modified:
+                return False
+            if isinstance(value, EditableDict):
+                return all(self._unchanged(v) for v in value._cache.values())
+            return all(self._unchanged(v) for v in value._cache)
+        return False
 
-class TorrentFileParser(object):
-    HASH_FIELD_DEFAULT_PARAMS = {
-        # field length need_list
-        "pieces": (20, True),
-        "ed2k": (16, False),
+    def _editable_parts(self, data):
+        """
+        :return: iterator of (start, end, None, None) of original bytes can be
+          written as they are, adjacent ones are merged, or (None, None, key,
+          value) of an item need to be encoded, key is ``_MISSING`` for list
+          items
+        """
+        if isinstance(data, EditableDict):
+            items = (
+                (
+                    None if span is None else data._key_starts[key],
+                    None if span is None else span[1],
+                    key,
+                    data._cache.get(key, _MISSING),
+                )
+                for key, span in data._spans.items()
+            )
+        else:
+            items = (
+                (start, end, _MISSING, value)
+                for start, end, value in zip(data._starts, data._ends, data._cache)
+            )
+        pending = None
+        for start, end, key, value in items:
+            if start is not None and self._unchanged(value):
+                if pending is not None and pending[1] == start:
+                    pending = (pending[0], end, None, None)
+                else:
+                    if pending is not None:
+                        yield pending
+                    pending = (start, end, None, None)
+                continue
+            if pending is not None:
+                yield pending
+                pending = None
+            yield None, None, key, value
+        if pending is not None:
+            yield pending
+
+    def _encode_raw(self, buffer, start, end, out):
+        if self._write is not None and end - start >= self._chunk_size:
+            self._flush(out)
+            self._write(memoryview(buffer)[start:end])
+        else:
+            out += buffer[start:end]
+
+    def _encode_editable(self, data, out):
+        buffer = data._document.buffer
+        if self._unchanged(data):
+            self._encode_raw(buffer, data.span[0], data.span[1], out)
+            return
+        is_dict = isinstance(data, EditableDict)
+        stats = self._stats
+        if stats is not None:
+            # unchanged parts are copied as raw bytes, they are not counted
+            self._depth += 1
+            stats.add_container(
+                BDecoder.TYPE_DICT if is_dict else BDecoder.TYPE_LIST, self._depth
+            )
+        out += BDecoder.DICT_INDICATOR if is_dict else BDecoder.LIST_INDICATOR
+        for start, end, key, value in self._editable_parts(data):
+            if start is not None:
+                self._encode_raw(buffer, start, end, out)
+                continue
+            if key is not _MISSING:
+                self._check_key(key)
+                self._encode_string(key, out)
+                if key in self._hash_field_set:
+                    self._encode_decode_hash(value, out, key)
+                    continue
+            self._encode_element(value, out)
+            if self._write is not None and len(out) >= self._chunk_size:
+                self._flush(out)
+        out += BDecoder.END_INDICATOR
+        if stats is not None:
+            self._depth -= 1
+
+    def _length_editable(self, data):
+        if self._unchanged(data):
+            return data.span[1] - data.span[0]
+        length = 2
+        for start, end, key, value in self._editable_parts(data):
+            if start is not None:
+                length += end - start
+                continue
+            if key is not _MISSING:
+                self._check_key(key)
+                length += self._length_string(key)
+                if key in self._hash_field_set:
+                    length += self._length_decode_hash(value)
+                    continue
+            length += self._element_length(value)
+        return length
+
+
+class TorrentFileParser(object):
+    HASH_FIELD_DEFAULT_PARAMS = {
+        # field length need_list
+        "pieces": (20, True),
+        "ed2k": (16, False),
         "filehash": (20, False),
         "pieces root": (32, False),
     }
@@ -532,6 +2547,13 @@ class TorrentFileParser(object):
         errors=BDecoder.ERROR_HANDLER_USEBYTES,
         hash_fields=None,
         hash_raw=False,
+        lazy=False,
+        max_depth=None,
+        hash_view=False,
+        stats=None,
+        editable=False,
+        cache_strings=False,
+        file_table=False,
     ):
         """
         See :any:`BDecoder.__init__` for parameter description.
@@ -544,6 +2566,13 @@ class TorrentFileParser(object):
         :param str errors:
         :param Dict[str, Tuple[int, bool]] hash_fields:
         :param bool hash_raw:
+        :param bool lazy:
+        :param int max_depth:
+        :param bool hash_view:
+        :param bool|Callable[[Stats], None] stats:
+        :param bool editable:
+        :param bool cache_strings:
+        :param bool file_table:
         """
         torrent_hash_fields = dict(TorrentFileParser.HASH_FIELD_DEFAULT_PARAMS)
         if hash_fields is not None:
@@ -556,6 +2585,13 @@ class TorrentFileParser(object):
             errors,
             torrent_hash_fields,
             hash_raw,
+            lazy,
+            max_depth,
+            hash_view,
+            stats,
+            editable,
+            cache_strings,
+            file_table,
         )
 
     def hash_field(self, name, block_length=20, need_dict=False):
@@ -570,153 +2606,2052 @@ class TorrentFileParser(object):
         self._decoder.hash_field(name, block_length, need_dict)
         return self
 
-    def parse(self):
+    def parse(self):
+        """
+        Parse provided file
+        """
+        return self._decoder.decode()
+
+    def extract(self, paths):
+        """
+        Parse only the values at ``paths`` of provided file,
+        see :any:`BDecoder.extract`
+
+        :param List[str] paths:
+        :rtype: dict
+        """
+        return self._decoder.extract(paths)
+
+    @property
+    def info_hash_v1(self):
+        """
+        SHA1 hex digest of the raw ``info`` dict bytes of last parsed torrent,
+        None if it has no ``info`` dict.
+
+        :rtype: str|None
+        """
+        return self._decoder.info_hash_v1
+
+    @property
+    def info_hash_v2(self):
+        """
+        SHA256 hex digest of the raw ``info`` dict bytes of last parsed
+        torrent, None if it is not a v2(``meta version`` 2) or hybrid torrent.
+
+        :rtype: str|None
+        """
+        return self._decoder.info_hash_v2
+
+    @property
+    def detected_encoding(self):
+        """
+        Encoding detected in last parsing when ``encoding`` is "auto",
+        otherwise None.
+
+        :rtype: str|None
+        """
+        return self._decoder.detected_encoding
+
+    @property
+    def encoding_confidence(self):
+        """
+        Confidence between 0 and 1 of :any:`detected_encoding`, 1 if it is
+        from the ``encoding`` field or all sampled names are valid utf-8.
+
+        :rtype: float|None
+        """
+        return self._decoder.encoding_confidence
+
+    @property
+    def stats(self):
+        """
+        :any:`Stats` of last parsing, None if ``stats`` option is disabled
+
+        :rtype: Stats|None
+        """
+        return self._decoder.stats
+
+
+class TorrentFileCreator(object):
+    def __init__(self, data, encoding="utf-8", hash_fields=None, stats=None):
+        """
+        See :any:`BEncoder.__init__` for parameter description.
+        This class will use some default ``hash_fields`` values,
+        compare to use ``BEncoder`` directly.
+
+        :param dict|list|int|str data:
+        :param str encoding:
+        :param List[str] hash_fields:
+        :param bool|Callable[[Stats], None] stats:
+        """
+        torrent_hash_fields = list(TorrentFileParser.HASH_FIELD_DEFAULT_PARAMS.keys())
+        if hash_fields is not None:
+            torrent_hash_fields.extend(hash_fields)
+
+        self._encoder = BEncoder(
+            data,
+            encoding,
+            torrent_hash_fields,
+            stats,
+        )
+
+    @property
+    def stats(self):
+        """
+        :any:`Stats` of last creating, None if ``stats`` option is disabled
+
+        :rtype: Stats|None
+        """
+        return self._encoder.stats
+
+    def hash_field(self, name):
+        """
+        See :any:`BEncoder.hash_field` for parameter description
+
+        :param name:
+        :return: return self, so you can chained call
+        """
+        self._encoder.hash_field(name)
+        return self
+
+    def create_filelike(self):
+        """
+        Create a file-like(BytesIO) object according to provided data
+
+        :rtype: BytesIO
+        """
+        return self._encoder.encode_to_filelike()
+
+    def create(self, filename, streaming=False):
+        """
+        Create torrent file according to provided data
+
+        :param filename: output filename
+        :param bool streaming: write to file in chunks while encoding, see
+          :any:`BEncoder.encode_to`. file may be incomplete if error happened
+        :return:
+        """
+        with open(filename, "wb") as f:
+            if streaming:
+                self._encoder.encode_to(f)
+            else:
+                f.write(self._encoder.encode())
+
+
+def encode(data, encoding="utf-8", hash_fields=None):
+    """
+    Shortcut function for encode python object to torrent file format(bencode)
+
+    See :any:`BEncoder.__init__` for parameter description
+
+    :param dict|list|int|str|bytes data: data to be encoded
+    :param str encoding:
+    :param List[str] hash_fields:
+    :rtype: bytes
+    """
+    return BEncoder(data, encoding, hash_fields).encode()
+
+
+def decode(
+    data,
+    use_ordered_dict=False,
+    encoding="utf-8",
+    errors="strict",
+    hash_fields=None,
+    hash_raw=False,
+    lazy=False,
+    max_depth=None,
+    hash_view=False,
+    editable=False,
+    cache_strings=False,
+):
+    """
+    Shortcut function for decode bytes as torrent file format(bencode) to python
+    object
+
+    See :any:`BDecoder.__init__` for parameter description
+
+    :param bytes|file data: data or file object to be decoded
+    :param bool use_ordered_dict:
+    :param str encoding:
+    :param str errors:
+    :param Dict[str, Tuple[int, bool]] hash_fields:
+    :param bool hash_raw:
+    :param bool lazy:
+    :param int max_depth:
+    :param bool hash_view:
+    :param bool editable:
+    :param bool cache_strings:
+    :rtype: dict|list|int|str|bytes|bytes
+    """
+    return BDecoder(
+        data,
+        use_ordered_dict,
+        encoding,
+        errors,
+        hash_fields,
+        hash_raw,
+        lazy,
+        max_depth,
+        hash_view,
+        editable=editable,
+        cache_strings=cache_strings,
+    ).decode()
+
+
+def iterparse(
+    source,
+    encoding="utf-8",
+    errors="strict",
+    hash_fields=None,
+    hash_raw=False,
+    hash_view=False,
+    chunk_size=64 * 1024,
+    multiple=False,
+):
+    """
+    Decode bencode data as a stream of events, without building the full
+    python object.
+
+    Events are tuples, the first item is the event name:
+
+    - ``("start_dict",)``, ``("start_list",)`` when a dict or list begins
+    - ``("end",)`` when current dict or list ends
+    - ``("key", key)`` for a dict key, the next event is for its value
+    - ``("string", value)`` for a string, or a hash field value
+    - ``("int", value)`` for an integer
+
+    See :any:`BDecoder.__init__` for parameter description
+
+    :param bytes|file source: bytes or a binary file-like object, it only
+      need a ``read`` method, which can return less bytes than requested
+    :param str encoding:
+    :param str errors:
+    :param Dict[str, Tuple[int, bool]] hash_fields:
+    :param bool hash_raw:
+    :param bool hash_view:
+    :param int chunk_size: size of every read from ``source``
+    :param bool multiple: if True, ``source`` can contain many bencode
+      values one after another, otherwise it must contain only one
+    :rtype: Iterator[tuple]
+    :raise: :any:`InvalidTorrentDataException` when parse failed or error
+      happened when decode string using specified encoding
+    """
+    decoder = BDecoder(
+        b"",
+        encoding=encoding,
+        errors=errors,
+        hash_fields=hash_fields,
+        hash_raw=hash_raw,
+        hash_view=hash_view,
+    )
+    reader = _StreamReader(source, chunk_size)
+    hash_fields = decoder._hash_fields
+    start_dict = ("start_dict",)
+    start_list = ("start_list",)
+    end_event = ("end",)
+
+    while True:
+        # each item is the key of current value for dict, or _END for list
+        stack = []
+        # whether the next element is a dict key
+        expect_key = False
+        while True:
+            pos = reader.pos
+            lead = reader.peek()
+            if not lead:
+                raise InvalidTorrentDataException(
+                    pos, "Unexpected EOF when reading torrent file", kind="eof"
+                )
+
+            if lead == BDecoder.END_INDICATOR:
+                if not stack or (stack[-1] is not _END and not expect_key):
+                    raise InvalidTorrentDataException(pos)
+                reader.skip(1)
+                stack.pop()
+                yield end_event
+            elif expect_key:
+                if lead in (
+                    BDecoder.DICT_INDICATOR,
+                    BDecoder.LIST_INDICATOR,
+                    BDecoder.INT_INDICATOR,
+                ):
+                    raise InvalidTorrentDataException(
+                        pos, "Type of dict key must be string at pos {pos}"
+                    )
+                length = reader.read_until(BDecoder.STRING_DELIMITER)
+                start = reader.pos
+                key = decoder._decode_string(reader.read(length), start)
+                stack[-1] = key
+                expect_key = False
+                yield ("key", key)
+                continue
+            else:
+                field = stack[-1] if stack else None
+                if field is _END:
+                    field = None
+                if field is not None and field in hash_fields:
+                    length = reader.read_until(BDecoder.STRING_DELIMITER)
+                    start = reader.pos
+                    value = decoder._split_hash(
+                        reader.read(length), start, *hash_fields[field]
+                    )
+                    yield ("string", value)
+                elif lead == BDecoder.DICT_INDICATOR:
+                    reader.skip(1)
+                    stack.append(None)
+                    expect_key = True
+                    yield start_dict
+                    continue
+                elif lead == BDecoder.LIST_INDICATOR:
+                    reader.skip(1)
+                    stack.append(_END)
+                    yield start_list
+                    continue
+                elif lead == BDecoder.INT_INDICATOR:
+                    reader.skip(1)
+                    yield ("int", reader.read_until(BDecoder.END_INDICATOR))
+                else:
+                    length = reader.read_until(BDecoder.STRING_DELIMITER)
+                    start = reader.pos
+                    value = decoder._decode_string(reader.read(length), start, field)
+                    if field == "encoding":
+                        decoder._encoding = _check_encoding(value, start)
+                    yield ("string", value)
+
+            if not stack:
+                break
+            # after a value in dict, comes the next key
+            expect_key = stack[-1] is not _END
+
+        if not reader.peek():
+            return
+        if not multiple:
+            pos = reader.pos
+            raise InvalidTorrentDataException(
+                0,
+                "Expect EOF, but get [{}] at pos {}".format(reader.peek(), pos + 1),
+            )
+
+
+def parse_torrent_file(
+    filename,
+    use_ordered_dict=False,
+    encoding="utf-8",
+    errors="usebytes",
+    hash_fields=None,
+    hash_raw=False,
+    lazy=False,
+    max_depth=None,
+    hash_view=False,
+    editable=False,
+    cache_strings=False,
+    file_table=False,
+):
+    """
+    Shortcut function for parse torrent object using TorrentFileParser
+
+    See :any:`TorrentFileParser.__init__` for parameter description
+
+    :param str filename: torrent filename
+    :param bool use_ordered_dict:
+    :param str encoding:
+    :param str errors:
+    :param Dict[str, Tuple[int, bool]] hash_fields:
+    :param bool hash_raw:
+    :param bool lazy:
+    :param int max_depth:
+    :param bool hash_view:
+    :param bool editable:
+    :param bool cache_strings:
+    :param bool file_table:
+    :rtype: dict|list|int|str|bytes
+    """
+    with open(filename, "rb") as f:
+        return TorrentFileParser(
+            f,
+            use_ordered_dict,
+            encoding,
+            errors,
+            hash_fields,
+            hash_raw,
+            lazy,
+            max_depth,
+            hash_view,
+            editable=editable,
+            cache_strings=cache_strings,
+            file_table=file_table,
+        ).parse()
+
+
+def extract(
+    data,
+    paths,
+    encoding="utf-8",
+    errors="strict",
+    hash_fields=None,
+    hash_raw=False,
+    hash_view=False,
+):
+    """
+    Shortcut function for decode only some values from bytes as torrent file
+    format(bencode)
+
+    See :any:`BDecoder.__init__` for parameter description, and
+    :any:`BDecoder.extract` for path format
+
+    :param bytes|file data: data or file object to be decoded
+    :param List[str] paths: paths of values to be decoded
+    :param str encoding:
+    :param str errors:
+    :param Dict[str, Tuple[int, bool]] hash_fields:
+    :param bool hash_raw:
+    :param bool hash_view:
+    :rtype: dict
+    """
+    return BDecoder(
+        data,
+        encoding=encoding,
+        errors=errors,
+        hash_fields=hash_fields,
+        hash_raw=hash_raw,
+        hash_view=hash_view,
+    ).extract(paths)
+
+
+def extract_torrent_file(
+    filename,
+    paths,
+    encoding="utf-8",
+    errors="usebytes",
+    hash_fields=None,
+    hash_raw=False,
+    hash_view=False,
+):
+    """
+    Shortcut function for parse only some values of torrent file using
+    TorrentFileParser
+
+    See :any:`TorrentFileParser.__init__` for parameter description, and
+    :any:`BDecoder.extract` for path format
+
+    :param str filename: torrent filename
+    :param List[str] paths: paths of values to be parsed
+    :param str encoding:
+    :param str errors:
+    :param Dict[str, Tuple[int, bool]] hash_fields:
+    :param bool hash_raw:
+    :param bool hash_view:
+    :rtype: dict
+    """
+    with open(filename, "rb") as f:
+        return TorrentFileParser(
+            f,
+            encoding=encoding,
+            errors=errors,
+            hash_fields=hash_fields,
+            hash_raw=hash_raw,
+            hash_view=hash_view,
+        ).extract(paths)
+
+
+def info_hash(source, version=1):
+    """
+    Calculate info-hash of a torrent without decoding it, by hashing the raw
+    bytes of the ``info`` dict.
+
+    :param str|bytes|file source: torrent filename, content bytes or a binary
+      file-like object
+    :param int version: 1 for SHA1 (BitTorrent v1) info-hash, 2 for SHA256
+      (BitTorrent v2) one
+    :return: hex string of the hash, None if torrent has no info dict
+    :rtype: str|None
+    :raise: :any:`InvalidTorrentDataException` when outmost element is not a
+      dict or data is malformed
+    """
+    if version not in (1, 2):
+        raise ValueError("Info-hash version must be 1 or 2")
+
+    f = None
+    buffer = source
+    mapped = None
+    try:
+        if isinstance(source, str_type):
+            f = source = open(source, "rb")
+        if isinstance(source, (bytearray, memoryview)):
+            buffer = bytes_type(source)
+        elif not isinstance(source, (bytes_type, mmap.mmap)):
+            mapped = _map_file(source, BDecoder.MMAP_THRESHOLD)
+            if mapped is not None:
+                buffer = mapped
+            else:
+                source.seek(0, 0)
+                buffer = source.read()
+
+        span = _find_info_span(buffer)
+        if span is None:
+            return None
+        info = buffer[span[0] : span[1]]
+    finally:
+        if mapped is not None:
+            mapped.close()
+        if f is not None:
+            f.close()
+
+    return (hashlib.sha1 if version == 1 else hashlib.sha256)(info).hexdigest()
+
+
+class ParseResult(
+    collections.namedtuple(
+        "ParseResult", ["path", "data", "error", "info_hash_v1", "info_hash_v2"]
+    )
+):
+    """
+    Result of one file in :any:`parse_many`.
+
+    ``data`` is None and ``error`` is the exception if the file can't be read
+    or parsed, otherwise ``error`` is None.
+    """
+
+    __slots__ = ()
+
+
+# exceptions of a single file which do not stop parse_many
+_PARSE_ERRORS = (InvalidTorrentDataException, EnvironmentError)
+
+
+def _parse_buffer(path, buffer, fields, options):
+    parser = TorrentFileParser(buffer, *options)
+    if fields is None:
+        data = parser.parse()
+        return ParseResult(path, data, None, parser.info_hash_v1, parser.info_hash_v2)
+    data = parser.extract(fields) if fields else {}
+    span = None
+    # full parse mode accepts a non-dict outmost element, so it is not an
+    # error here either, only there is no info-hash
+    if buffer[:1] == BDecoder.DICT_INDICATOR:
+        span = _find_info_span(buffer)
+    if span is None:
+        return ParseResult(path, data, None, None, None)
+    info = buffer[span[0] : span[1]]
+    v2 = None
+    if BDecoder(info).extract(["meta version"]).get("meta version") == 2:
+        v2 = hashlib.sha256(info).hexdigest()
+    return ParseResult(path, data, None, hashlib.sha1(info).hexdigest(), v2)
+
+
+def _parse_one(path, fields, options):
+    try:
+        with open(path, "rb") as f:
+            mapped = _map_file(f, BDecoder.MMAP_THRESHOLD)
+            try:
+                buffer = f.read() if mapped is None else mapped
+                return _parse_buffer(path, buffer, fields, options)
+            finally:
+                if mapped is not None:
+                    mapped.close()
+    except _PARSE_ERRORS as e:
+        return ParseResult(path, None, e, None, None)
+
+
+def _parse_chunk(paths, fields, options):
+    return [_parse_one(path, fields, options) for path in paths]
+
+
+def _chunks(iterable, size):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def parse_many(
+    paths,
+    jobs=None,
+    ordered=False,
+    chunk_size=16,
+    fields=None,
+    use_ordered_dict=False,
+    encoding="utf-8",
+    errors=BDecoder.ERROR_HANDLER_USEBYTES,
+    hash_fields=None,
+    hash_raw=False,
+    max_depth=None,
+    hash_view=False,
+    cache_strings=False,
+    file_table=False,
+):
+    """
+    Parse many torrent files in a process pool.
+
+    Files are sent to worker processes in chunks of ``chunk_size``, and only a
+    few chunks are in flight at the same time, so ``paths`` can be a lazy
+    iterator of any size. A file which can't be read or parsed, including one
+    with an unknown ``encoding`` field, does not stop the run, its exception is
+    returned in the ``error`` field of its result.
+
+    See :any:`BDecoder.__init__` for parameter description of decode options.
+    ``lazy`` and ``editable`` are not supported, their results are bound to
+    the file content, and ``stats`` can't be sent to worker processes.
+
+    :param Iterable[str] paths: torrent filenames
+    :param int jobs: number of worker processes, default is the CPU count.
+      If it is 1, or ``concurrent.futures`` is not available, files are
+      parsed one by one in current process
+    :param bool ordered: if True, results are yielded in the same order as
+      ``paths``, otherwise as soon as they are ready
+    :param int chunk_size: number of files sent to a worker at once
+    :param List[str] fields: if not None, only values at these paths are
+      extracted, see :any:`BDecoder.extract`, and ``data`` is a dict from
+      path to value. An empty list means only info-hashes are needed, the
+      ``data`` is an empty dict and files are not decoded at all
+    :param bool use_ordered_dict:
+    :param str encoding:
+    :param str errors:
+    :param Dict[str, Tuple[int, bool]] hash_fields:
+    :param bool hash_raw:
+    :param int max_depth:
+    :param bool hash_view:
+    :param bool cache_strings:
+    :param bool file_table:
+    :rtype: Iterator[ParseResult]
+    """
+    if chunk_size < 1:
+        raise ValueError("Chunk size must be positive")
+    if jobs is None:
+        jobs = os.cpu_count() if hasattr(os, "cpu_count") else None
+        if jobs is None:
+            import multiprocessing
+
+            jobs = multiprocessing.cpu_count()
+    if fields is not None:
+        fields = list(fields)
+    # positional arguments of TorrentFileParser after fp
+    options = (
+        use_ordered_dict,
+        encoding,
+        errors,
+        hash_fields,
+        hash_raw,
+        False,
+        max_depth,
+        hash_view,
+        None,
+        False,
+        cache_strings,
+        file_table,
+    )
+
+    if jobs <= 1 or ProcessPoolExecutor is None:
+        for path in paths:
+            yield _parse_one(path, fields, options)
+        return
+
+    chunks = _chunks(paths, chunk_size)
+    max_pending = jobs * 2
+    with ProcessPoolExecutor(jobs) as executor:
+        pending = collections.deque()
+        while True:
+            for chunk in chunks:
+                pending.append(executor.submit(_parse_chunk, chunk, fields, options))
+                if len(pending) >= max_pending:
+                    break
+            if not pending:
+                return
+            if ordered:
+                done = [pending.popleft()]
+            else:
+                done = wait(pending, return_when=FIRST_COMPLETED).done
+                pending = collections.deque(f for f in pending if f not in done)
+            for future in done:
+                for result in future.result():
+                    yield result
+
+
+def _event_loop():
+    if asyncio is None:
+        raise RuntimeError("asyncio is not available")
+    if hasattr(asyncio, "get_running_loop"):
+        # raises RuntimeError if there is no running loop
+        return asyncio.get_running_loop()
+    # Python 3.6 and older
+    return asyncio.get_event_loop()
+
+
+def _run_in_executor(executor, func):
+    return _event_loop().run_in_executor(executor, func)
+
+
+def async_parse(
+    reader,
+    executor=None,
+    chunk_size=64 * 1024,
+    spool_size=None,
+    use_ordered_dict=False,
+    encoding="utf-8",
+    errors=BDecoder.ERROR_HANDLER_USEBYTES,
+    hash_fields=None,
+    hash_raw=False,
+    max_depth=None,
+    hash_view=False,
+):
+    """
+    Read a torrent from an asyncio stream and parse it in ``executor``,
+    without blocking the event loop. Like other asyncio functions, it must be
+    called with a running event loop, for example in a coroutine.
+
+    Content is read in chunks, and spooled to a temporary file once it is
+    bigger than ``spool_size``, which is memory-mapped for parsing.
+
+    See :any:`TorrentFileParser.__init__` for parameter description of
+    decode options
+
+    :param asyncio.StreamReader reader: any object with a ``read(n)``
+      coroutine method which returns empty bytes at EOF
+    :param concurrent.futures.Executor executor: where the decode is run,
+      None for the default executor of event loop
+    :param int chunk_size: size of every read from ``reader``
+    :param int spool_size: content bigger than it is stored in a temporary
+      file instead of memory, default is :any:`BDecoder.MMAP_THRESHOLD`
+    :param bool use_ordered_dict:
+    :param str encoding:
+    :param str errors:
+    :param Dict[str, Tuple[int, bool]] hash_fields:
+    :param bool hash_raw:
+    :param int max_depth:
+    :param bool hash_view:
+    :return: an awaitable of the parsed data
+    :rtype: asyncio.Future
+    """
+    if spool_size is None:
+        spool_size = BDecoder.MMAP_THRESHOLD
+    loop = _event_loop()
+    result = loop.create_future()
+    chunks = []
+    state = {"size": 0, "file": None}
+
+    def close():
+        if state["file"] is not None:
+            state["file"].close()
+
+    def spool(pending):
+        if state["file"] is None:
+            state["file"] = tempfile.TemporaryFile()
+        state["file"].writelines(pending)
+
+    def parse():
+        try:
+            source = state["file"]
+            if source is not None:
+                # written data must reach the file before it is mapped
+                source.flush()
+                source.seek(0)
+            else:
+                source = b"".join(chunks)
+                del chunks[:]
+            return TorrentFileParser(
+                source,
+                use_ordered_dict,
+                encoding,
+                errors,
+                hash_fields,
+                hash_raw,
+                False,
+                max_depth,
+                hash_view,
+            ).parse()
+        finally:
+            close()
+
+    def on_parsed(future):
+        if result.cancelled():
+            return
+        if future.exception() is not None:
+            result.set_exception(future.exception())
+        else:
+            result.set_result(future.result())
+
+    def on_read(future):
+        if result.cancelled() or future.cancelled():
+            close()
+            result.cancel()
+            return
+        if future.exception() is not None:
+            close()
+            result.set_exception(future.exception())
+            return
+        chunk = future.result()
+        if not chunk:
+            loop.run_in_executor(executor, parse).add_done_callback(on_parsed)
+            return
+        state["size"] += len(chunk)
+        chunks.append(chunk)
+        if state["file"] is None and state["size"] <= spool_size:
+            read_next()
+            return
+        # file writing may block, do it in executor
+        pending = chunks[:]
+        del chunks[:]
+        loop.run_in_executor(executor, spool, pending).add_done_callback(on_spooled)
+
+    def on_spooled(future):
+        if result.cancelled():
+            close()
+            return
+        if future.exception() is not None:
+            close()
+            result.set_exception(future.exception())
+            return
+        read_next()
+
+    def read_next():
+        asyncio.ensure_future(reader.read(chunk_size)).add_done_callback(on_read)
+
+    read_next()
+    return result
+
+
+def async_parse_file(
+    filename,
+    executor=None,
+    use_ordered_dict=False,
+    encoding="utf-8",
+    errors=BDecoder.ERROR_HANDLER_USEBYTES,
+    hash_fields=None,
+    hash_raw=False,
+    max_depth=None,
+    hash_view=False,
+):
+    """
+    Run :any:`parse_torrent_file` in ``executor``, without blocking the event
+    loop. See :any:`async_parse` for parameter description
+
+    :param str filename: torrent filename
+    :param concurrent.futures.Executor executor:
+    :param bool use_ordered_dict:
+    :param str encoding:
+    :param str errors:
+    :param Dict[str, Tuple[int, bool]] hash_fields:
+    :param bool hash_raw:
+    :param int max_depth:
+    :param bool hash_view:
+    :return: an awaitable of the parsed data
+    :rtype: asyncio.Future
+    """
+    return _run_in_executor(
+        executor,
+        lambda: parse_torrent_file(
+            filename,
+            use_ordered_dict,
+            encoding,
+            errors,
+            hash_fields,
+            hash_raw,
+            False,
+            max_depth,
+            hash_view,
+        ),
+    )
+
+
+def async_create(
+    filename, data, executor=None, encoding="utf-8", hash_fields=None, streaming=True
+):
+    """
+    Run :any:`create_torrent_file` in ``executor``, without blocking the
+    event loop. See :any:`async_parse` for parameter description
+
+    :param str filename: output torrent filename
+    :param dict|list|int|str|bytes data:
+    :param concurrent.futures.Executor executor:
+    :param str encoding:
+    :param List[str] hash_fields:
+    :param bool streaming: see :any:`TorrentFileCreator.create`, default is
+      True to avoid building the whole content in memory
+    :return: an awaitable which is done after file is written
+    :rtype: asyncio.Future
+    """
+    return _run_in_executor(
+        executor,
+        lambda: create_torrent_file(filename, data, encoding, hash_fields, streaming),
+    )
+
+
+def _read_only(self, *args, **kwargs):
+    raise TypeError("{} is read-only".format(type(self).__name__))
+
+
+def _convert_containers(data, dict_type, list_type):
+    """
+    Rebuild all dicts and lists in ``data`` as ``dict_type`` and ``list_type``,
+    children before parents, without recursion.
+    """
+    containers = []
+    stack = [data]
+    while stack:
+        o = stack.pop()
+        if isinstance(o, dict):
+            containers.append(o)
+            stack.extend(o.values())
+        elif isinstance(o, list):
+            containers.append(o)
+            stack.extend(o)
+
+    converted = {}
+
+    def get(v):
+        return converted.get(id(v), v)
+
+    for o in reversed(containers):
+        if isinstance(o, dict):
+            converted[id(o)] = dict_type((k, get(v)) for k, v in o.items())
+        else:
+            converted[id(o)] = list_type(get(v) for v in o)
+    return get(data)
+
+
+class FrozenDict(dict):
+    """
+    Read-only dict returned by :any:`ParseCache`, every method which modifies
+    it raises ``TypeError``. ``copy.deepcopy`` returns a normal, mutable copy.
+    """
+
+    __slots__ = ()
+
+    __setitem__ = __delitem__ = __ior__ = _read_only
+    clear = pop = popitem = setdefault = update = _read_only
+
+    def __reduce__(self):
+        return type(self), (dict(self),)
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return _convert_containers(self, dict, list)
+
+
+class FrozenList(list):
+    """
+    Read-only list returned by :any:`ParseCache`, see :any:`FrozenDict`.
+    """
+
+    __slots__ = ()
+
+    __setitem__ = __delitem__ = __iadd__ = __imul__ = _read_only
+    # For Python 2
+    __setslice__ = __delslice__ = _read_only
+    append = extend = insert = pop = remove = reverse = sort = _read_only
+
+    def __reduce__(self):
+        return type(self), (list(self),)
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return _convert_containers(self, dict, list)
+
+
+class ParseCache(object):
+    """
+    LRU cache of parsed torrent files, for parsing the same files again and
+    again.
+
+    A file is identified by its path, inode, size and modify time, so a
+    changed file is parsed again. Results are read-only, dicts and lists in
+    them are :any:`FrozenDict` and :any:`FrozenList`, so they can be shared
+    by all callers safely.
+
+    ``hits``, ``misses`` and ``evictions`` count cache lookups and removed
+    entries, ``size`` is the sum of file size of cached entries.
+    """
+
+    def __init__(self, max_entries=128, max_bytes=64 * 1024 * 1024):
+        """
+        :param int max_entries: max count of cached files
+        :param int max_bytes: max sum of file size of cached files, this is an
+          approximation of memory used by them, files bigger than it are
+          not cached
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        """
+        Remove all cached entries, counters are not changed
+        """
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def parse_torrent_file(
+        self,
+        filename,
+        use_ordered_dict=False,
+        encoding="utf-8",
+        errors="usebytes",
+        hash_fields=None,
+        hash_raw=False,
+        max_depth=None,
+        hash_view=False,
+    ):
+        """
+        Cached version of :any:`parse_torrent_file`, see
+        :any:`TorrentFileParser.__init__` for parameter description
+
+        :param str filename: torrent filename
+        :param bool use_ordered_dict: dicts are always :any:`FrozenDict`,
+          which keeps key order in Python 3.7+
+        :param str encoding:
+        :param str errors:
+        :param Dict[str, Tuple[int, bool]] hash_fields:
+        :param bool hash_raw:
+        :param int max_depth:
+        :param bool hash_view:
+        :rtype: FrozenDict|FrozenList|int|str|bytes
+        """
+        options = (
+            use_ordered_dict,
+            encoding,
+            errors,
+            hash_fields,
+            hash_raw,
+            False,
+            max_depth,
+            hash_view,
+        )
+        with open(filename, "rb") as f:
+            st = os.fstat(f.fileno())
+            key = (
+                os.path.abspath(filename),
+                st.st_ino,
+                st.st_size,
+                getattr(st, "st_mtime_ns", st.st_mtime),
+                options[:3],
+                (
+                    None
+                    if hash_fields is None
+                    else tuple(sorted((k, tuple(v)) for k, v in hash_fields.items()))
+                ),
+                options[4:],
+            )
+            with self._lock:
+                entry = self._entries.pop(key, None)
+                if entry is not None:
+                    self._entries[key] = entry
+                    self.hits += 1
+                    return entry[0]
+                self.misses += 1
+
+            data = TorrentFileParser(f, *options).parse()
+
+        data = _convert_containers(data, FrozenDict, FrozenList)
+        if st.st_size > self.max_bytes:
+            return data
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = (data, st.st_size)
+                self.size += st.st_size
+            while len(self._entries) > self.max_entries or self.size > self.max_bytes:
+                _, (_, size) = self._entries.popitem(last=False)
+                self.size -= size
+                self.evictions += 1
+        return data
+
+
+def _to_text(value):
+    if isinstance(value, bytes_type):
+        return value.decode("utf-8", "replace")
+    return str_type(value)
+
+
+def _walk_file_tree(tree, prefix):
+    """
+    Yield (path, length) of files in a v2 ``file tree`` dict, without recursion
+    """
+    stack = [(tree, prefix)]
+    while stack:
+        node, path = stack.pop()
+        for name, child in node.items():
+            if not isinstance(child, dict):
+                continue
+            if name == "" and "length" in child:
+                yield path, child["length"]
+            else:
+                stack.append((child, path + [_to_text(name)]))
+
+
+class TorrentIndex(object):
+    """
+    Metadata index of torrent files in a sqlite3 database.
+
+    :any:`scan` parses torrent files in a directory tree and stores their
+    info-hash, name, total size, file count, piece length, trackers and file
+    list. Scan again only parses new files and files whose size or modify
+    time changed, and removes files which are deleted.
+    """
+
+    FIELDS = [
+        "announce",
+        "announce-list",
+        "info.name",
+        "info.piece length",
+        "info.length",
+        "info.files",
+        "info.file tree",
+    ]
+
+    SCHEMA = """
+    CREATE TABLE IF NOT EXISTS torrents (
+        id INTEGER PRIMARY KEY,
+        path TEXT NOT NULL UNIQUE,
+        size INTEGER NOT NULL,
+        mtime INTEGER NOT NULL,
+        error TEXT,
+        info_hash_v1 TEXT,
+        info_hash_v2 TEXT,
+        name TEXT,
+        total_size INTEGER,
+        file_count INTEGER,
+        piece_length INTEGER
+    );
+    CREATE INDEX IF NOT EXISTS torrents_v1 ON torrents (info_hash_v1);
+    CREATE INDEX IF NOT EXISTS torrents_v2 ON torrents (info_hash_v2);
+    CREATE TABLE IF NOT EXISTS trackers (
+        torrent_id INTEGER NOT NULL REFERENCES torrents (id) ON DELETE CASCADE,
+        url TEXT NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS trackers_torrent ON trackers (torrent_id);
+    CREATE TABLE IF NOT EXISTS files (
+        torrent_id INTEGER NOT NULL REFERENCES torrents (id) ON DELETE CASCADE,
+        path TEXT NOT NULL,
+        length INTEGER NOT NULL
+    );
+    CREATE INDEX IF NOT EXISTS files_torrent ON files (torrent_id);
+    CREATE INDEX IF NOT EXISTS files_length ON files (length);
+    """
+
+    COLUMNS = [
+        "path",
+        "info_hash_v1",
+        "info_hash_v2",
+        "name",
+        "total_size",
+        "file_count",
+        "piece_length",
+    ]
+
+    def __init__(self, database, jobs=None):
+        """
+        :param str database: sqlite3 database filename, ``":memory:"`` for an
+          in-memory database
+        :param int jobs: number of processes used for parsing, see
+          :any:`parse_many`
+        """
+        if sqlite3 is None:
+            raise RuntimeError("sqlite3 is not available")
+        self.jobs = jobs
+        self._db = sqlite3.connect(database)
+        self._db.execute("PRAGMA foreign_keys = ON")
+        self._db.executescript(self.SCHEMA)
+
+    def close(self):
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def scan(self, root, suffix=".torrent"):
         """
-        Parse provided file
+        Scan torrent files in directory ``root`` recursively, and update the
+        index.
+
+        :param str root: directory to be scanned
+        :param str suffix: only files with this suffix are scanned
+        :return: count of parsed files, failed files and removed files. Failed
+          files, including ones without ``info`` dict or with malformed
+          metadata, are not parsed again until they are changed
+        :rtype: Tuple[int, int, int]
         """
-        return self._decoder.decode()
+        root = os.path.abspath(root)
+        known = {}
+        for row_id, path, size, mtime in self._db.execute(
+            "SELECT id, path, size, mtime FROM torrents"
+        ):
+            if path.startswith(os.path.join(root, "")):
+                known[path] = (row_id, size, mtime)
 
+        stats = {}
+        for dir_path, _, filenames in os.walk(root):
+            for filename in filenames:
+                if not filename.endswith(suffix):
+                    continue
+                path = os.path.join(dir_path, filename)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                stat_key = (st.st_size, getattr(st, "st_mtime_ns", int(st.st_mtime)))
+                row = known.pop(path, None)
+                if row is None or row[1:] != stat_key:
+                    stats[path] = stat_key
 
-class TorrentFileCreator(object):
-    def __init__(self, data, encoding="utf-8", hash_fields=None):
-        """
-        See :any:`BEncoder.__init__` for parameter description.
-        This class will use some default ``hash_fields`` values,
-        compare to use ``BEncoder`` directly.
+        parsed = failed = 0
+        with self._db:
+            self._db.executemany(
+                "DELETE FROM torrents WHERE id = ?", [(v[0],) for v in known.values()]
+            )
+            for result in parse_many(stats, jobs=self.jobs, fields=self.FIELDS):
+                parsed += 1
+                if not self._store(result, stats[result.path]):
+                    failed += 1
+        return parsed, failed, len(known)
 
-        :param dict|list|int|str data:
-        :param str encoding:
-        :param List[str] hash_fields:
+    def _store(self, result, stat_key):
         """
-        torrent_hash_fields = list(TorrentFileParser.HASH_FIELD_DEFAULT_PARAMS.keys())
-        if hash_fields is not None:
-            torrent_hash_fields.extend(hash_fields)
+        :return: False if the file is recorded as failed
+        :rtype: bool
+        """
+        db = self._db
+        db.execute("DELETE FROM torrents WHERE path = ?", (result.path,))
+        error = result.error
+        if error is None and result.info_hash_v1 is None:
+            # a torrent without info dict is not an error of parse_many, but
+            # there is nothing to index
+            error = "No info dict in torrent"
+        if error is None:
+            try:
+                name, files, trackers = self._metadata(result.data)
+            except ValueError as e:
+                error = e
+        if error is not None:
+            db.execute(
+                "INSERT INTO torrents (path, size, mtime, error) VALUES (?, ?, ?, ?)",
+                (result.path,) + stat_key + (str_type(error),),
+            )
+            return False
 
-        self._encoder = BEncoder(
-            data,
-            encoding,
-            torrent_hash_fields,
+        cursor = db.execute(
+            "INSERT INTO torrents (path, size, mtime, info_hash_v1, info_hash_v2, "
+            "name, total_size, file_count, piece_length) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (result.path,)
+            + stat_key
+            + (
+                result.info_hash_v1,
+                result.info_hash_v2,
+                name,
+                sum(length for _, length in files),
+                len(files),
+                result.data.get("info.piece length"),
+            ),
+        )
+        row_id = cursor.lastrowid
+        db.executemany(
+            "INSERT INTO trackers (torrent_id, url) VALUES (?, ?)",
+            [(row_id, url) for url in trackers],
         )
+        db.executemany(
+            "INSERT INTO files (torrent_id, path, length) VALUES (?, ?, ?)",
+            [(row_id, path, length) for path, length in files],
+        )
+        return True
 
-    def hash_field(self, name):
+    @staticmethod
+    def _metadata(data):
         """
-        See :any:`BEncoder.hash_field` for parameter description
+        Get name, file list and trackers from extracted fields, and check their
+        types, as a torrent file can contain any value at these paths.
 
-        :param name:
-        :return: return self, so you can chained call
+        :raises ValueError: if a value has wrong type
+        :rtype: Tuple[str, List[Tuple[str, int]], List[str]]
         """
-        self._encoder.hash_field(name)
-        return self
 
-    def create_filelike(self):
+        def check(value, types, what):
+            if not isinstance(value, types) or isinstance(value, bool):
+                raise ValueError(
+                    "Invalid {}: {} expected, got {}".format(
+                        what, types[0].__name__, type(value).__name__
+                    )
+                )
+            return value
+
+        files = []
+        name = data.get("info.name")
+        name = None if name is None else _to_text(name)
+        check(data.get("info.piece length", 0), int_types, "info.piece length")
+        if "info.files" in data:
+            for item in check(data["info.files"], (list,), "info.files"):
+                check(item, (dict,), "info.files item")
+                if "p" in _to_text(item.get("attr", "")):
+                    # padding file of hybrid torrent
+                    continue
+                path = check(item.get("path", []), (list,), "info.files path")
+                length = check(item.get("length", 0), int_types, "info.files length")
+                files.append(("/".join(_to_text(p) for p in path), length))
+        elif "info.length" in data:
+            files.append(
+                (name or "", check(data["info.length"], int_types, "info.length"))
+            )
+        elif "info.file tree" in data:
+            tree = check(data["info.file tree"], (dict,), "info.file tree")
+            for path, length in _walk_file_tree(tree, []):
+                check(length, int_types, "info.file tree length")
+                files.append(("/".join(path), length))
+            files.sort()
+
+        trackers = []
+        if "announce" in data:
+            trackers.append(_to_text(data["announce"]))
+        for tier in check(data.get("announce-list", []), (list,), "announce-list"):
+            for url in check(tier, (list,), "announce-list tier"):
+                url = _to_text(url)
+                if url not in trackers:
+                    trackers.append(url)
+        return name, files, trackers
+
+    def _query(self, where, params):
+        columns = ", ".join("t." + c for c in self.COLUMNS)
+        rows = self._db.execute(
+            "SELECT t.id, {} FROM torrents t WHERE t.error IS NULL AND {} "
+            "ORDER BY t.path".format(columns, where),
+            params,
+        ).fetchall()
+        result = []
+        for row in rows:
+            item = dict(zip(self.COLUMNS, row[1:]))
+            item["trackers"] = [
+                url
+                for url, in self._db.execute(
+                    "SELECT url FROM trackers WHERE torrent_id = ? ORDER BY rowid",
+                    (row[0],),
+                )
+            ]
+            result.append(item)
+        return result
+
+    def lookup(self, info_hash):
         """
-        Create a file-like(BytesIO) object according to provided data
+        Find torrents by info-hash.
 
-        :rtype: BytesIO
+        :param str info_hash: hex string of v1 or v2 info-hash
+        :return: list of torrent records, a record is a dict with keys
+          ``path``, ``info_hash_v1``, ``info_hash_v2``, ``name``,
+          ``total_size``, ``file_count``, ``piece_length`` and ``trackers``
+        :rtype: List[dict]
         """
-        return self._encoder.encode_to_filelike()
+        info_hash = info_hash.lower()
+        if len(info_hash) == 64:
+            return self._query("t.info_hash_v2 = ?", (info_hash,))
+        return self._query("t.info_hash_v1 = ?", (info_hash,))
 
-    def create(self, filename):
+    def find_by_file_size(self, length):
         """
-        Create torrent file according to provided data
+        Find torrents which contain a file of ``length`` bytes.
 
-        :param filename: output filename
-        :return:
+        :param int length: file size
+        :return: list of torrent records, see :any:`lookup`
+        :rtype: List[dict]
         """
-        with open(filename, "wb") as f:
-            f.write(self._encoder.encode())
+        return self._query(
+            "t.id IN (SELECT torrent_id FROM files WHERE length = ?)", (length,)
+        )
+
+    def files(self, path):
+        """
+        :param str path: torrent filename
+        :return: list of (path, length) of files in the torrent, path items
+          are joined with "/"
+        :rtype: List[Tuple[str, int]]
+        """
+        return self._db.execute(
+            "SELECT f.path, f.length FROM files f JOIN torrents t "
+            "ON f.torrent_id = t.id WHERE t.path = ? ORDER BY f.rowid",
+            (os.path.abspath(path),),
+        ).fetchall()
 
 
-def encode(data, encoding="utf-8", hash_fields=None):
+def create_torrent_file(
+    filename, data, encoding="utf-8", hash_fields=None, streaming=False
+):
     """
-    Shortcut function for encode python object to torrent file format(bencode)
+    Shortcut function for create a torrent file using BEncoder
 
-    See :any:`BEncoder.__init__` for parameter description
+    see :any:`BDecoder.__init__` for parameter description
 
-    :param dict|list|int|str|bytes data: data to be encoded
+    :param str filename: output torrent filename
+    :param dict|list|int|str|bytes data:
     :param str encoding:
     :param List[str] hash_fields:
+    :param bool streaming: see :any:`TorrentFileCreator.create`
+    """
+    TorrentFileCreator(data, encoding, hash_fields).create(filename, streaming)
+
+
+def _collect_files(path):
+    """
+    :return: list of (filename, path items relative to ``path``, size) of
+      regular files in ``path``, sorted by path. For a single file, path
+      items is empty
+    """
+    if not os.path.isdir(path):
+        return [(path, [], os.path.getsize(path))]
+    files = []
+    for dir_path, dir_names, filenames in os.walk(path):
+        dir_names.sort()
+        rel = os.path.relpath(dir_path, path)
+        prefix = [] if rel == os.curdir else rel.split(os.sep)
+        for filename in sorted(filenames):
+            full = os.path.join(dir_path, filename)
+            if os.path.isfile(full):
+                files.append((full, prefix + [filename], os.path.getsize(full)))
+    files.sort(key=lambda f: f[1])
+    return files
+
+
+def _auto_piece_length(total):
+    """
+    :return: power of 2 piece length between 16 KiB and 16 MiB, which makes
+      about 1500 pieces
+    """
+    piece_length = 16 * 1024
+    while piece_length < 16 * 1024 * 1024 and total // piece_length > 1500:
+        piece_length *= 2
+    return piece_length
+
+
+def _read_blocks(filename, offset, length, buffer):
+    """
+    Read ``length`` bytes from ``offset`` of file into ``buffer`` repeatedly.
+
+    :param bytearray buffer: reused for every read
+    :return: iterator of memoryview of ``buffer`` holding data
+    """
+    view = memoryview(buffer)
+    with open(filename, "rb") as f:
+        f.seek(offset)
+        while length > 0:
+            n = f.readinto(view[: min(length, len(buffer))])
+            if not n:
+                raise IOError("File {} is changed when reading".format(filename))
+            length -= n
+            yield view[:n]
+
+
+def _hash_v1_task(segments, piece_length):
+    """
+    :param List[Tuple[str, int, int]] segments: (filename, offset, length) of
+      data to be hashed, which starts at a piece boundary
+    :return: SHA1 digests of pieces in ``segments`` joined together
     :rtype: bytes
     """
-    return BEncoder(data, encoding, hash_fields).encode()
+    buffer = bytearray(min(piece_length, 4 * 1024 * 1024))
+    digests = []
+    h = hashlib.sha1()
+    filled = 0
+    for filename, offset, length in segments:
+        for block in _read_blocks(filename, offset, length, buffer):
+            pos = 0
+            size = len(block)
+            while pos < size:
+                n = min(piece_length - filled, size - pos)
+                h.update(block[pos : pos + n])
+                filled += n
+                pos += n
+                if filled == piece_length:
+                    digests.append(h.digest())
+                    h = hashlib.sha1()
+                    filled = 0
+    if filled:
+        digests.append(h.digest())
+    return b"".join(digests)
 
 
-def decode(
-    data,
-    use_ordered_dict=False,
-    encoding="utf-8",
-    errors="strict",
-    hash_fields=None,
-    hash_raw=False,
-):
+def _v1_tasks(files, task_size):
     """
-    Shortcut function for decode bytes as torrent file format(bencode) to python
-    object
+    Split data of all files as one stream into tasks of ``task_size`` bytes.
+    """
+    segments = []
+    left = task_size
+    for filename, _, size in files:
+        offset = 0
+        while offset < size:
+            n = min(size - offset, left)
+            segments.append((filename, offset, n))
+            offset += n
+            left -= n
+            if left == 0:
+                yield segments
+                segments = []
+                left = task_size
+    if segments:
+        yield segments
 
-    See :any:`BDecoder.__init__` for parameter description
 
-    :param bytes|file data: data or file object to be decoded
-    :param bool use_ordered_dict:
-    :param str encoding:
-    :param str errors:
-    :param Dict[str, Tuple[int, bool]] hash_fields:
-    :param bool hash_raw:
-    :rtype: dict|list|int|str|bytes|bytes
+def _map_tasks(func, tasks, jobs):
     """
-    return BDecoder(
-        data,
-        use_ordered_dict,
-        encoding,
-        errors,
-        hash_fields,
-        hash_raw,
-    ).decode()
+    Run ``func`` on every task in a thread pool, hashlib releases the GIL
+    when hashing large data so threads use all cores.
 
+    :return: iterator of results in order of ``tasks``
+    """
+    if jobs is None:
+        jobs = os.cpu_count() if hasattr(os, "cpu_count") else None
+        if jobs is None:
+            import multiprocessing
 
-def parse_torrent_file(
-    filename,
-    use_ordered_dict=False,
-    encoding="utf-8",
-    errors="usebytes",
-    hash_fields=None,
-    hash_raw=False,
+            jobs = multiprocessing.cpu_count()
+    if jobs <= 1 or ThreadPoolExecutor is None:
+        for task in tasks:
+            yield func(*task)
+        return
+    with ThreadPoolExecutor(jobs) as executor:
+        pending = collections.deque()
+        for task in tasks:
+            pending.append(executor.submit(func, *task))
+            if len(pending) >= jobs * 2:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+_V2_BLOCK_SIZE = 16 * 1024
+
+
+def _merkle_root(hashes, count, pad):
+    """
+    :param List[bytes] hashes: SHA256 hashes of bottom layer
+    :param int count: width of bottom layer, a power of 2, missing hashes
+      are filled with ``pad``
+    :param bytes pad: hash of an empty subtree at bottom layer
+    :rtype: bytes
+    """
+    layer = list(hashes) + [pad] * (count - len(hashes))
+    while len(layer) > 1:
+        pad = hashlib.sha256(pad + pad).digest()
+        layer = [
+            hashlib.sha256(layer[x] + layer[x + 1]).digest()
+            for x in range(0, len(layer), 2)
+        ]
+    return layer[0]
+
+
+def _pow2_at_least(n):
+    count = 1
+    while count < n:
+        count *= 2
+    return count
+
+
+def _hash_v2_task(filename, offset, length, piece_length, small, v1, v1_pad):
+    """
+    Hash a piece aligned range of a file.
+
+    :param bool small: file is not larger than a piece, so the range is the
+      whole file and the result is the root of its merkle tree
+    :param bool v1: also calculate SHA1 of every piece
+    :param bool v1_pad: fill the last piece with zero for SHA1, as the file
+      is followed by a padding file
+    :return: (SHA256 merkle roots of every piece, or the file root if
+      ``small``, joined SHA1 of every piece)
+    :rtype: Tuple[bytes, bytes]
+    """
+    zero = b"\x00" * 32
+    blocks_per_piece = piece_length // _V2_BLOCK_SIZE
+    buffer = bytearray(min(piece_length, 4 * 1024 * 1024))
+    roots = []
+    digests = []
+    leaves = []
+    h1 = hashlib.sha1()
+    filled = 0
+    for block in _read_blocks(filename, offset, length, buffer):
+        size = len(block)
+        for x in range(0, size, _V2_BLOCK_SIZE):
+            leaves.append(hashlib.sha256(block[x : x + _V2_BLOCK_SIZE]).digest())
+        if v1:
+            h1.update(block)
+        filled += size
+        if filled == piece_length:
+            roots.append(_merkle_root(leaves, blocks_per_piece, zero))
+            digests.append(h1.digest())
+            leaves = []
+            h1 = hashlib.sha1()
+            filled = 0
+    if filled:
+        if small:
+            roots.append(_merkle_root(leaves, _pow2_at_least(len(leaves)), zero))
+        else:
+            roots.append(_merkle_root(leaves, blocks_per_piece, zero))
+        if v1_pad:
+            h1.update(b"\x00" * (piece_length - filled))
+        digests.append(h1.digest())
+    return b"".join(roots), b"".join(digests) if v1 else b""
+
+
+def _sorted_dict(items):
+    """
+    Dict with keys sorted by raw bytes, as bencode requires
+    """
+
+    def key(item):
+        k = item[0]
+        return k.encode("utf-8") if isinstance(k, str_type) else k
+
+    return collections.OrderedDict(sorted(items, key=key))
+
+
+def make_torrent(
+    path,
+    piece_length=None,
+    trackers=None,
+    private=False,
+    comment=None,
+    created_by=None,
+    creation_date=None,
+    jobs=None,
+    version=1,
 ):
     """
-    Shortcut function for parse torrent object using TorrentFileParser
+    Build torrent data of a file or a directory, pieces are hashed in a
+    thread pool.
 
-    See :any:`TorrentFileParser.__init__` for parameter description
+    Result is in the layout :any:`TorrentFileParser` returns, hash values are
+    hex strings, and keys of every dict are sorted, so it can be written by
+    :any:`create_torrent_file` directly. For v2, keys and values of
+    ``piece layers`` are raw bytes.
 
-    :param str filename: torrent filename
-    :param bool use_ordered_dict:
-    :param str encoding:
-    :param str errors:
-    :param Dict[str, Tuple[int, bool]] hash_fields:
-    :param bool hash_raw:
-    :rtype: dict|list|int|str|bytes
+    :param str path: a file or a directory, files in sub-directories are
+      included, the name of torrent is the last part of ``path``
+    :param int piece_length: a power of 2, at least 16 KiB for v2. default is
+      chosen by total size to make about 1500 pieces, up to 16 MiB
+    :param List[str|List[str]] trackers: tracker URLs, first one is used as
+      ``announce``. If there are more than one, they are put into
+      ``announce-list``, an item can be a list of URLs as a tier
+    :param bool private: set ``private`` flag in info dict
+    :param str comment:
+    :param str created_by:
+    :param int creation_date: unix timestamp
+    :param int jobs: number of hashing threads, default is the CPU count
+    :param int|str version: 1 for BitTorrent v1, 2 for v2 (BEP 52), or
+      "hybrid" for both v1 and v2 metadata, where v1 file list has padding
+      files to align every file to piece boundary, the last file included,
+      as libtorrent does. A single file torrent has no padding
+    :rtype: dict
     """
-    with open(filename, "rb") as f:
-        return TorrentFileParser(
-            f,
-            use_ordered_dict,
-            encoding,
-            errors,
-            hash_fields,
-            hash_raw,
-        ).parse()
+    if version not in (1, 2, "hybrid"):
+        raise ValueError('Version must be 1, 2 or "hybrid"')
+    path = os.path.abspath(path)
+    files = _collect_files(path)
+    total = sum(size for _, _, size in files)
+    if total == 0:
+        raise ValueError("No data in {}".format(path))
+    if piece_length is None:
+        piece_length = _auto_piece_length(total)
+    if piece_length <= 0 or piece_length & (piece_length - 1) != 0:
+        raise ValueError("Piece length must be a power of 2")
+    if version != 1 and piece_length < _V2_BLOCK_SIZE:
+        raise ValueError("Piece length of v2 torrent must be at least 16 KiB")
+
+    # every task hashes many pieces, about 64 MiB
+    task_size = max(1, 64 * 1024 * 1024 // piece_length) * piece_length
+    single = len(files) == 1 and not files[0][1]
+    name = os.path.basename(path)
+    info = []
+    data = []
+
+    if version == 1:
+        tasks = ((s, piece_length) for s in _v1_tasks(files, task_size))
+        pieces = b"".join(_map_tasks(_hash_v1_task, tasks, jobs))
+    else:
+        tasks = (
+            (filename, offset, min(task_size, size - offset))
+            + (piece_length, size <= piece_length, version == "hybrid", not single)
+            for filename, _, size in files
+            for offset in range(0, size, task_size)
+        )
+        results = _map_tasks(_hash_v2_task, tasks, jobs)
+        pieces = []
+        tree = {}
+        layers = []
+        pad = _merkle_root([], piece_length // _V2_BLOCK_SIZE, b"\x00" * 32)
+        for filename, items, size in files:
+            node = tree
+            for item in items or [name]:
+                node = node.setdefault(item, {})
+            node[""] = {"length": size}
+            if size == 0:
+                continue
+            roots = []
+            for _ in range(0, size, task_size):
+                piece_roots, digests = next(results)
+                roots.append(piece_roots)
+                pieces.append(digests)
+            roots = b"".join(roots)
+            if size > piece_length:
+                root = _merkle_root(
+                    [roots[x : x + 32] for x in range(0, len(roots), 32)],
+                    _pow2_at_least(len(roots) // 32),
+                    pad,
+                )
+                layers.append((root, roots))
+            else:
+                root = roots
+            node[""]["pieces root"] = binascii.hexlify(root).decode("ascii")
+        pieces = b"".join(pieces)
+
+        def build_tree(node):
+            if "" in node and len(node) == 1:
+                return {"": _sorted_dict(node[""].items())}
+            return _sorted_dict((k, build_tree(v)) for k, v in node.items())
+
+        info.append(("file tree", build_tree(tree)))
+        info.append(("meta version", 2))
+        if layers:
+            data.append(("piece layers", _sorted_dict(layers)))
+
+    if version != 2:
+        if single:
+            info.append(("length", total))
+        else:
+            v1_files = []
+            for _, items, size in files:
+                v1_files.append(_sorted_dict([("length", size), ("path", items)]))
+                padding = -size % piece_length
+                if version == "hybrid" and padding:
+                    v1_files.append(
+                        _sorted_dict(
+                            [
+                                ("attr", "p"),
+                                ("length", padding),
+                                ("path", [".pad", str_type(padding)]),
+                            ]
+                        )
+                    )
+            info.append(("files", v1_files))
+        info.append(
+            (
+                "pieces",
+                [
+                    binascii.hexlify(pieces[x : x + 20]).decode("ascii")
+                    for x in range(0, len(pieces), 20)
+                ],
+            )
+        )
+    info.append(("name", name))
+    info.append(("piece length", piece_length))
+    if private:
+        info.append(("private", 1))
+
+    tiers = [[t] if isinstance(t, str_type) else list(t) for t in trackers or []]
+    if tiers:
+        data.append(("announce", tiers[0][0]))
+    if len(tiers) > 1 or (tiers and len(tiers[0]) > 1):
+        data.append(("announce-list", tiers))
+    if comment is not None:
+        data.append(("comment", comment))
+    if created_by is not None:
+        data.append(("created by", created_by))
+    if creation_date is not None:
+        data.append(("creation date", creation_date))
+    data.append(("info", _sorted_dict(info)))
+    return _sorted_dict(data)
 
 
-def create_torrent_file(filename, data, encoding="utf-8", hash_fields=None):
+def _raw_hashes(value):
     """
-    Shortcut function for create a torrent file using BEncoder
+    :param value: hash values in any layout the parser returns, hex strings,
+      raw bytes, lists of them or :any:`PiecesView`
+    :return: raw hash values joined together
+    :rtype: bytes
+    """
+    if isinstance(value, PiecesView):
+        return value.tobytes()
+    if isinstance(value, (list, tuple)):
+        return b"".join(_raw_hashes(v) for v in value)
+    if isinstance(value, str_type):
+        return binascii.unhexlify(value)
+    return bytes(value)
 
-    see :any:`BDecoder.__init__` for parameter description
 
-    :param str filename: output torrent filename
-    :param dict|list|int|str|bytes data:
-    :param str encoding:
-    :param List[str] hash_fields:
+def _fs_path(base, items):
+    """
+    Join path items of a torrent to ``base``.
+
+    :raise: :any:`InvalidTorrentDataException` if an item is not a plain name
+      of a file or directory, like ".." or an absolute path, so a torrent
+      can't point to files outside ``base``
+    """
+    for item in items:
+        if isinstance(item, bytes_type) and bytes_type is not str:
+            item = item.decode(
+                sys.getfilesystemencoding() or "utf-8", "surrogateescape"
+            )
+        if (
+            not isinstance(item, (str_type, bytes_type))
+            or item in ("", ".", "..")
+            or "/" in item
+            or os.sep in item
+            or (os.altsep and os.altsep in item)
+            or os.path.isabs(item)
+            or os.path.splitdrive(item)[0]
+        ):
+            raise InvalidTorrentDataException(None, "Invalid file path in torrent")
+        base = os.path.join(base, item)
+    return base
+
+
+def _v2_files(tree):
+    """
+    :return: list of (path items, ``{"length": ..., "pieces root": ...}``) of
+      files in a v2 ``file tree`` dict, in the order of the tree, which is
+      also the order of pieces
+    """
+
+    def children(node):
+        items = [(k, v) for k, v in node.items() if isinstance(v, Mapping)]
+        items.sort(
+            key=lambda kv: (
+                kv[0] if isinstance(kv[0], bytes_type) else kv[0].encode("utf-8")
+            )
+        )
+        return items
+
+    files = []
+    stack = [(children(tree)[::-1], [])]
+    while stack:
+        items, path = stack[-1]
+        if not items:
+            stack.pop()
+            continue
+        name, child = items.pop()
+        if name == "" and "length" in child:
+            files.append((path, child))
+        else:
+            stack.append((children(child)[::-1], path + [name]))
+    return files
+
+
+def _verify_v1_pieces(info, root, piece_length):
+    """
+    :return: iterator of (expected SHA1, segments, None) of every piece,
+      segments are (filename, offset, length), filename is None for padding
+      files
+    """
+    hashes = _raw_hashes(info["pieces"])
+    if "files" in info:
+        base = _fs_path(root, [info["name"]])
+        files = []
+        for f in info["files"]:
+            attr = f.get("attr", "")
+            pad = "p" in (attr.decode() if isinstance(attr, bytes_type) else attr)
+            files.append((None if pad else _fs_path(base, f["path"]), f["length"]))
+    else:
+        files = [(_fs_path(root, [info["name"]]), info["length"])]
+    total = sum(size for _, size in files)
+    if len(hashes) != -(-total // piece_length) * 20:
+        raise ValueError("Count of pieces does not match total length")
+    segments = []
+    left = piece_length
+    index = 0
+    for filename, size in files:
+        offset = 0
+        while offset < size:
+            n = min(size - offset, left)
+            segments.append((filename, offset, n))
+            offset += n
+            left -= n
+            if left == 0:
+                yield hashes[index : index + 20], segments, None
+                index += 20
+                segments = []
+                left = piece_length
+    if segments:
+        yield hashes[index : index + 20], segments, None
+
+
+def _verify_v2_pieces(data, root, piece_length):
+    """
+    :return: iterator of (expected merkle root, [(filename, offset, length)],
+      width of merkle tree in blocks) of every piece. Expected root is None if
+      the piece layer of file is missing or does not match the pieces root
+    """
+    info = data["info"]
+    files = _v2_files(info["file tree"])
+    if len(files) == 1 and files[0][0] == [info["name"]]:
+        base = root
+    else:
+        base = _fs_path(root, [info["name"]])
+    layers = {}
+    for k, v in (data.get("piece layers") or {}).items():
+        layers[_raw_hashes(k)] = _raw_hashes(v)
+    blocks_per_piece = piece_length // _V2_BLOCK_SIZE
+    pad = _merkle_root([], blocks_per_piece, b"\x00" * 32)
+    for items, node in files:
+        size = node["length"]
+        if size == 0:
+            continue
+        filename = _fs_path(base, items)
+        pieces_root = _raw_hashes(node["pieces root"])
+        if size <= piece_length:
+            width = _pow2_at_least(-(-size // _V2_BLOCK_SIZE))
+            yield pieces_root, [(filename, 0, size)], width
+            continue
+        count = -(-size // piece_length)
+        layer = layers.get(pieces_root)
+        if layer is not None and (
+            len(layer) != count * 32
+            or _merkle_root(
+                [layer[x : x + 32] for x in range(0, len(layer), 32)],
+                _pow2_at_least(count),
+                pad,
+            )
+            != pieces_root
+        ):
+            layer = None
+        for i in range(count):
+            offset = i * piece_length
+            expected = None if layer is None else layer[i * 32 : i * 32 + 32]
+            length = min(piece_length, size - offset)
+            yield expected, [(filename, offset, length)], blocks_per_piece
+
+
+def _verify_task(pieces, piece_length, v2):
+    """
+    :param pieces: list of (index, expected hash, segments, merkle tree width)
+    :return: indexes of pieces whose data match expected hash
+    :rtype: List[int]
+    """
+    maps = {}
+    good = []
+    try:
+        for index, expected, segments, width in pieces:
+            if expected is None:
+                continue
+            h = hashlib.sha1()
+            leaves = []
+            for filename, offset, length in segments:
+                if filename is None:
+                    chunks = [b"\x00" * length]
+                else:
+                    if filename not in maps:
+                        try:
+                            with open(filename, "rb") as f:
+                                size = os.fstat(f.fileno()).st_size
+                                maps[filename] = (
+                                    mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                                    if size
+                                    else b""
+                                )
+                        except EnvironmentError:
+                            maps[filename] = b""
+                    m = maps[filename]
+                    step = _V2_BLOCK_SIZE if v2 else 4 * 1024 * 1024
+                    chunks = (
+                        m[x : min(x + step, offset + length)]
+                        for x in range(offset, offset + length, step)
+                    )
+                for chunk in chunks:
+                    if v2:
+                        leaves.append(hashlib.sha256(chunk).digest())
+                    else:
+                        h.update(chunk)
+            if v2:
+                digest = _merkle_root(leaves, width, b"\x00" * 32)
+            else:
+                digest = h.digest()
+            if digest == expected:
+                good.append(index)
+    finally:
+        for m in maps.values():
+            if not isinstance(m, bytes):
+                m.close()
+    return good
+
+
+def verify(torrent, content_root, jobs=None, resume=None, progress=None):
+    """
+    Check downloaded data against piece hashes of a torrent, pieces are
+    hashed in a thread pool.
+
+    Files are read from ``content_root``, which is the directory containing
+    the torrent content, that is ``content_root/name`` for single file
+    torrent and ``content_root/name/path...`` for multi files torrent.
+    Missing or short files make their pieces bad.
+
+    Torrents with v2 metadata (including hybrid torrents) are checked with
+    ``pieces root`` and ``piece layers``, otherwise with v1 ``pieces``, v1
+    padding files are treated as zero.
+
+    :param dict torrent: torrent data returned by :any:`parse_torrent_file`
+      or :any:`TorrentFileParser.parse`, hash values can be in any layout
+      they return
+    :param str content_root:
+    :param int jobs: number of hashing threads, default is the CPU count
+    :param bytes|bytearray resume: bitfield returned by a previous call,
+      pieces marked good are not checked again
+    :param progress: called with the bitfield after a batch of pieces is
+      checked, it can be saved for ``resume`` if checking is interrupted
+    :return: bitfield of good pieces, in the format of BitTorrent
+      ``bitfield`` message, the highest bit of first byte is piece 0. Use
+      ``bitfield[i >> 3] & (0x80 >> (i & 7))`` to check piece ``i``
+    :rtype: bytearray
+    :raise: :any:`InvalidTorrentDataException` if a file path in the torrent
+      is not safe to join to ``content_root``, like ".." or an absolute path
     """
-    TorrentFileCreator(data, encoding, hash_fields).create(filename)
+    info = torrent["info"]
+    piece_length = info["piece length"]
+    v2 = info.get("meta version") == 2 and "file tree" in info
+    if v2:
+        count = sum(
+            -(-node["length"] // piece_length)
+            for _, node in _v2_files(info["file tree"])
+        )
+        pieces = _verify_v2_pieces(torrent, content_root, piece_length)
+    else:
+        count = len(_raw_hashes(info["pieces"])) // 20
+        pieces = _verify_v1_pieces(info, content_root, piece_length)
+    bitfield = bytearray((count + 7) // 8)
+    if resume is not None:
+        if len(resume) != len(bitfield):
+            raise ValueError("Length of resume bitfield does not match pieces")
+        bitfield[:] = resume
+
+    def tasks():
+        # every task hashes many pieces, about 64 MiB
+        task = []
+        for index, (expected, segments, width) in enumerate(pieces):
+            if bitfield[index >> 3] & (0x80 >> (index & 7)):
+                continue
+            task.append((index, expected, segments, width))
+            if len(task) * piece_length >= 64 * 1024 * 1024:
+                yield task, piece_length, v2
+                task = []
+        if task:
+            yield task, piece_length, v2
+
+    for good in _map_tasks(_verify_task, tasks(), jobs):
+        for index in good:
+            bitfield[index >> 3] |= 0x80 >> (index & 7)
+        if progress is not None:
+            progress(bitfield)
+    return bitfield
 
 
 class DataWrapper:
@@ -735,7 +4670,7 @@ class JSONEncoderDataWrapperBytesToString(json.JSONEncoder):
             return output
         if isinstance(o, dict):
             return {self.process(k): self.process(v) for k, v in o.items()}
-        if isinstance(o, list):
+        if isinstance(o, (list, PiecesView, FileTable)):
             return [self.process(v) for v in o]
         return o
 
@@ -748,7 +4683,11 @@ class JSONEncoderDataWrapperBytesToString(json.JSONEncoder):
 def __main():
     parser = argparse.ArgumentParser()
     parser.add_argument(
-        "file", nargs="?", default="", help="input file, will read form stdin if empty"
+        "file",
+        nargs="*",
+        help="input files or directories, will read form stdin if empty. "
+        "For many files or directories, every torrent is printed as a "
+        "line of JSON",
     )
     parser.add_argument(
         "--dict",
@@ -796,6 +4735,45 @@ def __main():
         default=False,
         help="do not group hash field by block, keeps it as raw bytes",
     )
+    parser.add_argument(
+        "--query",
+        "-q",
+        action="append",
+        default=None,
+        metavar="PATH",
+        help="only decode and print value at PATH, like info.name or "
+        "info.files[*].length, can be used many times. Every value is printed "
+        "as a line of JSON, null if not found",
+    )
+    parser.add_argument(
+        "--recursive",
+        "-R",
+        action="store_true",
+        default=False,
+        help="find .torrent files in sub-directories of input directories",
+    )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=None,
+        help="number of worker processes for many files, default is CPU count",
+    )
+    parser.add_argument(
+        "--ordered",
+        action="store_true",
+        default=False,
+        help="print lines for many files in input order, "
+        "instead of as soon as they are ready",
+    )
+    parser.add_argument(
+        "--ndjson",
+        "-n",
+        action="store_true",
+        default=False,
+        help="print a line of JSON for every torrent even if there is only one. "
+        'Without input files, stdin is printed as a line with path "-"',
+    )
     parser.add_argument(
         "--version",
         "-v",
@@ -809,33 +4787,113 @@ def __main():
         print(__version__)
         exit(0)
 
+    for path in args.query or []:
+        try:
+            _parse_path(path)
+        except ValueError as e:
+            sys.stderr.write("{}\n".format(e))
+            exit(1)
+
+    if len(args.file) > 1 or args.ndjson or any(map(os.path.isdir, args.file)):
+        _main_batch(args)
+        return
+
     try:
-        if args.file == "":
-            target_file = io.BytesIO(getattr(sys.stdin, "buffer", sys.stdin).read())
+        if not args.file:
+            target_file = getattr(sys.stdin, "buffer", sys.stdin)
+            if not _can_map_file(target_file, BDecoder.MMAP_THRESHOLD):
+                # pipe or small input, parse the bytes without another copy
+                target_file = target_file.read()
         else:
-            target_file = open(args.file, "rb")
+            target_file = open(args.file[0], "rb")
     except FileNotFoundError:
-        sys.stderr.write('File "{}" not exist\n'.format(args.file))
+        sys.stderr.write('File "{}" not exist\n'.format(args.file[0]))
         exit(1)
 
     # noinspection PyUnboundLocalVariable
-    data = TorrentFileParser(
+    parser = TorrentFileParser(
         target_file,
         use_ordered_dict=not args.dict,
         encoding=args.coding,
         errors=args.errors,
         hash_raw=args.hash_raw,
-    ).parse()
-
-    text = json.dumps(
-        DataWrapper(data),
-        ensure_ascii=args.ascii,
-        sort_keys=args.sort,
-        indent=args.indent,
-        cls=JSONEncoderDataWrapperBytesToString,
     )
 
-    print(text)
+    if args.query:
+        data = parser.extract(args.query)
+        values = [data.get(path) for path in args.query]
+    else:
+        values = [parser.parse()]
+
+    for value in values:
+        text = json.dumps(
+            DataWrapper(value),
+            ensure_ascii=args.ascii,
+            sort_keys=args.sort,
+            indent=args.indent,
+            cls=JSONEncoderDataWrapperBytesToString,
+        )
+        print(text)
+
+
+def _find_torrent_files(paths, recursive):
+    for path in paths:
+        if not os.path.isdir(path):
+            yield path
+            continue
+        for dir_path, dir_names, filenames in os.walk(path):
+            dir_names.sort()
+            if not recursive:
+                del dir_names[:]
+            for filename in sorted(filenames):
+                if filename.endswith(".torrent"):
+                    yield os.path.join(dir_path, filename)
+
+
+def _main_batch(args):
+    if args.file:
+        results = parse_many(
+            _find_torrent_files(args.file, args.recursive),
+            jobs=args.jobs,
+            ordered=args.ordered,
+            fields=args.query,
+            use_ordered_dict=not args.dict,
+            encoding=args.coding,
+            errors=args.errors,
+            hash_raw=args.hash_raw,
+        )
+    else:
+        # --ndjson without input files, stdin is the only torrent, named "-"
+        options = (not args.dict, args.coding, args.errors, None, args.hash_raw)
+        try:
+            content = getattr(sys.stdin, "buffer", sys.stdin).read()
+            result = _parse_buffer("-", content, args.query, options)
+        except _PARSE_ERRORS as e:
+            result = ParseResult("-", None, e, None, None)
+        results = [result]
+    for result in results:
+        record = collections.OrderedDict([("path", result.path)])
+        if result.error is not None:
+            record["error"] = str_type(result.error)
+        else:
+            record["info_hash_v1"] = result.info_hash_v1
+            record["info_hash_v2"] = result.info_hash_v2
+            if args.query:
+                record["data"] = collections.OrderedDict(
+                    (path, result.data.get(path)) for path in args.query
+                )
+            else:
+                record["data"] = result.data
+        sys.stdout.write(
+            json.dumps(
+                DataWrapper(record),
+                ensure_ascii=args.ascii,
+                sort_keys=args.sort,
+                cls=JSONEncoderDataWrapperBytesToString,
+            )
+            + "\n"
+        )
+        sys.stdout.flush()
 
 
 if __name__ == "__main__":